@@ -1,16 +1,26 @@
 import os
 import pkgutil
 import importlib
+import math
 import sys
-from app.commands import CommandHandler, Command
+import time
+from app.commands import AsyncCommandHandler, Command, LazyCommand
 from app.plugins.menu import MenuCommand
+from app.history_manager import HistoryManager, configure_history_manager
+from app.ring_history_manager import RingHistoryManager
+from app.sqlite_history_manager import SqliteHistoryManager
+from app.result_cache import configure_result_cache
+from app.numeric import configure_numeric_backend
+from app.metrics import configure_metrics
+from app.profiling import configure_profiler
+from app.plugins.calculator import CalculatorCommand
+from app.plugin_manifest import PluginManifest
+from app.log_queue import start_queue_logging, stop_queue_logging
+from app.session import ConsoleSession
 from dotenv import load_dotenv # type: ignore
 import logging
 import logging.config
 
-# Import the new history commands
-from app.plugins.calculator.history_commands import ShowHistory, ClearHistory, DeleteSpecificRecord
-
 class App:
     """
     Main application class that manages configuration, environment settings, command loading, 
@@ -18,31 +28,59 @@ class App:
 
     Attributes:
         settings (dict): A dictionary of environment variables.
-        command_handler (CommandHandler): Handles registration and execution of commands.
+        command_handler (AsyncCommandHandler): Handles registration and execution of commands,
+            in the interactive loop and in asynchronous sessions.
+        history_manager (HistoryManager): The process-wide history store shared by all commands.
+        result_cache (ResultCache or None): The cache of calculation results, if enabled.
+        numeric_backend (NumericBackend): The number type the calculator commands compute in.
+        metrics (MetricsRegistry or None): The latency metrics of the application, if enabled.
+        profiler (Profiler or None): The profiler of the commands, if profiling is enabled.
+        plugin_manifest (PluginManifest): The cache of commands provided by the plugins.
     """
 
+    # Storage formats of the history, with their history manager class and default file
+    HISTORY_FORMATS = {
+        'csv': (HistoryManager, 'history.csv'),
+        'ring': (RingHistoryManager, 'history.ring'),
+        'sqlite': (SqliteHistoryManager, 'history.db'),
+    }
+
     def __init__(self):
         """
         Initializes the App instance, sets up logging, loads environment variables, 
         and initializes the command handler.
         """
+        self._created = time.perf_counter()
         os.makedirs('logs', exist_ok=True)
-        self.configure_logging()
         load_dotenv()
+        self.configure_logging()
         self.settings = self.load_environment_variables()
         self.settings.setdefault('ENVIRONMENT', 'PRODUCTION')
-        self.command_handler = CommandHandler()
+        self.metrics = self.configure_metrics()
+        self.profiler = self.configure_profiler()
+        self.history_manager = self.configure_history()
+        self.result_cache = self.configure_result_cache()
+        self.numeric_backend = self.configure_numeric_backend()
+        self.plugin_manifest = PluginManifest(self.settings.get('PLUGIN_MANIFEST'))
+        self.command_handler = AsyncCommandHandler()
 
     def configure_logging(self):
         """
         Configures logging for the application based on a logging configuration file.
         If the file is not found, a default logging configuration is used.
+
+        Unless the `LOG_QUEUE` environment variable is set to a false value, the configured
+        handlers are moved behind a queue so that file and console output is written by a
+        background thread instead of the thread that logs.
         """
+        stop_queue_logging()
         logging_conf_path = 'logging.conf'
         if os.path.exists(logging_conf_path):
             logging.config.fileConfig(logging_conf_path, disable_existing_loggers=False)
         else:
             logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+        if os.environ.get('LOG_QUEUE', 'true').lower() not in ('0', 'false', 'no', 'off'):
+            start_queue_logging()
         logging.info("Logging configured.")
 
     def load_environment_variables(self):
@@ -56,6 +94,198 @@ class App:
         logging.info("Environment variables loaded.")
         return settings
 
+    def configure_history(self):
+        """
+        Sets up the process-wide history store from the environment settings.
+
+        `HISTORY_MAX_RECORDS` sets how many records are retained (default 5), and
+        `HISTORY_FORMAT` selects the storage format: `csv` (the default), `ring`, a
+        fixed-capacity ring buffer file that is never rewritten when records are added, or
+        `sqlite`, an indexed SQLite database.
+        Records are buffered in memory and written behind once `HISTORY_FLUSH_SIZE` records
+        are pending or `HISTORY_FLUSH_INTERVAL` seconds have elapsed, and on shutdown.
+        With `HISTORY_FSYNC` set, every write of the csv history is synced to disk.
+
+        Returns:
+            HistoryManager: The shared history manager injected into every command.
+        """
+        history_format = self.settings.get('HISTORY_FORMAT', 'csv').lower()
+        if history_format not in self.HISTORY_FORMATS:
+            logging.warning("Unknown history format '%s', using csv.", history_format)
+            history_format = 'csv'
+        manager_class, default_file = self.HISTORY_FORMATS[history_format]
+        options = {}
+        if history_format == 'csv':
+            options['durable'] = self.settings.get('HISTORY_FSYNC', 'false').lower() in ('1', 'true', 'yes', 'on')
+        history_manager = configure_history_manager(
+            manager_class=manager_class,
+            file_path=self.settings.get('HISTORY_FILE', default_file),
+            max_records=self.get_int_setting('HISTORY_MAX_RECORDS', 5),
+            flush_size=self.get_int_setting('HISTORY_FLUSH_SIZE', 50),
+            flush_interval=self.get_float_setting('HISTORY_FLUSH_INTERVAL', 1.0),
+            **options,
+        )
+        logging.info("History store configured.")
+        return history_manager
+
+    def configure_result_cache(self):
+        """
+        Sets up the cache of calculation results from the environment settings.
+
+        `RESULT_CACHE_SIZE` is the number of results kept, evicting the least recently used
+        one when full. Caching is disabled when it is 0, the default.
+
+        Returns:
+            ResultCache or None: The shared result cache, or None if caching is disabled.
+        """
+        result_cache = configure_result_cache(self.get_int_setting('RESULT_CACHE_SIZE', 0, minimum=0))
+        if result_cache is not None:
+            logging.info("Result cache configured for %s results.", result_cache.maxsize)
+        return result_cache
+
+    def configure_metrics(self):
+        """
+        Sets up the latency metrics from the environment settings.
+
+        Metrics are recorded unless `METRICS` is set to a false value. With `METRICS_FILE`
+        set, they are written to that file (.prom or .json) when the application stops.
+
+        Returns:
+            MetricsRegistry or None: The shared metrics registry, or None if disabled.
+        """
+        enabled = self.settings.get('METRICS', 'true').lower() not in ('0', 'false', 'no', 'off')
+        metrics = configure_metrics(enabled)
+        logging.info("Metrics %s.", "enabled" if enabled else "disabled")
+        return metrics
+
+    def configure_profiler(self):
+        """
+        Sets up the profiling of commands from the environment settings.
+
+        With `PROFILE` set to a true value (or `--profile` on the command line), every command,
+        the loading of the plugins and batch runs are profiled, and a `.prof` file and
+        `.collapsed` stacks are written for each to `PROFILE_DIR` (default `logs/profiles`).
+        `PROFILE_INTERVAL` is the number of seconds between two stack samples (default 0.001).
+
+        Returns:
+            Profiler or None: The shared profiler, or None if profiling is disabled.
+        """
+        enabled = self.settings.get('PROFILE', 'false').lower() in ('1', 'true', 'yes', 'on')
+        try:
+            interval = float(self.settings.get('PROFILE_INTERVAL', 0.001))
+        except ValueError:
+            interval = 0
+        if interval <= 0:
+            logging.warning("Invalid value '%s' for PROFILE_INTERVAL, using 0.001.", self.settings['PROFILE_INTERVAL'])
+            interval = 0.001
+        profiler = configure_profiler(enabled, self.settings.get('PROFILE_DIR', os.path.join('logs', 'profiles')), interval)
+        if profiler is not None:
+            logging.info("Profiling enabled, writing profiles to %s.", profiler.directory)
+        return profiler
+
+    def profile(self, name, function, *args):
+        """
+        Calls a function, under the profiler if profiling is enabled.
+
+        Args:
+            name (str): The name of the profile, such as 'load_plugins'.
+            function (callable): The function to call.
+            *args: Arguments of the function.
+
+        Returns:
+            The result of the function.
+        """
+        if self.profiler is None:
+            return function(*args)
+        return self.profiler.run(name, function, *args)
+
+    def dump_metrics(self):
+        """
+        Writes the metrics to `METRICS_FILE`, if set and metrics are enabled.
+
+        Errors are logged rather than raised, so that they do not mask how the application
+        stopped.
+        """
+        path = self.settings.get('METRICS_FILE')
+        if not path or self.metrics is None:
+            return
+        try:
+            self.metrics.dump(path)
+            logging.info("Metrics written to %s.", path)
+        except (OSError, ValueError) as e:
+            logging.error("Failed to write metrics to %s: %s", path, e)
+
+    def configure_numeric_backend(self):
+        """
+        Sets up the number type of the calculator commands from the environment settings.
+
+        `NUMERIC_BACKEND` is `float` (the default), `decimal`, `fraction` or `int`. The
+        `decimal` backend rounds results to `DECIMAL_PRECISION` significant digits (default
+        28) with `DECIMAL_ROUNDING` (default `ROUND_HALF_EVEN`).
+
+        Returns:
+            NumericBackend: The shared numeric backend.
+        """
+        name = self.settings.get('NUMERIC_BACKEND', 'float').lower()
+        options = {}
+        if name == 'decimal':
+            options['precision'] = self.get_int_setting('DECIMAL_PRECISION', 28)
+            options['rounding'] = self.settings.get('DECIMAL_ROUNDING', 'ROUND_HALF_EVEN').upper()
+        try:
+            backend = configure_numeric_backend(name, **options)
+        except (TypeError, ValueError):
+            logging.warning("Invalid numeric backend settings for '%s', using float.", name)
+            backend = configure_numeric_backend('float')
+        logging.info("Numeric backend configured: %s", backend)
+        return backend
+
+    def get_int_setting(self, name, default, minimum=1):
+        """
+        Retrieves a setting as an integer.
+
+        Args:
+            name (str): The name of the environment variable to retrieve.
+            default (int): The value used when the setting is missing or invalid.
+            minimum (int): The smallest valid value.
+
+        Returns:
+            int: The value of the setting, or the default.
+        """
+        value = self.settings.get(name)
+        if value is None:
+            return default
+        try:
+            number = int(value)
+        except ValueError:
+            number = minimum - 1
+        if number < minimum:
+            logging.warning("Invalid value '%s' for %s, using %s.", value, name, default)
+            return default
+        return number
+
+    def get_float_setting(self, name, default):
+        """
+        Retrieves a setting as a positive number, such as a number of seconds.
+
+        Args:
+            name (str): The name of the environment variable to retrieve.
+            default (float): The value used when the setting is missing or invalid.
+
+        Returns:
+            float: The value of the setting, or the default.
+        """
+        value = self.settings.get(name)
+        if value is None:
+            return default
+        try:
+            number = float(value)
+        except ValueError:
+            number = math.nan
+        if not 0 < number < math.inf:
+            logging.warning("Invalid value '%s' for %s, using %s.", value, name, default)
+            return default
+        return number
+
     def get_environment_variable(self, env_var: str = 'ENVIRONMENT'):
         """
         Retrieves a specific environment variable from the settings dictionary.
@@ -70,41 +300,66 @@ class App:
 
     def load_plugins(self):
         """
-        Dynamically loads and registers command plugins from the specified plugins directory.
-        
-        This method iterates over plugins, importing each and registering their commands. It 
-        also registers specific history commands and a menu command for user interaction.
+        Registers the command plugins found in the plugins directory.
+
+        The commands are looked up in the cached plugin manifest, which is rebuilt only when a
+        plugin module has changed. Each command is registered as a LazyCommand, so its plugin
+        module is imported the first time the command runs. A menu command is registered last
+        for user interaction.
         """
         plugins_package = 'app.plugins'
         plugins_path = plugins_package.replace('.', '/')
         if not os.path.exists(plugins_path):
-            logging.warning(f"Plugins directory '{plugins_path}' not found.")
+            logging.warning("Plugins directory '%s' not found.", plugins_path)
             return
+        entries = self.plugin_manifest.load_entries(
+            plugins_package, lambda: self.discover_plugins(plugins_package, plugins_path))
+        for command_name, module_name, class_name in entries:
+            self.command_handler.register_command(command_name, LazyCommand(module_name, class_name))
+            logging.info("Command '%s' from plugin '%s' registered.", command_name, module_name)
+
+        # Manually register the menu command, as it needs access to all registered commands
+        self.command_handler.register_command("menu", MenuCommand(self.command_handler))
+        logging.info("Menu command registered.")
+
+    def discover_plugins(self, plugins_package, plugins_path):
+        """
+        Imports every plugin package to discover the commands it provides.
+
+        Args:
+            plugins_package (str): The dotted name of the plugins package.
+            plugins_path (str): The directory of the plugins package.
+
+        Returns:
+            list: The `[command name, module, class]` entries of all plugins.
+        """
+        entries = []
         for _, plugin_name, is_pkg in pkgutil.iter_modules([plugins_path]):
             if is_pkg and plugin_name != "menu":
                 try:
                     plugin_module = importlib.import_module(f'{plugins_package}.{plugin_name}')
-                    self.register_plugin_commands(plugin_module, plugin_name)
+                    entries.extend(self.find_plugin_commands(plugin_module, plugin_name))
                 except ImportError as e:
-                    logging.error(f"Error importing plugin {plugin_name}: {e}")
-
-        # Manually register the menu command, as it needs access to all registered commands
-        self.command_handler.register_command("menu", MenuCommand(self.command_handler))
-        logging.info("Menu command registered.")
+                    logging.error("Error importing plugin %s: %s", plugin_name, e)
+        return entries
 
-    def register_plugin_commands(self, plugin_module, plugin_name):
+    def find_plugin_commands(self, plugin_module, plugin_name):
         """
-        Registers all command classes from a plugin module with the command handler.
+        Finds all command classes in a plugin module.
 
         Args:
             plugin_module (module): The module containing the command classes.
-            plugin_name (str): The name of the plugin module.
+            plugin_name (str): The name of the plugin module, used as the command name.
+
+        Returns:
+            list: The `[command name, module, class]` entries of the plugin.
         """
+        entries = []
         for item_name in dir(plugin_module):
             item = getattr(plugin_module, item_name)
-            if isinstance(item, type) and issubclass(item, Command) and item is not Command:
-                self.command_handler.register_command(plugin_name, item())
-                logging.info(f"Command '{plugin_name}' from plugin '{plugin_name}' registered.")
+            if isinstance(item, type) and issubclass(item, Command) and item not in (Command, LazyCommand):
+                entries.append([plugin_name, plugin_module.__name__, item_name])
+        return entries
 
     def print_main_menu(self):
         """
@@ -115,6 +370,115 @@ class App:
         self.command_handler.list_commands()
         print("Type the number of the command to execute, or type 'exit' to exit.")
 
+    def run_batch(self, source, output=None):
+        """
+        Evaluates calculator records from a CSV file or standard input without the REPL.
+
+        Only the calculator operations are loaded and no menus are printed. Results are
+        written in chunks and the history is flushed once the batch is complete.
+
+        With `BATCH_WORKERS` set to more than 1, the chunks are evaluated by that many worker
+        processes; 0 starts one worker per CPU. By default the batch runs in this process.
+
+        Args:
+            source (str): Path of the input file, or '-' to read from standard input.
+            output (file, optional): The file results are written to. Defaults to standard output.
+
+        Returns:
+            tuple: The number of rows processed and the number of rows that failed.
+        """
+        # Imported here so that NumPy stays out of the interactive start-up path
+        from app.batch import BatchProcessor, ParallelBatchProcessor  # pylint: disable=import-outside-toplevel
+        workers = self.get_int_setting('BATCH_WORKERS', 1, minimum=0)
+        logging.info("Starting batch evaluation of %s with %s workers.", source, workers or 'one per CPU')
+        if workers == 1:
+            processor = BatchProcessor.from_calculator(CalculatorCommand(), self.history_manager)
+        else:
+            processor = ParallelBatchProcessor(self.history_manager, workers=workers or None)
+        try:
+            return self.profile('batch', processor.run_path, source, output)
+        finally:
+            self.history_manager.close()
+            self.dump_metrics()
+            stop_queue_logging()
+
+    def export_history(self, path, history_format=None):
+        """
+        Exports the retained records of the history to a CSV, JSON Lines or columnar file.
+
+        The records are streamed in chunks through `iter_records`, oldest first; records that
+        the history file still holds but no longer retains are left out.
+
+        Args:
+            path (str): Path of the file to write.
+            history_format (str, optional): 'csv', 'jsonl' or 'columnar'. Defaults to the
+                format told from the extension of the file (.csv, .jsonl or .cols).
+
+        Returns:
+            int: The number of records exported.
+        """
+        # Imported here so that the export formats stay out of the interactive start-up path
+        from app.history_export import export_history  # pylint: disable=import-outside-toplevel
+        try:
+            return export_history(self.history_manager, path, history_format)
+        finally:
+            self.history_manager.close()
+            stop_queue_logging()
+
+    def import_history(self, path, history_format=None):
+        """
+        Imports the records of a CSV, JSON Lines or columnar file into the history.
+
+        The file is streamed in chunks, so memory use does not grow with its size. The history
+        keeps its most recent `HISTORY_MAX_RECORDS` records, as for any other record added.
+
+        Args:
+            path (str): Path of the file to read.
+            history_format (str, optional): 'csv', 'jsonl' or 'columnar'. Defaults to the
+                format told from the extension of the file (.csv, .jsonl or .cols).
+
+        Returns:
+            int: The number of records imported.
+        """
+        from app.history_export import import_history  # pylint: disable=import-outside-toplevel
+        try:
+            return import_history(self.history_manager, path, history_format)
+        finally:
+            self.history_manager.close()
+            stop_queue_logging()
+
+    def serve(self, host='127.0.0.1', port=8000):
+        """
+        Serves the calculator operations and history commands over HTTP/JSON until interrupted.
+
+        The plugins are loaded once and every connection shares the calculator and the
+        history manager. Results are recorded in the history as in the REPL, and the history
+        is flushed when the server stops.
+
+        Args:
+            host (str): The address to listen on. Defaults to the local host only.
+            port (int): The port to listen on; 0 picks a free port.
+        """
+        # Imported here so that the HTTP server stays out of the interactive start-up path
+        from app.calculator import Calculator  # pylint: disable=import-outside-toplevel
+        from app.server import CalculatorHTTPServer, CalculatorService  # pylint: disable=import-outside-toplevel
+        self.load_plugins()
+        calculator_command = self.command_handler.get_command('calculator')
+        calculator = Calculator.from_command(calculator_command, history_manager=self.history_manager)
+        server = CalculatorHTTPServer((host, port), CalculatorService(calculator, calculator_command))
+        logging.info("Serving calculator requests on http://%s:%s/", *server.server_address[:2])
+        print(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}/ (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logging.info("Server interrupted by user. Exiting.")
+        finally:
+            server.server_close()
+            self.history_manager.close()
+            self.dump_metrics()
+            logging.info("Server shutdown.")
+            stop_queue_logging()
+
     def start(self):
         """
         Starts the application, loading plugins, displaying the main menu, and entering the 
@@ -126,8 +490,10 @@ class App:
         Raises:
             SystemExit: If the user chooses to exit the application.
         """
-        self.load_plugins()
+        self.profile('load_plugins', self.load_plugins)
         self.print_main_menu()
+        if self.metrics is not None:
+            self.metrics.timer('startup_seconds').observe(time.perf_counter() - self._created)
         logging.info("Application started. Type 'exit' to exit.")
         try:
             while True:
@@ -143,7 +509,7 @@ class App:
                     command_name = self.command_handler.get_command_by_index(index)
                     if command_name:
                         self.command_handler.execute_command(command_name)
-                        logging.info(f"Executed command: {command_name}")
+                        logging.info("Executed command: %s", command_name)
                         self.print_main_menu()
                     else:
                         logging.error("Invalid command selection.")
@@ -155,4 +521,31 @@ class App:
             logging.info("Application interrupted by user. Exiting.")
             sys.exit(0)
         finally:
+            self.history_manager.close()
+            if self.result_cache is not None:
+                logging.info("Result cache statistics: %s", self.result_cache.stats())
+            self.dump_metrics()
             logging.info("Application shutdown.")
+            stop_queue_logging()
+
+    async def start_async(self, session=None):
+        """
+        Starts the application as an asynchronous session on the event loop.
+
+        Unlike `start`, waiting for input does not block the event loop, so the calculator can
+        run next to other tasks, and typing 'exit' ends the session rather than the process.
+        Services serving many users load the plugins once and call
+        `command_handler.run_session` with a session per user instead.
+
+        Args:
+            session (Session, optional): The session to run. Defaults to a ConsoleSession on
+                standard input and output.
+        """
+        self.load_plugins()
+        logging.info("Application started in an asynchronous session.")
+        try:
+            await self.command_handler.run_session(session if session is not None else ConsoleSession())
+        finally:
+            await self.history_manager.flush_async()
+            self.dump_metrics()
+            logging.info("Asynchronous session closed.")
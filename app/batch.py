@@ -0,0 +1,358 @@
+import csv
+import io
+import itertools
+import logging
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np # type: ignore
+from app.numeric import FLOAT, get_backend
+
+class BatchProcessor:
+    """
+    Evaluates calculator records streamed from a CSV source without any interactive menus.
+
+    Each input row has the form `operation,num1,num2` (for example `add,2,3`). Rows are read
+    lazily and evaluated in chunks: the rows of a chunk are grouped by operation and each group
+    is computed with one vectorized `apply` call of the registered calculator operation.
+    Results are written as `operation,num1,num2,result`, so the output has one row per input
+    row. Rows that cannot be evaluated carry an error message in the result column. Successful
+    results are added to the history once per chunk.
+
+    With a numeric backend other than float, such as 'decimal', the rows are evaluated one by
+    one with the operations' `compute` method in the backend's type instead.
+
+    Attributes:
+        operations (dict): A dictionary mapping lower-case operation names to operations.
+        history_manager (HistoryManager): The history store receiving the results.
+        chunk_size (int): Number of rows evaluated between two bulk writes.
+        numeric (NumericBackend): The number type the rows are evaluated in.
+    """
+
+    def __init__(self, operations, history_manager, chunk_size=10000, numeric=None):
+        """
+        Initializes the BatchProcessor.
+
+        Args:
+            operations (dict): A dictionary mapping lower-case operation names to operations
+                exposing an `apply(num1, num2)` method.
+            history_manager (HistoryManager): The history store receiving the results.
+            chunk_size (int): Number of rows evaluated between two bulk writes.
+            numeric (str or NumericBackend, optional): The numeric backend, such as 'decimal'.
+                Defaults to the process-wide backend.
+        """
+        self.operations = operations
+        self.history_manager = history_manager
+        self.chunk_size = chunk_size
+        self.numeric = get_backend(numeric)
+
+    @classmethod
+    def from_calculator(cls, calculator_command, history_manager, chunk_size=10000, numeric=None):
+        """
+        Builds a BatchProcessor over the arithmetic operations of a CalculatorCommand.
+
+        Args:
+            calculator_command (CalculatorCommand): The calculator whose operations are used.
+            history_manager (HistoryManager): The history store receiving the results.
+            chunk_size (int): Number of rows evaluated between two bulk writes.
+            numeric (str or NumericBackend, optional): The numeric backend, such as 'decimal'.
+                Defaults to the process-wide backend.
+
+        Returns:
+            BatchProcessor: A processor keyed by the lower-case operation class names.
+        """
+        operations = {
+            operation.name.lower(): operation
+            for operation in calculator_command.operations.values()
+            if hasattr(operation, 'apply')
+        }
+        return cls(operations, history_manager, chunk_size, numeric)
+
+    def run(self, source, output):
+        """
+        Evaluates every row of a CSV source and writes the results.
+
+        Args:
+            source (iterable): An iterable of CSV lines, such as an open file.
+            output (file): The file the result rows are written to.
+
+        Returns:
+            tuple: The number of rows processed and the number of rows that failed.
+        """
+        writer = csv.writer(output)
+        processed = failed = 0
+        for rows in self.chunks(source):
+            failed += self._process_chunk(writer, rows)
+            processed += len(rows)
+        return processed, failed
+
+    def chunks(self, source):
+        """
+        Reads the rows of a CSV source lazily, in chunks of `chunk_size` rows.
+
+        Args:
+            source (iterable): An iterable of CSV lines, such as an open file.
+
+        Yields:
+            list: The non-empty `[operation, num1, num2]` rows of the next chunk.
+        """
+        rows = []
+        for row in csv.reader(source):
+            if not row:
+                continue
+            rows.append(row)
+            if len(rows) >= self.chunk_size:
+                yield rows
+                rows = []
+        if rows:
+            yield rows
+
+    def _process_chunk(self, writer, rows):
+        """
+        Evaluates a chunk of rows, writes the results and adds the successful ones to the history.
+
+        Args:
+            writer (csv.writer): The writer receiving the result rows.
+            rows (list): The `[operation, num1, num2]` rows of the chunk.
+
+        Returns:
+            int: The number of rows that failed.
+        """
+        results, succeeded = self.evaluate(rows)
+        writer.writerows(results)
+        self.history_manager.add_records([result for result, ok in zip(results, succeeded) if ok])
+        return succeeded.count(False)
+
+    def evaluate(self, rows):
+        """
+        Evaluates a chunk of rows without writing anything.
+
+        Rows are grouped by operation so that each operation evaluates its share of the chunk
+        with a single vectorized `apply` call.
+
+        Args:
+            rows (list): The `[operation, num1, num2]` rows of the chunk.
+
+        Returns:
+            tuple: The result rows, in the order of the input rows, and a list of flags telling
+                which rows succeeded.
+        """
+        if self.numeric is not FLOAT:
+            return self.evaluate_exact(rows)
+        results = [None] * len(rows)
+        groups = {}
+        for position, row in enumerate(rows):
+            try:
+                name, num1, num2 = row
+                operation = self.operations[name.strip().lower()]
+                num1, num2 = float(num1), float(num2)
+            except ValueError:
+                results[position] = row + ["Error: Please enter valid numbers."]
+                continue
+            except KeyError:
+                results[position] = row + [f"Error: Unknown operation '{row[0]}'."]
+                continue
+            positions, operands1, operands2 = groups.setdefault(operation, ([], [], []))
+            positions.append(position)
+            operands1.append(num1)
+            operands2.append(num2)
+
+        succeeded = [False] * len(rows)
+        for operation, (positions, operands1, operands2) in groups.items():
+            name = operation.name
+            values = operation.apply(operands1, operands2)
+            errors = np.ma.getmaskarray(values).tolist()
+            values = np.ma.getdata(values).tolist()
+            for position, num1, num2, value, error in zip(positions, operands1, operands2, values, errors):
+                if error:
+                    results[position] = rows[position] + ["Error: Cannot divide by zero."]
+                else:
+                    results[position] = [name, num1, num2, value]
+                    succeeded[position] = True
+        return results, succeeded
+
+    def evaluate_exact(self, rows):
+        """
+        Evaluates a chunk of rows one by one in the numeric backend; see `evaluate`.
+        """
+        results = []
+        succeeded = []
+        backend = self.numeric
+        for row in rows:
+            try:
+                name, num1, num2 = row
+                operation = self.operations[name.strip().lower()]
+                num1, num2 = backend.parse(num1), backend.parse(num2)
+                results.append([operation.name, num1, num2, backend.compute(operation, num1, num2)])
+                succeeded.append(True)
+                continue
+            except ValueError:
+                error = "Error: Please enter valid numbers."
+            except KeyError:
+                error = f"Error: Unknown operation '{row[0]}'."
+            except ZeroDivisionError:
+                error = "Error: Cannot divide by zero."
+            except ArithmeticError:
+                # Such as the invalid operations and overflows of the decimal backend
+                error = "Error: The result is undefined or out of range."
+            results.append(row + [error])
+            succeeded.append(False)
+        return results, succeeded
+
+    def run_path(self, path, output=None):
+        """
+        Evaluates the records of a CSV file, or of standard input when `path` is '-'.
+
+        Args:
+            path (str): The input file path, or '-' for standard input.
+            output (file, optional): The file the result rows are written to.
+                Defaults to standard output.
+
+        Returns:
+            tuple: The number of rows processed and the number of rows that failed.
+        """
+        output = output if output is not None else sys.stdout
+        if path == '-':
+            processed, failed = self.run(sys.stdin, output)
+        else:
+            with open(path, newline='') as source:
+                processed, failed = self.run(source, output)
+        logging.info("Batch processed %s rows from %s with %s errors.", processed, path, failed)
+        return processed, failed
+
+
+class ParallelBatchProcessor(BatchProcessor):
+    """
+    Evaluates calculator records like BatchProcessor, spread over a pool of worker processes.
+
+    The input is split into chunks of `chunk_size` lines, and every chunk is parsed, evaluated
+    and formatted as CSV by a worker process running its own copy of the operation plugins.
+    Workers send back the formatted text and only the successful results that can still be
+    retained by the history, so the main process does little more than copy text. At most two
+    chunks per worker are in flight, so memory use does not grow with the input. Results are
+    written in input order, and the retained results are added to the history with a single
+    write once the whole input has been evaluated.
+
+    Since the input is split by lines, rows cannot contain quoted line breaks.
+
+    Attributes:
+        history_manager (HistoryManager): The history store receiving the results.
+        workers (int or None): Number of worker processes, or None for one per CPU.
+        chunk_size (int): Number of lines sent to a worker at a time.
+        plugins_package (str): The package of the operation plugins loaded by the workers.
+        numeric (NumericBackend): The number type the rows are evaluated in by the workers.
+    """
+
+    def __init__(self, history_manager, workers=None, chunk_size=10000, plugins_package='app.plugins.calculator',
+                 numeric=None):
+        """
+        Initializes the ParallelBatchProcessor.
+
+        Args:
+            history_manager (HistoryManager): The history store receiving the results.
+            workers (int, optional): Number of worker processes. Defaults to one per CPU.
+            chunk_size (int): Number of lines sent to a worker at a time.
+            plugins_package (str): The package of the operation plugins loaded by the workers.
+            numeric (str or NumericBackend, optional): The numeric backend, such as 'decimal'.
+                Defaults to the process-wide backend.
+        """
+        super().__init__({}, history_manager, chunk_size, numeric)
+        self.workers = workers
+        self.plugins_package = plugins_package
+
+    def run(self, source, output):
+        """
+        Evaluates every row of a CSV source in the worker processes and writes the results.
+
+        Args:
+            source (iterable): An iterable of CSV lines, such as an open file.
+            output (file): The file the result rows are written to.
+
+        Returns:
+            tuple: The number of rows processed and the number of rows that failed.
+        """
+        processed = failed = 0
+        keep = self.history_manager.max_records
+        retained = deque(maxlen=keep)
+        workers = self.workers or os.cpu_count() or 1
+        lines = iter(source)
+        # Spawned workers do not inherit the threads (log listener, history flusher) of this process
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_start_worker, initargs=(self.plugins_package, self.numeric)) as executor:
+            in_flight = deque()
+            while True:
+                chunk = list(itertools.islice(lines, self.chunk_size))
+                if chunk:
+                    in_flight.append(executor.submit(_evaluate_lines, chunk, keep))
+                if in_flight and (len(in_flight) >= 2 * workers or not chunk):
+                    text, rows, errors, records = in_flight.popleft().result()
+                    output.write(text)
+                    retained.extend(records)
+                    processed += rows
+                    failed += errors
+                elif not chunk:
+                    break
+        self.history_manager.add_records(list(retained))
+        return processed, failed
+
+
+_worker_processor = None
+
+
+class _NullHistoryManager:
+    """
+    The history manager of a worker process of a ParallelBatchProcessor, which discards
+    every record without touching the disk; the main process records the whole batch.
+    """
+
+    def add_record(self, operation, num1, num2, result):
+        """Discards a record."""
+
+    def add_records(self, records):
+        """Discards records."""
+
+    def flush(self):
+        """Does nothing, as no record is ever buffered."""
+
+    def close(self):
+        """Does nothing, as no file is ever opened."""
+
+
+def _start_worker(plugins_package, numeric):
+    """
+    Loads the operation plugins once in a worker process of a ParallelBatchProcessor.
+
+    Args:
+        plugins_package (str): The package of the operation plugins.
+        numeric (NumericBackend): The numeric backend the rows are evaluated in.
+    """
+    global _worker_processor  # pylint: disable=global-statement
+    # Imported here, as the calculator plugins are only needed by the workers
+    from app.history_manager import configure_history_manager  # pylint: disable=import-outside-toplevel
+    from app.plugins.calculator import CalculatorCommand  # pylint: disable=import-outside-toplevel
+    # Workers never record history or log; the main process does both for the whole batch
+    configure_history_manager(_NullHistoryManager)
+    logging.disable(logging.CRITICAL)
+    _worker_processor = BatchProcessor.from_calculator(CalculatorCommand(plugins_package), None, numeric=numeric)
+
+
+def _evaluate_lines(lines, keep):
+    """
+    Parses, evaluates and formats a chunk of CSV lines in a worker process.
+
+    Args:
+        lines (list): The CSV lines of the chunk.
+        keep (int): Number of most recent successful results to send back for the history.
+
+    Returns:
+        tuple: The result rows formatted as CSV, the number of rows, the number of rows that
+            failed, and the last `keep` successful results.
+    """
+    rows = [row for row in csv.reader(lines) if row]
+    results, succeeded = _worker_processor.evaluate(rows)
+    text = io.StringIO()
+    csv.writer(text).writerows(results)
+    records = [result for result, ok in zip(results, succeeded) if ok]
+    return text.getvalue(), len(rows), succeeded.count(False), records[-keep:] if keep else []
@@ -0,0 +1,225 @@
+import logging
+from app.expression import ExpressionCompiler
+from app.history_manager import get_history_manager
+from app.numeric import FLOAT, get_backend
+from app.plugins.calculator import CalculatorCommand
+
+class Calculator:
+    """
+    Headless facade over the calculator operations for use as a library.
+
+    Unlike the REPL commands, the facade never prompts or prints. It calls the pure `compute`
+    method of each operation and lets callers decide, per call, whether the calculation is
+    logged and recorded in the history. Many calculations can be evaluated at once with
+    `calculate_many`, which records them in the history with a single bulk write, and infix
+    expressions over the operations can be evaluated with `evaluate`.
+
+    Calculations are carried out in the calculator's numeric backend, or in the one given for
+    a call: 'float' (the default), 'decimal', 'fraction' or 'int'. Operands are converted to
+    the backend's type, so passing their text, such as "0.1", keeps decimal amounts exact.
+    With the float backend the operands are used as they are, at no extra cost. Expressions
+    are always evaluated in floating point.
+
+    Attributes:
+        operations (dict): A dictionary mapping lower-case operation names to operations.
+        history_manager (HistoryManager): The history store receiving recorded calculations.
+        log (bool): Whether calculations are logged by default.
+        record_history (bool): Whether calculations are recorded in the history by default.
+        numeric (NumericBackend): The number type calculations are carried out in by default.
+    """
+
+    def __init__(self, operations, history_manager=None, log=True, record_history=True, numeric=None):
+        """
+        Initializes the Calculator.
+
+        Args:
+            operations (dict): A dictionary mapping lower-case operation names to operations
+                exposing a `compute(num1, num2)` method.
+            history_manager (HistoryManager, optional): The history store to use. Defaults to
+                the process-wide history manager.
+            log (bool): Whether calculations are logged by default.
+            record_history (bool): Whether calculations are recorded in the history by default.
+            numeric (str or NumericBackend, optional): The default numeric backend, such as
+                'decimal'. Defaults to the process-wide backend.
+        """
+        self.operations = operations
+        self.history_manager = history_manager if history_manager is not None else get_history_manager()
+        self.log = log
+        self.record_history = record_history
+        self.numeric = get_backend(numeric)
+        self._compiler = None
+
+    @classmethod
+    def from_command(cls, calculator_command=None, **kwargs):
+        """
+        Builds a Calculator over the arithmetic operations of a CalculatorCommand.
+
+        Args:
+            calculator_command (CalculatorCommand, optional): The calculator whose operations
+                are used. Defaults to a new CalculatorCommand loading all operation plugins.
+            **kwargs: Keyword arguments passed to the Calculator.
+
+        Returns:
+            Calculator: A calculator keyed by the lower-case operation class names.
+        """
+        calculator_command = calculator_command if calculator_command is not None else CalculatorCommand()
+        operations = {
+            operation.name.lower(): operation
+            for operation in calculator_command.operations.values()
+            if hasattr(operation, 'compute')
+        }
+        return cls(operations, **kwargs)
+
+    def get_operation(self, name):
+        """
+        Looks up an operation by name, ignoring case.
+
+        Args:
+            name (str): The operation name, such as "add" or "Divide".
+
+        Returns:
+            Command: The operation registered under that name.
+
+        Raises:
+            KeyError: If no operation is registered under that name.
+        """
+        try:
+            return self.operations[name.lower()]
+        except KeyError:
+            raise KeyError(f"Unknown operation: {name}") from None
+
+    def calculate(self, name, num1, num2, log=None, record_history=None, numeric=None):
+        """
+        Computes a single calculation.
+
+        Args:
+            name (str): The operation name, such as "add".
+            num1 (float): The first number.
+            num2 (float): The second number.
+            log (bool, optional): Whether to log the calculation. Defaults to `self.log`.
+            record_history (bool, optional): Whether to record the calculation in the history.
+                Defaults to `self.record_history`.
+            numeric (str or NumericBackend, optional): The numeric backend of this call.
+                Defaults to `self.numeric`.
+
+        Returns:
+            float: The result of the calculation, of the backend's type.
+
+        Raises:
+            KeyError: If the operation is unknown.
+            ValueError: If an operand cannot be converted to the backend's type.
+            ZeroDivisionError: If a division by zero is attempted.
+        """
+        operation = self.get_operation(name)
+        backend = self.numeric if numeric is None else get_backend(numeric)
+        if backend is FLOAT:
+            result = operation.compute(num1, num2)
+        else:
+            num1, num2 = backend.convert(num1), backend.convert(num2)
+            result = backend.compute(operation, num1, num2)
+        log = self.log if log is None else log
+        record_history = self.record_history if record_history is None else record_history
+        if log:
+            logging.info("%s %s and %s: Result = %s", operation.name, num1, num2, result)
+        if record_history:
+            self.history_manager.add_record(operation.name, num1, num2, result)
+        return result
+
+    def calculate_many(self, calculations, log=None, record_history=None, numeric=None):
+        """
+        Computes many calculations and records them with one bulk history write.
+
+        All calculations are computed before anything is logged or recorded, so a failing
+        calculation leaves the history untouched.
+
+        Args:
+            calculations (iterable): An iterable of `(name, num1, num2)` tuples.
+            log (bool, optional): Whether to log a summary of the calculations.
+                Defaults to `self.log`.
+            record_history (bool, optional): Whether to record the calculations in the history.
+                Defaults to `self.record_history`.
+            numeric (str or NumericBackend, optional): The numeric backend of these
+                calculations. Defaults to `self.numeric`.
+
+        Returns:
+            list: The results, in the order of the calculations.
+
+        Raises:
+            KeyError: If an operation is unknown.
+            ValueError: If an operand cannot be converted to the backend's type.
+            ZeroDivisionError: If a division by zero is attempted.
+        """
+        backend = self.numeric if numeric is None else get_backend(numeric)
+        records = []
+        if backend is FLOAT:
+            for name, num1, num2 in calculations:
+                operation = self.get_operation(name)
+                records.append([operation.name, num1, num2, operation.compute(num1, num2)])
+        else:
+            for name, num1, num2 in calculations:
+                operation = self.get_operation(name)
+                num1, num2 = backend.convert(num1), backend.convert(num2)
+                records.append([operation.name, num1, num2, backend.compute(operation, num1, num2)])
+        log = self.log if log is None else log
+        record_history = self.record_history if record_history is None else record_history
+        if log:
+            logging.info("Calculated %s results.", len(records))
+        if record_history:
+            self.history_manager.add_records(records)
+        return [record[3] for record in records]
+
+    @property
+    def compiler(self):
+        """
+        The compiler of infix expressions over the operations, created on first use.
+        """
+        if self._compiler is None:
+            self._compiler = ExpressionCompiler(self.operations.values())
+        return self._compiler
+
+    def compile(self, expression):
+        """
+        Compiles an infix expression, or returns it from the cache of compiled expressions.
+
+        Args:
+            expression (str): The expression, such as "(2+3)*4/7" or "x*x - 1".
+
+        Returns:
+            CompiledExpression: The compiled expression.
+
+        Raises:
+            ExpressionError: If the expression is not well formed.
+        """
+        return self.compiler.compile(expression)
+
+    def evaluate(self, expression, bindings=None, log=None, record_history=None):
+        """
+        Evaluates an infix expression, compiling it only the first time it is seen.
+
+        Every operation applied is recorded in the history, with one bulk write once the
+        whole expression has been evaluated.
+
+        Args:
+            expression (str): The expression, such as "(2+3)*4/7" or "x*x - 1".
+            bindings (dict, optional): The values of the variables in the expression.
+            log (bool, optional): Whether to log the evaluation. Defaults to `self.log`.
+            record_history (bool, optional): Whether to record the operations applied in the
+                history. Defaults to `self.record_history`.
+
+        Returns:
+            float: The value of the expression.
+
+        Raises:
+            ExpressionError: If the expression is not well formed or a variable has no value.
+            ZeroDivisionError: If a division by zero is attempted.
+        """
+        compiled = self.compile(expression)
+        log = self.log if log is None else log
+        record_history = self.record_history if record_history is None else record_history
+        steps = [] if record_history else None
+        result = compiled.evaluate(bindings, trace=steps)
+        if log:
+            logging.info("Evaluated %s with %s: Result = %s", expression, bindings or {}, result)
+        if steps:
+            self.history_manager.add_records(steps)
+        return result
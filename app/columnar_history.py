@@ -0,0 +1,308 @@
+import math
+import threading
+import time
+import numpy as np  # type: ignore
+
+class ColumnarHistory:
+    """
+    In-memory history of calculations stored column by column, for fast aggregate queries.
+
+    Each column is a NumPy array: the operation code (`uint16`, indexing `operations`), the
+    two operands, the result and the time the record was added (`float64` seconds since the
+    epoch, NaN when unknown). The arrays double in capacity as records are added, so adding
+    is amortized O(1).
+
+    Records are added to a buffer, which is moved into the arrays with vectorized
+    conversions before the next query, or once it holds `BLOCK_SIZE` records. The records
+    are divided into blocks of `BLOCK_SIZE` records, and the count, sum, minimum and maximum
+    of the results of every operation in every block are kept up to date as records move
+    into the arrays. Timestamps never decrease, so a time window is found by binary search;
+    it is then aggregated from the summaries of the blocks it covers, and only the records
+    of the two blocks at its ends are scanned. A query thus takes milliseconds over tens of
+    millions of records, whatever the size of the window.
+
+    Records without a timestamp, such as those read from a CSV or ring buffer file, come
+    first and are left out of time-window queries.
+
+    Every record keeps the position it was added at. Removing a record only marks it as
+    deleted and updates the summary of its block, so a removal costs the same however many records
+    are held.
+
+    Attributes:
+        operations (list): The operation names, indexed by operation code.
+    """
+
+    COLUMNS = ('operation', 'num1', 'num2', 'result', 'timestamp')
+    BLOCK_SIZE = 65536
+
+    def __init__(self, capacity=1024):
+        """
+        Initializes an empty ColumnarHistory.
+
+        Args:
+            capacity (int): Number of records the arrays hold before they first grow.
+        """
+        self.operations = []
+        self._codes = {}
+        self._size = 0
+        self._untimed = 0
+        self._removed = 0
+        self._last_time = -math.inf
+        self._buffer = []
+        self._buffered = 0
+        self._lock = threading.Lock()
+        self._allocate(max(1, capacity))
+        self._reset_blocks()
+
+    def _allocate(self, capacity):
+        """
+        Allocates the column arrays with room for `capacity` records, keeping the records held.
+        """
+        columns = {'operation': np.empty(capacity, dtype=np.uint16),
+                   'num1': np.empty(capacity), 'num2': np.empty(capacity),
+                   'result': np.empty(capacity), 'timestamp': np.empty(capacity),
+                   'deleted': np.empty(capacity, dtype=bool)}
+        if self._size:
+            for name, column in columns.items():
+                column[:self._size] = getattr(self, '_' + name)[:self._size]
+        for name, column in columns.items():
+            setattr(self, '_' + name, column)
+
+    def _reset_blocks(self):
+        """
+        Empties the summaries of the blocks: one row per block and one column per operation.
+        """
+        blocks, operations = 0, len(self.operations)
+        self._block_count = np.zeros((blocks, operations), dtype=np.int64)
+        self._block_sum = np.zeros((blocks, operations))
+        self._block_min = np.full((blocks, operations), np.inf)
+        self._block_max = np.full((blocks, operations), -np.inf)
+
+    def __len__(self):
+        with self._lock:
+            return self._size + self._buffered - self._removed
+
+    def add_records(self, records, timestamp=None):
+        """
+        Adds records, all stamped with the same time.
+
+        The records are only buffered; they are converted into the columns all at once before
+        the next query, or once `BLOCK_SIZE` records are buffered, so that the buffer of a
+        long session without queries stays small.
+
+        Args:
+            records (list): The `[operation, num1, num2, result]` records, oldest first.
+            timestamp (float, optional): Seconds since the epoch. Defaults to now; NaN leaves
+                the records without a timestamp, which is only allowed before any timed record.
+
+        Returns:
+            int: The position of the first record, by which it can be removed.
+        """
+        with self._lock:
+            position = self._size + self._buffered
+            self._buffer.append((records, time.time() if timestamp is None else timestamp))
+            self._buffered += len(records)
+            if self._buffered >= self.BLOCK_SIZE:
+                self._consolidate()
+            return position
+
+    def add_columns(self, operations, num1, num2, result, timestamps=None):
+        """
+        Adds records given column by column, converting every column at once.
+
+        Args:
+            operations (sequence): The operation names.
+            num1 (array_like): The first operands.
+            num2 (array_like): The second operands.
+            result (array_like): The results.
+            timestamps (array_like, optional): Seconds since the epoch of every record, not
+                decreasing. Defaults to NaN, for records without a timestamp.
+
+        Returns:
+            int: The position of the first record, by which it can be removed.
+        """
+        with self._lock:
+            self._consolidate()
+            position = self._size
+            self._append(operations, num1, num2, result, timestamps)
+            return position
+
+    def _consolidate(self):
+        """
+        Moves the buffered records into the columns with a single append. The caller must
+        hold the lock.
+        """
+        buffer, self._buffer, self._buffered = self._buffer, [], 0
+        records = [record for chunk, _ in buffer for record in chunk]
+        if records:
+            timestamps = np.repeat([timestamp for _, timestamp in buffer], [len(chunk) for chunk, _ in buffer])
+            operations, num1, num2, result = zip(*records)
+            self._append(operations, num1, num2, result, timestamps)
+
+    def _append(self, operations, num1, num2, result, timestamps):
+        """
+        Appends columns of records and updates the summaries of their blocks. The caller must
+        hold the lock.
+        """
+        count = len(operations)
+        if not count:
+            return
+        names, inverse = np.unique(np.asarray(operations, dtype=str), return_inverse=True)
+        codes = np.array([self._code(str(name)) for name in names], dtype=np.uint16)[inverse.ravel()]
+        timestamps = np.full(count, np.nan) if timestamps is None else np.array(timestamps, dtype=float)
+        timed = ~np.isnan(timestamps)
+        untimed = int(np.argmax(timed)) if timed.any() else count
+        if not timed[untimed:].all() or (untimed and self._size > self._untimed):
+            raise ValueError("Records without a timestamp must come before timed records.")
+        if untimed < count:
+            # Keep the timestamps in order even if the clock goes back
+            timestamps[untimed:] = np.maximum.accumulate(np.maximum(timestamps[untimed:], self._last_time))
+            self._last_time = timestamps[-1]
+        self._untimed += untimed
+        if self._size + count > len(self._result):
+            self._allocate(max(self._size + count, 2 * len(self._result)))
+        end = self._size + count
+        self._operation[self._size:end] = codes
+        self._num1[self._size:end] = np.asarray(num1, dtype=float)
+        self._num2[self._size:end] = np.asarray(num2, dtype=float)
+        self._result[self._size:end] = np.asarray(result, dtype=float)
+        self._timestamp[self._size:end] = timestamps
+        self._deleted[self._size:end] = False
+        start, self._size = self._size, end
+        self._summarize_blocks(start // self.BLOCK_SIZE)
+
+    def _code(self, operation):
+        """
+        Returns the code of an operation name, assigning the next one to a new name.
+        """
+        code = self._codes.get(operation)
+        if code is None:
+            code = self._codes[operation] = len(self.operations)
+            self.operations.append(operation)
+        return code
+
+    def _summarize_blocks(self, first, last=None):
+        """
+        Computes the summaries of the blocks from `first` up to `last`, by default the last
+        one, again.
+        """
+        blocks = -(-self._size // self.BLOCK_SIZE)
+        operations = len(self.operations)
+        if self._block_count.shape != (blocks, operations):
+            old_blocks, old_operations = self._block_count.shape
+            kept = (slice(0, min(old_blocks, blocks, first)), slice(0, old_operations))
+            for name, fill in (('count', 0), ('sum', 0.0), ('min', np.inf), ('max', -np.inf)):
+                summary = np.full((blocks, operations), fill, dtype=getattr(self, '_block_' + name).dtype)
+                summary[kept] = getattr(self, '_block_' + name)[kept]
+                setattr(self, '_block_' + name, summary)
+        for block in range(first, blocks if last is None else last + 1):
+            start = block * self.BLOCK_SIZE
+            count, total, minimum, maximum = self._scan(start, min(start + self.BLOCK_SIZE, self._size))
+            self._block_count[block] = count
+            self._block_sum[block] = total
+            self._block_min[block] = minimum
+            self._block_max[block] = maximum
+
+    def _scan(self, start, stop):
+        """
+        Computes the count, sum, minimum and maximum of every operation over the records
+        from `start` to `stop` by reading them, leaving out the removed ones.
+        """
+        operations = len(self.operations)
+        codes, results = self._operation[start:stop], self._result[start:stop]
+        if self._removed:
+            kept = ~self._deleted[start:stop]
+            codes, results = codes[kept], results[kept]
+        minimum = np.full(operations, np.inf)
+        maximum = np.full(operations, -np.inf)
+        np.minimum.at(minimum, codes, results)
+        np.maximum.at(maximum, codes, results)
+        return (np.bincount(codes, minlength=operations), np.bincount(codes, weights=results, minlength=operations),
+                minimum, maximum)
+
+    def aggregate(self, operation=None, since=None, until=None):
+        """
+        Returns the count, sum, mean, minimum and maximum of the results of every operation.
+
+        Args:
+            operation (str, optional): Only this operation. Defaults to every operation.
+            since (float, optional): Only records added at or after this time, in seconds
+                since the epoch. Records without a timestamp are then left out.
+            until (float, optional): Only records added before this time.
+
+        Returns:
+            dict: The statistics of every operation with records, keyed by operation name in
+            order of first use: a dict with `count`, `sum`, `mean`, `min` and `max`.
+        """
+        with self._lock:
+            self._consolidate()
+            start, stop = 0, self._size
+            if since is not None or until is not None:
+                timestamps = self._timestamp[self._untimed:self._size]
+                start = self._untimed + (0 if since is None else int(np.searchsorted(timestamps, since, 'left')))
+                if until is not None:
+                    stop = self._untimed + int(np.searchsorted(timestamps, until, 'left'))
+            count, total, minimum, maximum = self._totals(start, max(start, stop))
+        stats = {}
+        for code, name in enumerate(self.operations):
+            if count[code] and (operation is None or name == operation):
+                stats[name] = {'count': int(count[code]), 'sum': float(total[code]),
+                               'mean': float(total[code] / count[code]),
+                               'min': float(minimum[code]), 'max': float(maximum[code])}
+        return stats
+
+    def _totals(self, start, stop):
+        """
+        Computes the aggregates of every operation over the records from `start` to `stop`,
+        from the summaries of the blocks in between and the records of the blocks at the ends.
+        The caller must hold the lock.
+        """
+        first = -(-start // self.BLOCK_SIZE)
+        last = stop // self.BLOCK_SIZE if stop < self._size else -(-self._size // self.BLOCK_SIZE)
+        if first >= last:
+            return self._scan(start, stop)
+        parts = [(self._block_count[first:last].sum(axis=0), self._block_sum[first:last].sum(axis=0),
+                  self._block_min[first:last].min(axis=0), self._block_max[first:last].max(axis=0))]
+        parts.append(self._scan(start, first * self.BLOCK_SIZE))
+        parts.append(self._scan(min(last * self.BLOCK_SIZE, stop), stop))
+        count, total, minimum, maximum = zip(*parts)
+        return sum(count), sum(total), np.minimum.reduce(minimum), np.maximum.reduce(maximum)
+
+    def remove(self, position):
+        """
+        Removes the record at a position, as returned when it was added.
+
+        The record is marked as deleted and taken out of the count and sum of its block. Only
+        if it holds the minimum or maximum of its block is the block read again. The positions
+        of the other records do not change.
+
+        Args:
+            position (int): The position of the record.
+
+        Returns:
+            bool: True if the record was removed; False if the position is invalid or the
+            record was already removed.
+        """
+        with self._lock:
+            self._consolidate()
+            if not 0 <= position < self._size or self._deleted[position]:
+                return False
+            self._deleted[position] = True
+            self._removed += 1
+            block, code, result = position // self.BLOCK_SIZE, self._operation[position], self._result[position]
+            if self._block_min[block, code] < result < self._block_max[block, code]:
+                self._block_count[block, code] -= 1
+                self._block_sum[block, code] -= result
+            else:
+                self._summarize_blocks(block, block)
+            return True
+
+    def clear(self):
+        """
+        Removes every record.
+        """
+        with self._lock:
+            self._buffer = []
+            self._size = self._untimed = self._removed = self._buffered = 0
+            self._last_time = -math.inf
+            self._reset_blocks()
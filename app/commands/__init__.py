@@ -1,4 +1,10 @@
 from abc import ABC, abstractmethod
+import importlib
+import logging
+import time
+from app.metrics import get_metrics
+from app.profiling import get_profiler
+from app.session import SessionClosed
 
 class Command(ABC):
     """
@@ -14,52 +20,216 @@ class Command(ABC):
         """
         pass
 
+    async def execute_async(self, session):
+        """
+        Execute the command in an asynchronous session.
+
+        Commands that prompt or print override this method to go through the session's
+        `input` and `print`, so that many sessions can share one event loop.
+
+        Args:
+            session (Session): The session of the user running the command.
+
+        Raises:
+            NotImplementedError: If the command cannot run in an asynchronous session.
+        """
+        raise NotImplementedError(f"{self.name} cannot run in an asynchronous session.")
+
+    @property
+    def name(self):
+        """
+        The display name of the command, which is its class name.
+        """
+        return self.__class__.__name__
+
+
+class LazyCommand(Command):
+    """
+    Stand-in for a command whose plugin module is imported only the first time it is used.
+
+    Attribute lookups that the stand-in cannot answer itself are forwarded to the real command,
+    loading it on demand.
+
+    Attributes:
+        module_name (str): The module that defines the command class.
+        class_name (str): The name of the command class.
+    """
+
+    def __init__(self, module_name: str, class_name: str):
+        """
+        Initializes the LazyCommand without importing the plugin module.
+
+        Args:
+            module_name (str): The module that defines the command class.
+            class_name (str): The name of the command class.
+        """
+        self.module_name = module_name
+        self.class_name = class_name
+        self._command = None
+
+    @property
+    def name(self):
+        """
+        The display name of the command, known without importing its module.
+        """
+        return self.class_name
+
+    def load(self):
+        """
+        Imports the plugin module and instantiates the command on first use.
+
+        Returns:
+            Command: The real command instance.
+        """
+        if self._command is None:
+            module = importlib.import_module(self.module_name)
+            self._command = getattr(module, self.class_name)()
+        return self._command
+
+    def execute(self):
+        """
+        Executes the real command, loading it first if necessary.
+        """
+        return self.load().execute()
+
+    async def execute_async(self, session):
+        """
+        Executes the real command in an asynchronous session, loading it first if necessary.
+        """
+        return await self.load().execute_async(session)
+
+    def __getattr__(self, attribute):
+        """
+        Forwards lookups of public attributes to the real command.
+        """
+        if attribute.startswith('_'):
+            raise AttributeError(attribute)
+        return getattr(self.load(), attribute)
+
 
 class CommandHandler:
     """
     A handler for managing and executing commands.
+
+    Besides the commands themselves, the handler keeps an ordered list of command names and a
+    dictionary of aliases, both updated on registration, so commands can be looked up by
+    index, name or alias in constant time. The numbered menu of commands is rendered once and
+    cached until the next registration.
     
     Attributes:
         commands (dict): A dictionary mapping command names to their corresponding Command instances.
+        command_names (list): The registered command names, in registration order.
+        aliases (dict): A dictionary mapping aliases to command names.
+        revision (int): A counter incremented on every change to the registered commands.
     """
 
     def __init__(self):
         """
         Initializes a CommandHandler instance with an empty dictionary of commands.
         """
+        self.aliases = {}
+        self.revision = 0
         self.commands = {}
 
-    def register_command(self, command_name: str, command_instance: Command):
+    @property
+    def commands(self):
+        """
+        The dictionary mapping command names to their corresponding Command instances.
+        """
+        return self._commands
+
+    @commands.setter
+    def commands(self, commands):
+        """
+        Replaces all registered commands and rebuilds the index.
+        """
+        self._commands = commands
+        self.command_names = list(commands)
+        self._changed()
+
+    def _changed(self):
+        """
+        Records a change to the registered commands and drops the cached menu.
+        """
+        self.revision += 1
+        self._menu = None
+
+    def register_command(self, command_name: str, command_instance: Command, aliases=()):
         """
         Registers a command with a given name.
 
         Args:
             command_name (str): The name of the command to register.
             command_instance (Command): An instance of a class inheriting from Command.
+            aliases (iterable): Alternative names the command can be looked up by.
+        """
+        if command_name not in self._commands:
+            self.command_names.append(command_name)
+        self._commands[command_name] = command_instance
+        for alias in aliases:
+            self.aliases[alias] = command_name
+        self._changed()
+
+    def get_command(self, command_name: str):
+        """
+        Retrieves a command by its name or alias.
+
+        Args:
+            command_name (str): The name or alias of the command.
+
+        Returns:
+            Command or None: The command if it is registered; None otherwise.
         """
-        self.commands[command_name] = command_instance
+        return self._commands.get(self.aliases.get(command_name, command_name))
 
     def execute_command(self, command_name: str):
         """
-        Executes a command by its name.
+        Executes a command by its name or alias.
+
+        Prints an error message if the command name is not found in the registered commands.
+        When metrics are enabled, the duration of the command is recorded in the
+        `command_seconds` timer labelled with the command name. When profiling is enabled,
+        the command runs under the profiler, which writes a profile of it.
 
         Args:
-            command_name (str): The name of the command to execute.
-        
-        Raises:
-            KeyError: If the command name is not found in the registered commands.
+            command_name (str): The name or alias of the command to execute.
         """
-        try:
-            self.commands[command_name].execute()
-        except KeyError:
+        command = self.get_command(command_name)
+        if command is None:
             print(f"No such command: {command_name}")
+            return
+        metrics = get_metrics()
+        profiler = get_profiler()
+        if metrics is None and profiler is None:
+            command.execute()
+            return
+        name = self.aliases.get(command_name, command_name)
+        start = time.perf_counter()
+        try:
+            if profiler is None:
+                command.execute()
+            else:
+                profiler.run(name, command.execute)
+        finally:
+            if metrics is not None:
+                metrics.timer('command_seconds', command=name).observe(time.perf_counter() - start)
+
+    @property
+    def menu(self):
+        """
+        The numbered list of registered command names, rendered once per change.
+        """
+        if self._menu is None:
+            self._menu = "\n".join(f"{index}. {command_name}"
+                                   for index, command_name in enumerate(self.command_names, start=1))
+        return self._menu
 
     def list_commands(self):
         """
         Prints a list of all registered command names with their respective indices.
         """
-        for index, command_name in enumerate(self.commands, start=1):
-            print(f"{index}. {command_name}")
+        if self.command_names:
+            print(self.menu)
 
     def get_command_by_index(self, index: int):
         """
@@ -72,7 +242,89 @@ class CommandHandler:
             str or None: The command name if it exists at the given index; None otherwise.
         """
         try:
-            command_name = list(self.commands.keys())[index]
-            return command_name
+            return self.command_names[index]
         except IndexError:
             return None
+
+
+class AsyncCommandHandler(CommandHandler):
+    """
+    A command handler that can also run commands in asynchronous sessions.
+
+    The synchronous interface is unchanged. In addition, `run_session` runs the main menu loop
+    for one session on the event loop, so many users can be served concurrently without a
+    thread each; commands are executed with their `execute_async` method.
+    """
+
+    async def execute_command_async(self, command_name: str, session):
+        """
+        Executes a command by its name or alias in an asynchronous session.
+
+        Args:
+            command_name (str): The name or alias of the command to execute.
+            session (Session): The session of the user running the command.
+        """
+        command = self.get_command(command_name)
+        if command is None:
+            session.print(f"No such command: {command_name}")
+            return
+        metrics = get_metrics()
+        start = time.perf_counter()
+        try:
+            await command.execute_async(session)
+        except NotImplementedError:
+            logging.warning("Command %s is not available in asynchronous sessions.", command_name)
+            session.print(f"The {command_name} command is not available in this session.")
+        finally:
+            if metrics is not None:
+                metrics.timer('command_seconds', command=self.aliases.get(command_name, command_name)).observe(
+                    time.perf_counter() - start)
+
+    def print_main_menu(self, session):
+        """
+        Prints the main menu to a session.
+        """
+        session.print("\nAvailable commands:")
+        if self.command_names:
+            session.print(self.menu)
+        session.print("Type the number of the command to execute, or type 'exit' to exit.")
+
+    async def run_session(self, session):
+        """
+        Runs the main menu loop for one session until the user exits or the input ends.
+
+        Errors raised by a command are reported to the session and logged, without ending it.
+        The session is closed when the loop ends.
+
+        Args:
+            session (Session): The session of the user.
+        """
+        self.print_main_menu(session)
+        try:
+            while True:
+                cmd_input = (await session.input(">>> ")).strip()
+                if cmd_input.lower() == 'exit':
+                    break
+                try:
+                    index = int(cmd_input) - 1
+                except ValueError:
+                    session.print("Only numbers are allowed, wrong input.")
+                    continue
+                command_name = self.get_command_by_index(index) if index >= 0 else None
+                if command_name is None:
+                    session.print("Invalid selection. Please enter a valid number.")
+                    continue
+                try:
+                    await self.execute_command_async(command_name, session)
+                    logging.info("Executed command: %s", command_name)
+                except SessionClosed:
+                    raise
+                except Exception as e:  # pylint: disable=broad-except
+                    logging.error("Error executing command %s: %s", command_name, e)
+                    session.print(f"An error occurred: {e}")
+                self.print_main_menu(session)
+        except SessionClosed:
+            pass
+        finally:
+            await session.close()
+        logging.info("Session ended.")
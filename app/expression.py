@@ -0,0 +1,290 @@
+import functools
+import math
+import re
+
+class ExpressionError(ValueError):
+    """
+    Raised when an expression cannot be parsed or is evaluated without all of its variables.
+    """
+
+
+class CompiledExpression:
+    """
+    An infix expression compiled to a Python function over the calculator operations.
+
+    The function is compiled once, so evaluating the expression again, for example with
+    new variable bindings, neither tokenizes nor parses it.
+
+    Attributes:
+        source (str): The expression as written.
+        variables (tuple): The names of the variables in the expression, sorted.
+        operations (tuple): The operations the compiled function calls, by call index.
+    """
+
+    def __init__(self, source, variables, operations, function):
+        """
+        Initializes the CompiledExpression.
+
+        Args:
+            source (str): The expression as written.
+            variables (iterable): The names of the variables in the expression.
+            operations (tuple): The operations the compiled function calls, by call index.
+            function (callable): The compiled function, taking the variable bindings and a
+                tuple of functions with the signature of `compute(num1, num2)`.
+        """
+        self.source = source
+        self.variables = tuple(sorted(variables))
+        self.operations = operations
+        self._function = function
+        self._computes = tuple(operation.compute for operation in operations)
+
+    def evaluate(self, bindings=None, trace=None):
+        """
+        Evaluates the expression.
+
+        Args:
+            bindings (dict, optional): The values of the variables, keyed by name.
+            trace (list, optional): A list receiving an `[operation, num1, num2, result]`
+                record for every operation applied, in evaluation order.
+
+        Returns:
+            float: The value of the expression.
+
+        Raises:
+            ExpressionError: If a variable of the expression has no value.
+            ZeroDivisionError: If a division by zero is attempted.
+        """
+        bindings = bindings if bindings is not None else {}
+        missing = [name for name in self.variables if name not in bindings]
+        if missing:
+            raise ExpressionError(f"No value for {', '.join(missing)} in '{self.source}'.")
+        if trace is None:
+            return self._function(bindings, self._computes)
+        return self._function(bindings, tuple(self._traced(operation, trace) for operation in self.operations))
+
+    @staticmethod
+    def _traced(operation, trace):
+        """
+        Returns a compute function for an operation that records every call in `trace`.
+        """
+        def compute(num1, num2):
+            result = operation.compute(num1, num2)
+            trace.append([operation.name, num1, num2, result])
+            return result
+        return compute
+
+
+class ExpressionCompiler:
+    """
+    Compiles infix expressions such as `(2+3)*4/7` or `x*x - 1`, using the calculator
+    operations as operators.
+
+    Every operation with a `symbol` attribute is an operator, binding as strongly as its
+    `precedence` attribute. Operators of equal precedence associate to the left. Numbers,
+    variable names, parentheses and unary minus and plus are supported as well.
+
+    Compiled expressions are cached by their text, with the least recently used one evicted
+    once `cache_size` expressions are cached.
+
+    Attributes:
+        operators (dict): A dictionary mapping operator symbols to operations.
+        compile (callable): Compiles an expression, through the cache.
+    """
+
+    def __init__(self, operations, cache_size=256):
+        """
+        Initializes the ExpressionCompiler.
+
+        Args:
+            operations (iterable): The calculator operations. Those with a `symbol`
+                attribute become operators.
+            cache_size (int): Maximum number of compiled expressions kept in the cache.
+        """
+        self.operators = {}
+        for operation in operations:
+            symbol = getattr(operation, 'symbol', None)
+            if symbol:
+                self.operators[symbol] = operation
+        # Longer symbols first, so that an operator such as '**' is not read as two '*'
+        symbols = sorted(set(self.operators) | {'(', ')', '-', '+'}, key=len, reverse=True)
+        self._token = re.compile(
+            r'\s*(?:(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|(?P<name>[A-Za-z_]\w*)'
+            r'|(?P<symbol>' + '|'.join(re.escape(symbol) for symbol in symbols) + '))')
+        self.compile = functools.lru_cache(maxsize=cache_size)(self._compile)
+
+    def tokenize(self, source):
+        """
+        Splits an expression into `(kind, text, position)` tokens.
+
+        Args:
+            source (str): The expression.
+
+        Returns:
+            list: The tokens, where kind is 'number', 'name' or 'symbol'.
+
+        Raises:
+            ExpressionError: If the expression contains an unknown character.
+        """
+        tokens = []
+        position = 0
+        source = source.rstrip()
+        while position < len(source):
+            match = self._token.match(source, position)
+            if match is None:
+                raise ExpressionError(f"Unexpected '{source[position:].lstrip()[0]}' at position {position}.")
+            tokens.append((match.lastgroup, match.group(match.lastgroup), match.start(match.lastgroup)))
+            position = match.end()
+        return tokens
+
+    def parse(self, source):
+        """
+        Parses an expression into a tree of tuples.
+
+        The nodes are `('number', value)`, `('name', name)`, `('negate', operand)` and
+        `('apply', operation, left, right)`.
+
+        Args:
+            source (str): The expression.
+
+        Returns:
+            tuple: The root node.
+
+        Raises:
+            ExpressionError: If the expression is not well formed.
+        """
+        tokens = self.tokenize(source)
+        if not tokens:
+            raise ExpressionError("The expression is empty.")
+        try:
+            node, position = self._parse_binary(tokens, 0, 0)
+        except RecursionError:
+            raise ExpressionError("The expression is nested too deeply.") from None
+        if position < len(tokens):
+            raise ExpressionError(f"Unexpected '{tokens[position][1]}' at position {tokens[position][2]}.")
+        return node
+
+    def _parse_binary(self, tokens, position, min_precedence):
+        """
+        Parses operators binding at least as strongly as `min_precedence` (precedence climbing).
+        """
+        left, position = self._parse_unary(tokens, position)
+        while position < len(tokens):
+            kind, text, _ = tokens[position]
+            operation = self.operators.get(text) if kind == 'symbol' else None
+            if operation is None or operation.precedence < min_precedence:
+                break
+            right, position = self._parse_binary(tokens, position + 1, operation.precedence + 1)
+            left = ('apply', operation, left, right)
+        return left, position
+
+    def _parse_unary(self, tokens, position):
+        """
+        Parses a number, a variable, a parenthesized expression or a unary minus or plus.
+        """
+        if position >= len(tokens):
+            raise ExpressionError("Unexpected end of expression.")
+        kind, text, offset = tokens[position]
+        if kind == 'number':
+            return ('number', float(text)), position + 1
+        if kind == 'name':
+            return ('name', text), position + 1
+        if text in ('-', '+'):
+            operand, position = self._parse_unary(tokens, position + 1)
+            return (('negate', operand) if text == '-' else operand), position
+        if text == '(':
+            node, position = self._parse_binary(tokens, position + 1, 0)
+            if position >= len(tokens) or tokens[position][1] != ')':
+                raise ExpressionError(f"Missing ')' for the '(' at position {offset}.")
+            return node, position + 1
+        raise ExpressionError(f"Unexpected '{text}' at position {offset}.")
+
+    def _compile(self, source):
+        """
+        Parses an expression and compiles it to a Python function; see `compile`.
+
+        Expressions nested too deeply for the Python compiler, such as a sum of a few
+        hundred terms, are compiled to a postfix program run by a loop instead.
+
+        Args:
+            source (str): The expression.
+
+        Returns:
+            CompiledExpression: The compiled expression.
+
+        Raises:
+            ExpressionError: If the expression is not well formed.
+        """
+        tree = self.parse(source)
+        variables = set()
+        operations = []
+
+        def generate(node):
+            kind = node[0]
+            if kind == 'number':
+                # Literals too large for a float overflow to infinity, which has no literal
+                return repr(node[1]) if math.isfinite(node[1]) else '1e999'
+            if kind == 'name':
+                variables.add(node[1])
+                return f"v[{node[1]!r}]"
+            if kind == 'negate':
+                return f"(-{generate(node[1])})"
+            operations.append(node[1])
+            index = len(operations) - 1
+            return f"f[{index}]({generate(node[2])}, {generate(node[3])})"
+
+        try:
+            # Only numbers, identifiers and operation calls reach the generated code
+            code = f"lambda v, f: {generate(tree)}"
+            function = eval(compile(code, '<expression>', 'eval'), {'__builtins__': {}})  # pylint: disable=eval-used
+        except (SyntaxError, RecursionError, MemoryError):
+            variables.clear()
+            operations.clear()
+            function = self._postfix(tree, variables, operations)
+        return CompiledExpression(source, variables, tuple(operations), function)
+
+    @staticmethod
+    def _postfix(tree, variables, operations):
+        """
+        Compiles a tree to a function running it as a postfix program, without recursion.
+
+        Args:
+            tree (tuple): The root node.
+            variables (set): Receives the names of the variables in the tree.
+            operations (list): Receives the operations the function calls, by call index.
+
+        Returns:
+            callable: A function with the signature of the generated ones.
+        """
+        # Visiting the root, then the right and the left operand, gives the postfix order reversed
+        program = []
+        pending = [tree]
+        while pending:
+            node = pending.pop()
+            kind = node[0]
+            if kind == 'apply':
+                operations.append(node[1])
+                program.append(('apply', len(operations) - 1))
+                pending.extend((node[2], node[3]))
+            elif kind == 'negate':
+                program.append(('negate', None))
+                pending.append(node[1])
+            else:
+                if kind == 'name':
+                    variables.add(node[1])
+                program.append(node)
+        program.reverse()
+
+        def function(v, f):
+            stack = []
+            for kind, argument in program:
+                if kind == 'number':
+                    stack.append(argument)
+                elif kind == 'name':
+                    stack.append(v[argument])
+                elif kind == 'negate':
+                    stack[-1] = -stack[-1]
+                else:
+                    right = stack.pop()
+                    stack[-1] = f[argument](stack[-1], right)
+            return stack[0]
+        return function
@@ -0,0 +1,93 @@
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt  # type: ignore # pylint: disable=import-error
+
+class FileLock:
+    """
+    Advisory lock on a file, shared by the threads of this process and by other processes.
+
+    The lock is taken on a separate lock file rather than on the file it protects, so the
+    protected file can be replaced by an atomic rename while the lock is held. It is
+    reentrant: a thread holding the lock may take it again, and the lock on the file is only
+    released once it has been released as many times as it was taken. The lock file stays open
+    between acquisitions, so taking the lock costs a single system call.
+
+    Attributes:
+        path (str): Path of the lock file, created on first use.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes the FileLock without creating the lock file.
+
+        Args:
+            path (str): Path of the lock file, such as the protected file's path plus `.lock`.
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self):
+        """
+        Takes the lock, waiting for other threads and processes holding it to release it.
+        """
+        self._lock.acquire()
+        if self._depth == 0:
+            try:
+                if self._fd is None:
+                    self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_EX)
+                else:
+                    self._lock_windows()
+            except OSError:
+                self._lock.release()
+                raise
+        self._depth += 1
+
+    def _lock_windows(self):
+        """
+        Locks the first byte of the lock file, retrying until it is released by other processes.
+        """
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue  # LK_LOCK gives up after 10 seconds
+
+    def release(self):
+        """
+        Releases the lock taken by the calling thread.
+        """
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        self._lock.release()
+
+    def close(self):
+        """
+        Closes the lock file. The lock is opened again if it is taken afterwards.
+        """
+        with self._lock:
+            if self._fd is not None and self._depth == 0:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
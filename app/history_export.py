@@ -0,0 +1,269 @@
+import csv
+import json
+import logging
+import os
+import struct
+import sys
+from array import array
+from itertools import chain, islice
+from app.history_manager import HistoryManager
+
+COLUMNS = HistoryManager.COLUMNS
+
+# Export formats by file extension
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.cols': 'columnar'}
+
+# A columnar file starts with COLUMNAR_MAGIC, followed by row groups. Each row group is a
+# ROW_GROUP header (number of rows, size of the operation names), the operation names joined by
+# newlines, one uint16 code per row indexing the names, and then the num1, num2 and result
+# columns as little-endian float64 values.
+COLUMNAR_MAGIC = b'CALCCOL1'
+ROW_GROUP = struct.Struct('<II')
+
+
+def detect_format(path, history_format=None):
+    """
+    Returns the export format of a file, given explicitly or told from its extension.
+
+    Args:
+        path (str): Path of the file.
+        history_format (str, optional): The format: 'csv', 'jsonl' or 'columnar'.
+
+    Returns:
+        str: The format.
+
+    Raises:
+        ValueError: If the format is unknown or cannot be told from the extension.
+    """
+    if history_format is None:
+        history_format = FORMATS.get(os.path.splitext(path)[1].lower())
+        if history_format is None:
+            raise ValueError(f"Cannot tell the history format of '{path}'; use a .csv, .jsonl or .cols file.")
+    if history_format not in FORMATS.values():
+        raise ValueError(f"Unknown history format: {history_format}")
+    return history_format
+
+
+def parse_record(values):
+    """
+    Converts `[operation, num1, num2, result]` values into a record.
+
+    Args:
+        values (sequence): The four values of the record.
+
+    Returns:
+        list or None: The record, or None if the values are malformed.
+    """
+    try:
+        operation, num1, num2, result = values
+        return [str(operation), float(num1), float(num2), float(result)]
+    except (TypeError, ValueError):
+        logging.warning("Skipping malformed history record: %s", values)
+        return None
+
+
+def _chunks(values, chunk_size):
+    """
+    Parses an iterable of record values into chunks of at most `chunk_size` records.
+    """
+    values = iter(values)
+    while True:
+        batch = list(islice(values, chunk_size))
+        if not batch:
+            return
+        chunk = [record for record in map(parse_record, batch) if record is not None]
+        if chunk:
+            yield chunk
+
+
+def _native(column):
+    """
+    Converts a little-endian column read from a file to the byte order of this machine, or back.
+    """
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column
+
+
+def write_csv(chunks, path):
+    """
+    Writes chunks of records to a CSV file under a header row.
+    """
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as export_file:
+        writer = csv.writer(export_file)
+        writer.writerow(COLUMNS)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            count += len(chunk)
+    return count
+
+
+def read_csv(path, chunk_size):
+    """
+    Reads chunks of records from a CSV file. A header row is skipped.
+    """
+    with open(path, newline='', encoding='utf-8') as import_file:
+        reader = csv.reader(import_file)
+        first = next(reader, None)
+        rows = reader if first is None or first == COLUMNS else chain([first], reader)
+        yield from _chunks(rows, chunk_size)
+
+
+def write_jsonl(chunks, path):
+    """
+    Writes chunks of records to a JSON Lines file, one object keyed by column name per record.
+    """
+    count = 0
+    with open(path, 'w', encoding='utf-8') as export_file:
+        for chunk in chunks:
+            export_file.writelines(json.dumps(dict(zip(COLUMNS, record))) + '\n' for record in chunk)
+            count += len(chunk)
+    return count
+
+
+def read_jsonl(path, chunk_size):
+    """
+    Reads chunks of records from a JSON Lines file. Blank lines are skipped.
+    """
+    def values(import_file):
+        for line in import_file:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                yield [record[column] for column in COLUMNS]
+            except (ValueError, TypeError, KeyError):
+                logging.warning("Skipping malformed history line: %s", line.rstrip())
+
+    with open(path, encoding='utf-8') as import_file:
+        yield from _chunks(values(import_file), chunk_size)
+
+
+def write_columnar(chunks, path):
+    """
+    Writes chunks of records to a columnar file, one row group per chunk.
+    """
+    count = 0
+    with open(path, 'wb') as export_file:
+        export_file.write(COLUMNAR_MAGIC)
+        for chunk in chunks:
+            names = {}
+            codes = array('H', (names.setdefault(record[0], len(names)) for record in chunk))
+            names_data = '\n'.join(names).encode('utf-8')
+            export_file.write(ROW_GROUP.pack(len(chunk), len(names_data)))
+            export_file.write(names_data)
+            export_file.write(_native(codes).tobytes())
+            for column in (1, 2, 3):
+                export_file.write(_native(array('d', (record[column] for record in chunk))).tobytes())
+            count += len(chunk)
+    return count
+
+
+def read_columnar(path, chunk_size):
+    """
+    Reads chunks of records from a columnar file, one row group at a time.
+
+    Row groups larger than `chunk_size` are split into several chunks.
+    """
+    with open(path, 'rb') as import_file:
+        if import_file.read(len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+            raise ValueError(f"'{path}' is not a columnar history file.")
+        while True:
+            header = import_file.read(ROW_GROUP.size)
+            if not header:
+                return
+            if len(header) < ROW_GROUP.size:
+                raise ValueError(f"The columnar history file '{path}' is truncated.")
+            rows, names_size = ROW_GROUP.unpack(header)
+            names = import_file.read(names_size).decode('utf-8').split('\n')
+            codes = array('H')
+            columns = [array('d') for _ in range(3)]
+            try:
+                codes.fromfile(import_file, rows)
+                for column in columns:
+                    column.fromfile(import_file, rows)
+            except EOFError:
+                raise ValueError(f"The columnar history file '{path}' is truncated.") from None
+            operations = [names[code] for code in _native(codes)]
+            num1, num2, result = (_native(column) for column in columns)
+            for start in range(0, rows, chunk_size):
+                stop = start + chunk_size
+                yield [list(record) for record in
+                       zip(operations[start:stop], num1[start:stop], num2[start:stop], result[start:stop])]
+
+
+WRITERS = {'csv': write_csv, 'jsonl': write_jsonl, 'columnar': write_columnar}
+READERS = {'csv': read_csv, 'jsonl': read_jsonl, 'columnar': read_columnar}
+
+
+def stream_history(path, history_format=None, chunk_size=10000):
+    """
+    Streams the records of an exported history file in chunks, oldest first.
+
+    At most one chunk (or, for the columnar format, one row group) is held in memory at a
+    time. Malformed records are skipped with a warning.
+
+    Args:
+        path (str): Path of the file.
+        history_format (str, optional): The format of the file. Defaults to the format told
+            from its extension.
+        chunk_size (int): Maximum number of records per chunk.
+
+    Yields:
+        list: Chunks of `[operation, num1, num2, result]` records.
+
+    Raises:
+        ValueError: If the format is unknown or the file is not a valid columnar file.
+    """
+    return READERS[detect_format(path, history_format)](path, chunk_size)
+
+
+def export_history(history_manager, path, history_format=None, chunk_size=10000):
+    """
+    Exports every record of the history to a file, streaming it in chunks.
+
+    Args:
+        history_manager (HistoryManager): The history store to export.
+        path (str): Path of the file to write.
+        history_format (str, optional): 'csv', 'jsonl' or 'columnar'. Defaults to the format
+            told from the file extension.
+        chunk_size (int): Maximum number of records held in memory at a time.
+
+    Returns:
+        int: The number of records exported.
+
+    Raises:
+        ValueError: If the format is unknown.
+    """
+    writer = WRITERS[detect_format(path, history_format)]
+    count = writer(history_manager.iter_records(chunk_size), path)
+    logging.info("Exported %s history records to %s.", count, path)
+    return count
+
+
+def import_history(history_manager, path, history_format=None, chunk_size=10000):
+    """
+    Imports the records of a file into the history, one chunk at a time.
+
+    Each chunk is added with one bulk write, so the history keeps only the records it retains.
+
+    Args:
+        history_manager (HistoryManager): The history store receiving the records.
+        path (str): Path of the file to read.
+        history_format (str, optional): 'csv', 'jsonl' or 'columnar'. Defaults to the format
+            told from the file extension.
+        chunk_size (int): Maximum number of records held in memory at a time.
+
+    Returns:
+        int: The number of records imported.
+
+    Raises:
+        ValueError: If the format is unknown or the file is not a valid columnar file.
+    """
+    count = 0
+    for chunk in stream_history(path, history_format, chunk_size):
+        history_manager.add_records(chunk)
+        count += len(chunk)
+    logging.info("Imported %s history records from %s.", count, path)
+    return count
@@ -1,31 +1,379 @@
-import pandas as pd # type: ignore
+import atexit
+import csv
+import io
+import logging
+import threading
+from collections import OrderedDict
+from fractions import Fraction
+from itertools import islice
 import os
+from app.file_lock import FileLock
+from app.metrics import increment, timed
+
+async def run_in_thread(function, *args):
+    """
+    Runs a blocking function in a worker thread and waits for it without blocking the event loop.
+
+    asyncio is only imported when this function is first called, so it stays out of the
+    application's start-up path.
+
+    Args:
+        function (callable): The blocking function, such as a method writing the history file.
+        *args: Arguments passed to the function.
+
+    Returns:
+        The return value of the function.
+    """
+    import asyncio  # pylint: disable=import-outside-toplevel
+    return await asyncio.to_thread(function, *args)
+
 
 class HistoryManager:
     """
     Manages the history of calculations, stored in a CSV file.
 
+    The retained records are kept in memory, so reading the history never touches the disk.
+    Every record has a stable id, assigned in increasing order, which stays the same when
+    other records are deleted; the retained records are indexed by id, so a record is found
+    and deleted in constant time.
+
+    The file is an append-only log: new records are appended to its end with a single buffered
+    write, as `Id,Operation,Num1,Num2,Result` rows, and a deletion appends a tombstone row
+    holding only the id of the deleted record. Adding or deleting a record therefore costs the
+    same no matter how large the file has grown. The file is trimmed down to the retained
+    records by `compact`, which a background thread runs every `compact_every` appended rows.
+
+    By default every record is written through to the file immediately. When `flush_size` is
+    greater than one or a `flush_interval` is given, records are buffered and written behind
+    by a background thread once the buffer is full or the interval elapses, and on `close`.
+
+    Writes are safe across threads and processes sharing the file. They take an advisory lock
+    on a `.lock` file next to the history file, and a compaction writes a temporary file that
+    atomically replaces the history file. Before writing, records appended by other processes
+    are read into the retained history, so no process drops another's records. Threads
+    flushing at the same time are committed as a group: while one thread writes, the records
+    of the others are queued and then written, and with `durable` synced, all at once.
+
     Attributes:
         file_path (str): Path to the CSV file where history records are stored.
+        max_records (int): Number of most recent records retained in the history.
+        compact_every (int): Number of appended rows after which the file is compacted.
+        flush_size (int): Number of buffered records that triggers a flush.
+        flush_interval (float or None): Maximum number of seconds a record stays buffered.
+        durable (bool): Whether every write is synced to disk with `os.fsync`.
     """
 
-    def __init__(self, file_path='history.csv'):
+    COLUMNS = ['Operation', 'Num1', 'Num2', 'Result']
+    LOG_COLUMNS = ['Id'] + COLUMNS
+
+    def __init__(self, file_path='history.csv', max_records=5, compact_every=None,
+                 flush_size=1, flush_interval=None, durable=False):
         """
         Initializes the HistoryManager with a specified file path for the history file.
-        
-        If the file does not exist, it is created with the required headers.
+
+        If the file does not exist, it is created with the required headers. Otherwise the
+        retained records are loaded into memory once. A file without ids, written before
+        records had them, is rewritten with ids numbering its records from 1.
 
         Args:
             file_path (str): Path to the CSV file for storing calculation history.
+            max_records (int): Number of most recent records to retain.
+            compact_every (int, optional): Number of appended rows between two compactions of the
+                file. Defaults to `max_records` (at least 100), so that the cost of a compaction
+                is spread over as many appends as it rewrites records.
+            flush_size (int): Number of buffered records that triggers a flush.
+            flush_interval (float or None): Seconds after which buffered records are flushed.
+            durable (bool): Whether every write is synced to disk before it returns.
         """
         self.file_path = file_path
-        # Initialize the CSV file with headers if it doesn't exist
-        if not os.path.exists(self.file_path):
-            self.clear_history()  
+        self.max_records = max_records
+        self.compact_every = compact_every if compact_every is not None else max(100, max_records)
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.durable = durable
+        # The columnar store, built on first use, and the positions of the retained records in it
+        self._columnar = None
+        self._positions = {}
+        self._appends_since_compact = 0
+        # The retained records by id, oldest first, and the rows waiting to be written
+        self._records = OrderedDict()
+        self._next_id = 1
+        self._tombstones = set()
+        self._pending = []
+        # Locks are always taken in this order: writes, then the file, then the records
+        self._write_lock = threading.RLock()
+        self._file_lock = FileLock(f"{file_path}.lock")
+        self._lock = threading.RLock()
+        self._file_id = None
+        self._file_fd = None
+        self._file_size = 0
+        self._flush_requested = threading.Event()
+        self._closed = threading.Event()
+        self._flusher = None
+        self._compact_requested = threading.Event()
+        self._compactor = None
+        with self._file_lock:
+            # Initialize the history file if it doesn't exist
+            if not os.path.exists(self.file_path):
+                self.clear_records()
+            else:
+                self._records.update(self._open_existing())
+                self._trim()
+
+        if flush_size > 1 or flush_interval is not None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="history-flusher", daemon=True)
+            self._flusher.start()
+
+    @timed('history_load_seconds', store='csv')
+    def _open_existing(self):
+        """
+        Prepares an existing history file for appending and reads its records.
+
+        A file without ids is rewritten with them.
+
+        Returns:
+            OrderedDict: The retained `[operation, num1, num2, result]` records by id, oldest first.
+        """
+        self._ensure_trailing_newline()
+        with open(self.file_path, newline='') as history_file:
+            header = next(csv.reader(history_file), None)
+        if header == self.COLUMNS:
+            records = self.read_records()[-self.max_records:]
+            self._records = OrderedDict(enumerate(records, start=1))
+            self._next_id = len(records) + 1
+            self._write_file()
+            return self._records
+        records, self._tombstones, last_id = self._read_retained()
+        self._next_id = last_id + 1
+        self._remember_file()
+        return records
+
+    def _ensure_trailing_newline(self):
+        """
+        Makes sure the history file ends with a newline so appended rows start on their own line.
+        """
+        with open(self.file_path, 'rb+') as history_file:
+            history_file.seek(0, os.SEEK_END)
+            if history_file.tell() == 0:
+                return
+            history_file.seek(-1, os.SEEK_END)
+            if history_file.read(1) != b'\n':
+                history_file.write(b'\n')
+
+    def read_records(self):
+        """
+        Reads all records from the history file with the standard csv module.
+
+        Rows that cannot be parsed are skipped, and deleted records are left out. A file
+        without ids is read as well.
+
+        Returns:
+            list: The `[operation, num1, num2, result]` records in the file, oldest first.
+        """
+        with open(self.file_path, newline='') as history_file:
+            reader = csv.reader(history_file)
+            if next(reader, None) == self.COLUMNS:
+                return self._parse_rows(reader)
+            records = OrderedDict()
+            self._replay(self._parse_log(reader), records, set(), limit=None)
+            return list(records.values())
+
+    def _read_retained(self, chunk_size=10000):
+        """
+        Reads the last `max_records` records of the history file, one chunk of rows at a time.
+
+        Returns:
+            tuple: The retained `[operation, num1, num2, result]` records by id, oldest first;
+            the ids of the tombstones in the file; and the largest id in the file.
+        """
+        retained, tombstones, last_id = OrderedDict(), set(), 0
+        with open(self.file_path, newline='') as history_file:
+            reader = csv.reader(history_file)
+            next(reader, None)  # Skip the header
+            for rows in iter(lambda: list(islice(reader, chunk_size)), []):
+                last_id = max(last_id, self._replay(self._parse_log(rows), retained, tombstones, self.max_records))
+        return retained, tombstones, last_id
+
+    @staticmethod
+    def _replay(rows, records, tombstones, limit):
+        """
+        Applies log rows to records by id: a record row adds its record, and a tombstone
+        removes the record it names and is added to `tombstones`.
+
+        Args:
+            rows (list): The `[id, operation, num1, num2, result]` and `[id]` rows, in order.
+            records (OrderedDict): The records by id, updated in place.
+            tombstones (set): The ids of the tombstones, updated in place.
+            limit (int or None): Number of most recent records kept, or None to keep them all.
+
+        Returns:
+            int: The largest id of the rows, or 0 if there are none.
+        """
+        last_id = 0
+        for row in rows:
+            last_id = max(last_id, row[0])
+            if len(row) == 1:
+                records.pop(row[0], None)
+                tombstones.add(row[0])
+            else:
+                records[row[0]] = row[1:]
+                if limit is not None and len(records) > limit:
+                    records.popitem(last=False)
+        return last_id
+
+    @classmethod
+    def _parse_log(cls, rows):
+        """
+        Parses the rows of the history log into `[id, operation, num1, num2, result]` records
+        and `[id]` tombstones, skipping malformed rows.
+        """
+        parsed = []
+        for row in rows:
+            try:
+                record_id = int(row[0])
+            except (IndexError, ValueError):
+                logging.warning("Skipping malformed history row: %s", row)
+                continue
+            if len(row) == 1:
+                parsed.append([record_id])
+            else:
+                parsed.extend([record_id] + record for record in cls._parse_rows([row[1:]]))
+        return parsed
+
+    @staticmethod
+    def _parse_rows(rows):
+        """
+        Parses CSV rows into `[operation, num1, num2, result]` records, skipping malformed rows.
+        """
+        records = []
+        for row in rows:
+            try:
+                operation, num1, num2, result = row
+                records.append([operation, float(num1), float(num2), float(result)])
+            except ValueError:
+                try:
+                    # Exact results of the fraction backend are written as "1/3"
+                    records.append([row[0]] + [float(Fraction(value)) for value in row[1:4]])
+                except (ValueError, ZeroDivisionError):
+                    logging.warning("Skipping malformed history row: %s", row)
+        return records
+
+    def _remember_file(self):
+        """
+        Remembers the identity and size of the history file as last read or written by this process.
+
+        The file is kept open, so that its inode cannot be reused by a file that replaces it.
+        The caller must hold the file lock.
+        """
+        stat = os.stat(self.file_path)
+        if (stat.st_dev, stat.st_ino) != self._file_id:
+            if self._file_fd is not None:
+                os.close(self._file_fd)
+            self._file_fd = os.open(self.file_path, os.O_RDONLY)
+            stat = os.fstat(self._file_fd)
+        self._file_id = (stat.st_dev, stat.st_ino)
+        self._file_size = stat.st_size
+
+    def _refresh(self):
+        """
+        Reads the records and tombstones that other processes have written to the history
+        file since this process last read or wrote it into the retained history.
+
+        The records are placed before the records that this process has not written yet,
+        which are given the next ids if other processes have used theirs. If another process
+        has compacted the file, the retained history is read again from the file. The columnar
+        store, if any, is brought up to date as well; see `_sync_columnar`. The caller must
+        hold the file lock.
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return
+        if (stat.st_dev, stat.st_ino) == self._file_id and stat.st_size == self._file_size:
+            return
+        rows = None
+        if (stat.st_dev, stat.st_ino) != self._file_id:
+            written, tombstones, last_id = self._read_retained()
+        else:
+            with open(self.file_path, newline='') as history_file:
+                history_file.seek(self._file_size)
+                rows = self._parse_log(csv.reader(history_file))
+            written, tombstones = self._records, self._tombstones
+        with self._lock:
+            pending_ids = [row[0] for row in self._pending if len(row) > 1]
+            pending = OrderedDict((record_id, self._records.pop(record_id))
+                                  for record_id in pending_ids if record_id in self._records)
+            if written is self._records:
+                last_id = self._replay(rows, written, tombstones, self.max_records)
+            self._records, self._tombstones = written, tombstones
+            self._next_id = max(self._next_id, last_id + 1)
+            if pending_ids and pending_ids[0] <= last_id:
+                # Another process has written records with the ids of the unwritten ones
+                renumbered = dict(zip(pending_ids, range(last_id + 1, last_id + 1 + len(pending_ids))))
+                self._pending = [[renumbered.get(row[0], row[0])] + row[1:] for row in self._pending]
+                pending = OrderedDict((renumbered[record_id], record) for record_id, record in pending.items())
+                self._next_id = max(self._next_id, last_id + 1 + len(pending_ids))
+                moved = {renumbered[record_id]: self._positions.pop(record_id)
+                         for record_id in pending_ids if record_id in self._positions}
+                self._positions.update(moved)
+            self._records.update(pending)
+            self._trim()
+            self._sync_columnar(rows)
+        self._remember_file()
+
+    def _sync_columnar(self, rows):
+        """
+        Brings the columnar store, if any, up to date with the records and tombstones that
+        other processes have written. The caller must hold the lock.
+
+        Their records are added, stamped with the time they are read, and the records they
+        have deleted are removed. When the file has been compacted, the tombstones are gone:
+        a record that is no longer retained was deleted, unless the history is full and the
+        record is older than every retained one.
+
+        Args:
+            rows (list or None): The rows appended to the file, in order, or None if the
+                retained history was read again from a compacted file.
+        """
+        if self._columnar is None:
+            return
+        if rows is None:
+            first_id = next(iter(self._records), None)
+            full = len(self._records) >= self.max_records
+            for record_id in [record_id for record_id in self._positions if record_id not in self._records]:
+                position = self._positions.pop(record_id)
+                if not full or record_id > first_id:
+                    self._columnar.remove(position)
+            rows = [[record_id] + record for record_id, record in self._records.items()
+                    if record_id not in self._positions]
+        added = []
+        for row in rows + [None]:
+            if row is not None and len(row) > 1:
+                added.append(row)
+                continue
+            if added:
+                self._add_to_columnar([record[0] for record in added], [record[1:] for record in added])
+                added = []
+            if row is not None:
+                position = self._positions.pop(row[0], None)
+                if position is not None:
+                    self._columnar.remove(position)
+
+    def _flush_loop(self):
+        """
+        Background loop that flushes buffered records when requested or when the interval elapses.
+        """
+        while not self._closed.is_set():
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            self.flush()
 
     def add_record(self, operation, num1, num2, result):
         """
-        Adds a new record to the calculation history, maintaining only the last 5 records.
+        Adds a new record to the calculation history.
+
+        The record is kept in memory and appended to the end of the file without reading it
+        back, either immediately or by the background flusher when write-behind is enabled.
 
         Args:
             operation (str): The operation performed (e.g., "Add", "Multiply").
@@ -33,69 +381,536 @@ class HistoryManager:
             num2 (float): The second number in the calculation.
             result (float): The result of the calculation.
         """
-        df = self.load_history()
-        new_record = pd.DataFrame([{
-            'Operation': operation,
-            'Num1': num1,
-            'Num2': num2,
-            'Result': result
-        }])
-        
-        # Ensure non-empty DataFrames to prevent warnings in future Pandas versions
-        if not df.empty:
-            df = pd.concat([df, new_record], ignore_index=True).tail(5)
-        else:
-            df = new_record  # Initialize df if empty
+        if self._enqueue([[operation, num1, num2, result]]):
+            self.flush()
+
+    async def add_record_async(self, operation, num1, num2, result):
+        """
+        Adds a new record to the calculation history without blocking the event loop.
+
+        Like `add_record`, but a write-through flush runs in a worker thread, so other tasks
+        of the event loop keep running while the file is written.
+
+        Args:
+            operation (str): The operation performed (e.g., "Add", "Multiply").
+            num1 (float): The first number in the calculation.
+            num2 (float): The second number in the calculation.
+            result (float): The result of the calculation.
+        """
+        if self._enqueue([[operation, num1, num2, result]]):
+            await run_in_thread(self.flush)
+
+    def add_records(self, records):
+        """
+        Adds many records to the calculation history in one step.
+
+        Only the records that fit in the retained history are kept, since older ones would be
+        dropped by the next compaction anyway. They are flushed with a single write.
+
+        Args:
+            records (list): A list of `[operation, num1, num2, result]` records, oldest first.
+        """
+        retained = [list(record) for record in records[-self.max_records:]]
+        if retained and self._enqueue(retained, signal=True):
+            self.flush()
+
+    async def add_records_async(self, records):
+        """
+        Adds many records to the calculation history in one step without blocking the event loop.
+
+        Like `add_records`, but a write-through flush runs in a worker thread.
+
+        Args:
+            records (list): A list of `[operation, num1, num2, result]` records, oldest first.
+        """
+        retained = [list(record) for record in records[-self.max_records:]]
+        if retained and self._enqueue(retained, signal=True):
+            await run_in_thread(self.flush)
+
+    def _enqueue(self, records, signal=False):
+        """
+        Adds records to the retained history and to the buffer of records to write.
+
+        The background flusher, if any, is woken up when the buffer is full or `signal` is set.
+
+        Args:
+            records (list): The `[operation, num1, num2, result]` records, oldest first.
+            signal (bool): Whether to wake up the background flusher in any case.
+
+        Returns:
+            bool: True if the caller must flush the records itself, as there is no flusher.
+        """
+        with self._lock:
+            first_id = self._next_id
+            self._next_id += len(records)
+            self._records.update(zip(range(first_id, self._next_id), records))
+            self._trim()
+            self._pending.extend([record_id] + record for record_id, record in enumerate(records, start=first_id))
+            self._add_to_columnar(range(first_id, self._next_id), records)
+            buffer_full = len(self._pending) >= self.flush_size
+
+        if self._flusher is None:
+            return True
+        if buffer_full or signal:
+            self._flush_requested.set()
+        return False
+
+    def _add_to_columnar(self, ids, records):
+        """
+        Adds records to the columnar store, if any, stamped with the current time, and
+        remembers their positions by id. The caller must hold the lock.
+
+        The positions of the records that are no longer retained, which can no longer be
+        removed, are dropped once they make up half of the positions.
+        """
+        if self._columnar is None:
+            return
+        position = self._columnar.add_records(records)
+        self._positions.update(zip(ids, range(position, position + len(records))))
+        if len(self._positions) > 2 * len(self._records) + 1024:
+            self._positions = {record_id: self._positions[record_id]
+                               for record_id in self._records if record_id in self._positions}
+
+    def _trim(self):
+        """
+        Drops the oldest retained records beyond `max_records`. The caller must hold the lock.
+        """
+        while len(self._records) > self.max_records:
+            self._records.popitem(last=False)
+
+    @timed('history_flush_seconds', store='csv')
+    def flush(self):
+        """
+        Appends all buffered records to the history file with a single write.
+
+        Records buffered by other threads while a flush is writing are appended together by
+        the next flush (group commit), so concurrent writers share one write and one sync.
+        Once `compact_every` rows have been appended since the last compaction, the background
+        compactor is asked to compact the file down to the retained records.
+        """
+        with self._write_lock:
+            with self._file_lock:
+                self._refresh()
+                with self._lock:
+                    batch, self._pending = self._pending, []
+                if not batch:
+                    return
+                data = io.StringIO()
+                csv.writer(data).writerows(batch)
+                fd = os.open(self.file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+                try:
+                    os.write(fd, data.getvalue().encode('utf-8'))
+                    if self.durable:
+                        os.fsync(fd)
+                finally:
+                    os.close(fd)
+                self._remember_file()
+                increment('history_records_written_total', len(batch), store='csv')
+                self._appends_since_compact += len(batch)
+                if self._appends_since_compact >= self.compact_every:
+                    self._request_compaction()
+
+    def _request_compaction(self):
+        """
+        Wakes up the background compactor, starting it on first use. Once the manager is
+        closed, the file is left to be compacted by the next manager.
+        """
+        if self._closed.is_set():
+            return
+        if self._compactor is None:
+            self._compactor = threading.Thread(target=self._compact_loop, name="history-compactor", daemon=True)
+            self._compactor.start()
+        self._compact_requested.set()
 
-        df.to_csv(self.file_path, index=False)
+    def _compact_loop(self):
+        """
+        Background loop that compacts the history file when requested, until closed.
+        """
+        while True:
+            self._compact_requested.wait()
+            self._compact_requested.clear()
+            if self._closed.is_set():
+                return
+            try:
+                self.compact()
+            except OSError as e:
+                logging.error("Failed to compact the history file %s: %s", self.file_path, e)
+
+    def close(self):
+        """
+        Stops the background flusher and compactor, if any, and flushes all buffered records.
+        """
+        self._closed.set()
+        if self._flusher is not None:
+            self._flush_requested.set()
+            self._flusher.join()
+            self._flusher = None
+        if self._compactor is not None:
+            self._compact_requested.set()
+            self._compactor.join()
+            self._compactor = None
+        self.flush()
+        with self._file_lock:
+            if self._file_fd is not None:
+                os.close(self._file_fd)
+                self._file_fd = None
+                self._file_id = None
+        self._file_lock.close()
+
+    def load_history(self, offset=0, limit=None):
+        """
+        Returns the retained calculation history from memory, or one page of it.
+
+        Args:
+            offset (int): Index of the first record to return.
+            limit (int, optional): Maximum number of records to return. Defaults to all
+                records from `offset` on.
+
+        Returns:
+            list: The records as dictionaries keyed by column name, oldest first.
+        """
+        with self._lock:
+            stop = None if limit is None else offset + limit
+            return [dict(zip(self.COLUMNS, record)) for record in islice(self._records.values(), offset, stop)]
+
+    def record_ids(self, offset=0, limit=None):
+        """
+        Returns the ids of the retained records, or of one page of them, like `load_history`.
+
+        Args:
+            offset (int): Index of the first record.
+            limit (int, optional): Maximum number of ids to return.
+
+        Returns:
+            list: The ids, oldest first.
+        """
+        with self._lock:
+            stop = None if limit is None else offset + limit
+            return list(islice(self._records, offset, stop))
+
+    def count_records(self):
+        """
+        Returns the number of records in the retained history.
+        """
+        with self._lock:
+            return len(self._records)
+
+    def iter_records(self, chunk_size=10000):
+        """
+        Streams the retained records in chunks, oldest first.
+
+        Like the ring and SQLite stores, this leaves out the records that the history no
+        longer retains but that the file still holds until its next compaction. Records
+        appended by other processes are read first, and the records are those retained at
+        that moment: records added afterwards are not part of the stream.
+
+        Args:
+            chunk_size (int): Maximum number of records per chunk.
+
+        Yields:
+            list: Chunks of `[operation, num1, num2, result]` records.
+        """
+        with self._write_lock, self._file_lock:
+            self.flush()
+            with self._lock:
+                records = list(self._records.values())
+        for start in range(0, len(records), chunk_size):
+            yield [list(record) for record in records[start:start + chunk_size]]
+
+    def to_dataframe(self):
+        """
+        Returns the retained calculation history as a pandas DataFrame for analysis.
+
+        pandas is only imported when this method is first called, so it stays out of the
+        application's start-up path.
+
+        Returns:
+            DataFrame: A DataFrame containing the last `max_records` calculation history records.
+        """
+        import pandas as pd  # type: ignore # pylint: disable=import-outside-toplevel
+        with self._lock:
+            return pd.DataFrame(list(self._records.values()), columns=self.COLUMNS)
+
+    def columnar(self):
+        """
+        Returns the columnar store of the history, built from the retained records on first use.
+
+        The store holds the records retained when it is built, and every record added since,
+        by this process or by others writing the file, even those that the retained history
+        has dropped. It is kept in memory at about 35 bytes per record. NumPy is only imported
+        when this method is first called.
+
+        The CSV and ring buffer files do not keep the time a record was added, so the records
+        retained when the store is built have no time. Time windows therefore only cover the
+        records added during this session; the SQLite store keeps the time of every record.
+
+        Returns:
+            ColumnarHistory: The columnar store.
+        """
+        with self._write_lock, self._file_lock, self._lock:
+            # Flushing reads the records of other processes into the store, if built
+            self.flush()
+            if self._columnar is None:
+                from app.columnar_history import ColumnarHistory  # pylint: disable=import-outside-toplevel
+                self._columnar = ColumnarHistory(capacity=max(1024, len(self._records)))
+                if self._records:
+                    self._columnar.add_columns(*zip(*self._records.values()), self._record_times())
+                self._positions = {record_id: position for position, record_id in enumerate(self._records)}
+            return self._columnar
+
+    def _record_times(self):
+        """
+        Returns the time every retained record was added, oldest first, or None when the
+        store does not keep it, as the CSV file does not. The caller must hold the lock.
+        """
+        return None
+
+    def history_stats(self, operation=None, since=None, until=None):
+        """
+        Returns the count, sum, mean, minimum and maximum of the results of every operation.
+
+        Args:
+            operation (str, optional): Only this operation. Defaults to every operation.
+            since (float, optional): Only records added at or after this time, in seconds since
+                the epoch. Records that have no time, see `columnar`, are left out.
+            until (float, optional): Only records added before this time.
+
+        Returns:
+            dict: The statistics of every operation, keyed by operation name; see
+            `ColumnarHistory.aggregate`.
+        """
+        return self.columnar().aggregate(operation, since, until)
+
+    @staticmethod
+    def format_stats(stats):
+        """
+        Formats the statistics returned by `history_stats` as a table.
+
+        Returns:
+            list: The lines of the table, or a single line saying that no records match.
+        """
+        if not stats:
+            return ["No matching records."]
+        lines = ["History Statistics:",
+                 f"{'Operation':<10} {'Count':>8} {'Sum':>12} {'Mean':>12} {'Min':>12} {'Max':>12}"]
+        for operation, values in stats.items():
+            lines.append(f"{operation:<10} {values['count']:>8} {values['sum']:>12.6g} {values['mean']:>12.6g}"
+                         f" {values['min']:>12.6g} {values['max']:>12.6g}")
+        return lines
+
+    @timed('history_compact_seconds', store='csv')
+    def compact(self):
+        """
+        Rewrites the history file so that it only holds the retained records, without
+        tombstones.
+
+        Buffered records are part of the retained records, so they are written as well. The
+        records keep their ids.
+        """
+        with self._write_lock, self._file_lock, self._lock:
+            self._refresh()
+            self._write_file()
+
+    def _write_file(self):
+        """
+        Writes the retained records to a temporary file that then replaces the history file,
+        so readers never see a partly written history. The caller must hold the locks.
+        """
+        temp_path = f"{self.file_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', newline='') as history_file:
+            writer = csv.writer(history_file)
+            writer.writerow(self.LOG_COLUMNS)
+            writer.writerows([record_id] + record for record_id, record in self._records.items())
+            if self.durable:
+                history_file.flush()
+                os.fsync(history_file.fileno())
+        os.replace(temp_path, self.file_path)
+        self._remember_file()
+        self._pending = []
+        self._tombstones = set()
+        self._appends_since_compact = 0
 
-    def load_history(self):
+    def format_history(self, count=None, offset=None, limit=None):
         """
-        Loads calculation history from the CSV file.
+        Formats the history of calculations, or one page of it, as a table.
+
+        Only the records on the page are formatted, so a page costs the same however long
+        the history is. Every record is shown with its id, which `delete_record` takes.
+
+        Args:
+            count (int, optional): Number of most recent records to include. Defaults to all
+                retained records.
+            offset (int, optional): Index of the first record to include, instead of `count`.
+            limit (int, optional): Maximum number of records to include.
 
         Returns:
-            DataFrame: A DataFrame containing the calculation history records.
+            list: The lines of the table, or a single line saying that no history is available.
+                A page that is not the whole history ends with a line saying which records
+                are shown.
         """
-        if os.path.exists(self.file_path):
-            return pd.read_csv(self.file_path)
-        # Return an empty DataFrame with specified columns if file doesn't exist
-        return pd.DataFrame(columns=['Operation', 'Num1', 'Num2', 'Result'])
+        total = self.count_records()
+        if offset is None:
+            offset = 0 if count is None else max(0, total - count)
+        with self._lock:
+            records = self.load_history(offset, limit)
+            ids = self.record_ids(offset, limit)
+        if not records:
+            return ["No history available."]
+        lines = ["Calculation History:",
+                 f"{'ID':>5}  {'Operation':<10} {'Num1':>12} {'Num2':>12} {'Result':>12}"]
+        for record_id, record in zip(ids, records):
+            lines.append(f"{record_id:>5}  {record['Operation']:<10} {record['Num1']:>12} {record['Num2']:>12} {record['Result']:>12}")
+        if limit is not None and len(records) < total:
+            lines.append(f"Records {offset} to {offset + len(records) - 1} of {total}.")
+        return lines
 
-    def show_history(self):
+    def show_history(self, count=None, offset=None, limit=None):
         """
-        Displays the history of calculations.
+        Displays the history of calculations, or one page of it.
 
-        Prints the contents of the history file if it exists; otherwise, 
+        Prints the retained records if there are any; otherwise,
         it displays a message indicating no history is available.
+
+        Args:
+            count (int, optional): Number of most recent records to display. Defaults to all
+                retained records.
+            offset (int, optional): Index of the first record to display, instead of `count`.
+            limit (int, optional): Maximum number of records to display.
         """
-        df = self.load_history()
-        if df.empty:
-            print("No history available.")
-        else:
-            print("Calculation History:\n", df)
+        print("\n".join(self.format_history(count, offset, limit)))
+
+    def clear_records(self):
+        """
+        Removes all records from the calculation history and the history file.
+        """
+        with self._write_lock, self._file_lock, self._lock:
+            self._refresh()
+            self._records.clear()
+            if self._columnar is not None:
+                self._columnar.clear()
+                self._positions = {}
+            self.compact()
 
     def clear_history(self):
         """
         Clears all records from the calculation history.
 
-        Overwrites the history file with an empty DataFrame containing only headers.
+        Overwrites the history file with one containing only headers.
         """
-        pd.DataFrame(columns=['Operation', 'Num1', 'Num2', 'Result']).to_csv(self.file_path, index=False)
+        self.clear_records()
         print("History cleared.")
 
-    def delete_record(self, index):
+    async def clear_history_async(self):
+        """
+        Clears all records from the calculation history, rewriting the file in a worker thread.
+        """
+        await run_in_thread(self.clear_records)
+
+    def remove_record(self, record_id):
+        """
+        Removes a specific record from the history by id.
+
+        The record is looked up in the index of the retained records, and a tombstone is
+        appended to the history file, so removing a record costs the same however long the
+        history is.
+
+        Args:
+            record_id (int): The id of the record to remove.
+
+        Returns:
+            bool: True if the record was removed; False if no retained record has that id.
+        """
+        with self._write_lock, self._file_lock, self._lock:
+            self._refresh()
+            if record_id not in self._records:
+                return False
+            self._forget(record_id)
+            self._tombstones.add(record_id)
+            self._pending.append([record_id])
+            self.flush()
+            return True
+
+    def _forget(self, record_id):
         """
-        Deletes a specific record from the history by index.
+        Removes a retained record from memory and from the columnar store, if any. The caller
+        must hold the lock.
+        """
+        position = self._positions.pop(record_id, None)
+        if position is not None:
+            self._columnar.remove(position)
+        del self._records[record_id]
+
+    def delete_record(self, record_id):
+        """
+        Deletes a specific record from the history by id.
 
         Args:
-            index (int): The index of the record to delete.
+            record_id (int): The id of the record to delete, as shown by `show_history`.
 
-        Prints a confirmation if the record is deleted or an error message if the index is invalid.
+        Prints a confirmation if the record is deleted or an error message if the id is invalid.
         """
-        df = self.load_history()
-        if 0 <= index < len(df):
-            df = df.drop(index).reset_index(drop=True)
-            df.to_csv(self.file_path, index=False)
-            print(f"Record {index} deleted.")
+        if self.remove_record(record_id):
+            print(f"Record {record_id} deleted.")
         else:
-            print("Invalid record index.")
+            print("Invalid record ID.")
+
+    async def delete_record_async(self, record_id):
+        """
+        Deletes a specific record from the history by id, writing the file in a worker thread.
+
+        Args:
+            record_id (int): The id of the record to delete.
+
+        Returns:
+            bool: True if the record was deleted; False if the id is invalid.
+        """
+        return await run_in_thread(self.remove_record, record_id)
+
+    async def flush_async(self):
+        """
+        Writes all buffered records in a worker thread, without blocking the event loop.
+        """
+        await run_in_thread(self.flush)
+
+
+_shared_history_manager = None
+
+
+def get_history_manager():
+    """
+    Returns the process-wide history manager shared by all commands.
+
+    The manager is created with default settings on first use unless one has already been
+    set up with `configure_history_manager`.
+
+    Returns:
+        HistoryManager: The shared history manager.
+    """
+    if _shared_history_manager is None:
+        return configure_history_manager()
+    return _shared_history_manager
+
+
+def configure_history_manager(manager_class=None, **kwargs):
+    """
+    Replaces the process-wide history manager with one built from the given settings.
+
+    The previous manager, if any, is closed so that none of its buffered records are lost.
+    The new manager is also closed when the interpreter exits.
+
+    Args:
+        manager_class (type, optional): The history manager class to instantiate, such as a
+            `HistoryManager` subclass with another storage format. Defaults to `HistoryManager`.
+        **kwargs: Keyword arguments passed to the history manager class.
+
+    Returns:
+        HistoryManager: The new shared history manager.
+    """
+    global _shared_history_manager  # pylint: disable=global-statement
+    if _shared_history_manager is not None:
+        _shared_history_manager.close()
+        atexit.unregister(_shared_history_manager.close)
+    manager_class = manager_class if manager_class is not None else HistoryManager
+    _shared_history_manager = manager_class(**kwargs)
+    atexit.register(_shared_history_manager.close)
+    return _shared_history_manager
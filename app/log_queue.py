@@ -0,0 +1,57 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+
+_listener = None
+_logger = None
+_queue_handler = None
+
+
+def start_queue_logging(logger=None):
+    """
+    Moves the handlers of a logger behind a queue so that logging calls never block on I/O.
+
+    The logger's handlers (for example the rotating file handler and console handler from
+    `logging.conf`) are replaced by a single QueueHandler. A QueueListener thread takes the
+    records off the queue and passes them to the original handlers, so file and console
+    writes happen off the calling thread. Any listener started earlier is stopped first.
+
+    Args:
+        logger (logging.Logger, optional): The logger to reconfigure. Defaults to the root logger.
+
+    Returns:
+        logging.handlers.QueueListener: The running listener.
+    """
+    global _listener, _logger, _queue_handler  # pylint: disable=global-statement
+    stop_queue_logging()
+    _logger = logger if logger is not None else logging.getLogger()
+    handlers = list(_logger.handlers)
+    log_queue = queue.SimpleQueue()
+    for handler in handlers:
+        _logger.removeHandler(handler)
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    _logger.addHandler(_queue_handler)
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_queue_logging)
+    return _listener
+
+
+def stop_queue_logging():
+    """
+    Stops the running QueueListener, if any, after it has handled every queued record.
+
+    The original handlers are put back on the logger, so records logged afterwards are
+    still handled, synchronously.
+    """
+    global _listener, _logger, _queue_handler  # pylint: disable=global-statement
+    if _listener is None:
+        return
+    _listener.stop()
+    if _queue_handler in _logger.handlers:
+        _logger.removeHandler(_queue_handler)
+        for handler in _listener.handlers:
+            _logger.addHandler(handler)
+    _listener = _logger = _queue_handler = None
+    atexit.unregister(stop_queue_logging)
@@ -0,0 +1,439 @@
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+# Upper bounds of the latency buckets, in seconds, from 1 microsecond to 10 seconds
+BUCKETS = tuple(float(f'{mantissa}e{exponent}') for exponent in range(-6, 1) for mantissa in (1, 2.5, 5)) + (10.0,)
+
+# Metric file formats by file extension
+FORMATS = {'.prom': 'prometheus', '.txt': 'prometheus', '.json': 'json'}
+
+# Prefix of the metric names in the Prometheus text format
+PREFIX = 'calculator_'
+
+
+class Counter:
+    """
+    A count that only goes up, such as the number of history records written.
+
+    Attributes:
+        value (int): The current count.
+    """
+
+    def __init__(self):
+        """
+        Initializes the Counter at zero.
+        """
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        """
+        Adds to the count.
+
+        Args:
+            amount (int): The amount added.
+        """
+        with self._lock:
+            self.value += amount
+
+
+class Timer:
+    """
+    A histogram of durations, such as the latencies of one command.
+
+    Every observation is counted in the first bucket whose upper bound it does not exceed, so
+    recording one costs a binary search over a fixed list of bounds and no allocation; the
+    number of observations is the sum of the buckets. Percentiles are estimated as the upper
+    bound of the bucket they fall in.
+
+    Attributes:
+        total (float): Sum of the durations observed, in seconds.
+        maximum (float): Longest duration observed, or 0.0.
+        buckets (list): Number of durations per bucket of `BUCKETS`, and above the last bound.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty Timer.
+        """
+        self.total = 0.0
+        self.maximum = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self._lock = threading.Lock()
+
+    @property
+    def count(self):
+        """
+        Number of durations observed.
+        """
+        return sum(self.buckets)
+
+    def observe(self, seconds):
+        """
+        Records a duration.
+
+        Args:
+            seconds (float): The duration, in seconds.
+        """
+        index = bisect_left(BUCKETS, seconds)
+        with self._lock:
+            self.buckets[index] += 1
+            self.total += seconds
+            if seconds > self.maximum:
+                self.maximum = seconds
+
+    def percentile(self, fraction):
+        """
+        Estimates a percentile of the durations observed.
+
+        Args:
+            fraction (float): The percentile as a fraction, such as 0.99.
+
+        Returns:
+            float or None: The estimate in seconds, never above the longest duration, or None
+            if nothing was observed.
+        """
+        with self._lock:
+            count = sum(self.buckets)
+            if not count:
+                return None
+            rank = fraction * count
+            seen = 0
+            for index, bucket in enumerate(self.buckets):
+                seen += bucket
+                if seen >= rank and bucket:
+                    break
+            bound = BUCKETS[index] if index < len(BUCKETS) else self.maximum
+            return min(bound, self.maximum)
+
+    def summary(self):
+        """
+        Returns the count, mean, p50, p99 and maximum of the durations, in seconds.
+        """
+        with self._lock:
+            count, total, maximum = sum(self.buckets), self.total, self.maximum
+        return {'count': count, 'mean': total / count if count else None,
+                'p50': self.percentile(0.5), 'p99': self.percentile(0.99), 'max': maximum if count else None}
+
+
+class MetricsRegistry:
+    """
+    The counters and timers of the application, each identified by a name and labels.
+
+    Metrics are created on first use, so instrumented code does not declare them up front.
+    The registry can be written out in the Prometheus text format or as JSON.
+
+    Attributes:
+        started (float): `time.time()` when the registry was created.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty MetricsRegistry.
+        """
+        self.started = time.time()
+        self._counters = {}
+        self._timers = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, **labels):
+        """
+        Returns the counter with a name and labels, creating it on first use.
+
+        Args:
+            name (str): The metric name, such as 'history_records_written_total'.
+            **labels: The labels of the metric, such as `store='csv'`.
+
+        Returns:
+            Counter: The counter.
+        """
+        key = _metric_key(name, labels)
+        counter = self._counters.get(key)
+        if counter is None:
+            with self._lock:
+                counter = self._counters.setdefault(key, Counter())
+        return counter
+
+    def timer(self, name, **labels):
+        """
+        Returns the timer with a name and labels, creating it on first use.
+
+        Args:
+            name (str): The metric name, such as 'command_seconds'.
+            **labels: The labels of the metric, such as `command='greet'`.
+
+        Returns:
+            Timer: The timer.
+        """
+        return self.timer_for_key(_metric_key(name, labels))
+
+    def timer_for_key(self, key):
+        """
+        Returns the timer with a `(name, sorted label items)` key, creating it on first use.
+        """
+        timer = self._timers.get(key)
+        if timer is None:
+            with self._lock:
+                timer = self._timers.setdefault(key, Timer())
+        return timer
+
+    def counters(self):
+        """
+        Returns the `(name, labels, counter)` of every counter, sorted by name and labels.
+        """
+        with self._lock:
+            items = sorted(self._counters.items())
+        return [(name, dict(labels), counter) for (name, labels), counter in items]
+
+    def timers(self):
+        """
+        Returns the `(name, labels, timer)` of every timer, sorted by name and labels.
+        """
+        with self._lock:
+            items = sorted(self._timers.items())
+        return [(name, dict(labels), timer) for (name, labels), timer in items]
+
+    def clear(self):
+        """
+        Removes every metric.
+        """
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    def format_stats(self):
+        """
+        Formats the metrics as a table for display, one line per metric.
+
+        Returns:
+            list: The lines of the table.
+        """
+        timers = self.timers()
+        counters = self.counters()
+        if not timers and not counters:
+            return ["No metrics recorded yet."]
+        lines = []
+        if timers:
+            lines.append(f"{'Timer':<44} {'Count':>8} {'Mean':>10} {'p50':>10} {'p99':>10} {'Max':>10}")
+            for name, labels, timer in timers:
+                summary = timer.summary()
+                lines.append(f"{_display_name(name, labels):<44} {summary['count']:>8} "
+                             + " ".join(f"{_format_seconds(summary[field]):>10}"
+                                        for field in ('mean', 'p50', 'p99', 'max')))
+        if counters:
+            lines.append(f"{'Counter':<44} {'Value':>8}")
+            lines.extend(f"{_display_name(name, labels):<44} {counter.value:>8}"
+                         for name, labels, counter in counters)
+        return lines
+
+    def to_prometheus(self):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+
+        Timers are histograms in seconds, with cumulative `_bucket` series and `_sum` and
+        `_count` series; every name carries the `calculator_` prefix.
+
+        Returns:
+            str: The text, ending with a newline.
+        """
+        lines = []
+        declared = set()
+        for name, labels, counter in self.counters():
+            if name not in declared:
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+                declared.add(name)
+            lines.append(f"{PREFIX}{name}{_prometheus_labels(labels)} {counter.value}")
+        for name, labels, timer in self.timers():
+            if name not in declared:
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                declared.add(name)
+            with timer._lock:  # pylint: disable=protected-access
+                buckets, total = list(timer.buckets), timer.total
+            count = sum(buckets)
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS + (float('inf'),), buckets):
+                cumulative += bucket
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{PREFIX}{name}_bucket{_prometheus_labels(labels, le=le)} {cumulative}")
+            lines.append(f"{PREFIX}{name}_sum{_prometheus_labels(labels)} {total!r}")
+            lines.append(f"{PREFIX}{name}_count{_prometheus_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self):
+        """
+        Returns the metrics as a JSON-serializable dictionary.
+
+        Timers are summarised by their count, sum, mean, p50, p99 and maximum, in
+        seconds, and their non-empty buckets keyed by upper bound.
+
+        Returns:
+            dict: The `counters` and `timers`, and when the registry was `started`.
+        """
+        timers = []
+        for name, labels, timer in self.timers():
+            with timer._lock:  # pylint: disable=protected-access
+                buckets = {('+Inf' if index == len(BUCKETS) else repr(BUCKETS[index])): bucket
+                           for index, bucket in enumerate(timer.buckets) if bucket}
+                total = timer.total
+            timers.append({'name': name, 'labels': labels, 'sum': total, **timer.summary(), 'buckets': buckets})
+        counters = [{'name': name, 'labels': labels, 'value': counter.value} for name, labels, counter in self.counters()]
+        return {'started': self.started, 'counters': counters, 'timers': timers}
+
+    def dump(self, path, metrics_format=None):
+        """
+        Writes the metrics to a file, replacing it atomically.
+
+        Args:
+            path (str): Path of the file.
+            metrics_format (str, optional): 'prometheus' or 'json'. Defaults to the format
+                told from the extension of the file (.prom, .txt or .json).
+
+        Raises:
+            ValueError: If the format is unknown or cannot be told from the extension.
+        """
+        if metrics_format is None:
+            metrics_format = FORMATS.get(os.path.splitext(path)[1].lower())
+            if metrics_format is None:
+                raise ValueError(f"Cannot tell the metrics format of '{path}'; use a .prom or .json file.")
+        if metrics_format == 'prometheus':
+            text = self.to_prometheus()
+        elif metrics_format == 'json':
+            text = json.dumps(self.to_json(), indent=2) + "\n"
+        else:
+            raise ValueError(f"Unknown metrics format: {metrics_format}")
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as metrics_file:
+            metrics_file.write(text)
+        os.replace(temp_path, path)
+
+
+def _metric_key(name, labels):
+    """
+    Returns the key of a metric in the registry: its name and its sorted label items.
+    """
+    return (name, tuple(sorted(labels.items())))
+
+
+def _display_name(name, labels):
+    """
+    Returns a metric name with its label values, such as "command_seconds{greet}".
+    """
+    return f"{name}{{{','.join(str(value) for value in labels.values())}}}" if labels else name
+
+
+def _format_seconds(seconds):
+    """
+    Formats a duration in the most readable unit, such as "12.5us" or "3.20ms".
+    """
+    if seconds is None:
+        return '-'
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds:.2f}s"
+
+
+def _prometheus_labels(labels, **extra):
+    """
+    Formats labels for the Prometheus text format, such as '{command="greet"}'.
+    """
+    items = list(labels.items()) + list(extra.items())
+    if not items:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in items)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(items, escaped)) + '}'
+
+
+_shared_metrics = None
+
+
+def get_metrics():
+    """
+    Returns the process-wide metrics registry, or None when metrics are disabled.
+
+    No registry exists until `configure_metrics` is called. The application calls it at
+    start-up and enables metrics unless the `METRICS` setting turns them off.
+    """
+    return _shared_metrics
+
+
+def configure_metrics(enabled=True):
+    """
+    Replaces the process-wide metrics registry used by the instrumented code.
+
+    The application calls this at start-up, with metrics enabled unless the `METRICS`
+    setting is false. Code running without the application, such as the tests, records no
+    metrics until it calls this itself.
+
+    Args:
+        enabled (bool): Whether metrics are recorded.
+
+    Returns:
+        MetricsRegistry or None: The new shared registry, or None if metrics are disabled.
+    """
+    global _shared_metrics  # pylint: disable=global-statement
+    _shared_metrics = MetricsRegistry() if enabled else None
+    return _shared_metrics
+
+
+def increment(name, amount=1, **labels):
+    """
+    Adds to a counter of the process-wide registry; does nothing when metrics are disabled.
+    """
+    metrics = _shared_metrics
+    if metrics is not None:
+        metrics.counter(name, **labels).inc(amount)
+
+
+def timed(name, **labels):
+    """
+    Decorates a function to record its duration in a timer of the process-wide registry.
+
+    The timer is identified by `name` and the fixed `labels`. When metrics are disabled, the
+    function is called directly. Calls that raise are timed as well.
+    """
+    key = _metric_key(name, labels)
+
+    def decorator(function):
+        @functools.wraps(function)
+        def timed_function(*args, **kwargs):
+            metrics = _shared_metrics
+            if metrics is None:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                metrics.timer_for_key(key).observe(time.perf_counter() - start)
+        return timed_function
+    return decorator
+
+
+def timed_operation(compute):
+    """
+    Decorates the `compute(num1, num2)` method of an operation to record its duration.
+
+    The durations are recorded in the `operation_seconds` timer labelled with the operation's
+    name. Placed above `memoize`, results answered from the result cache are timed too.
+    """
+    keys = {}
+
+    @functools.wraps(compute)
+    def timed_compute(self, num1, num2):
+        metrics = _shared_metrics
+        if metrics is None:
+            return compute(self, num1, num2)
+        start = time.perf_counter()
+        try:
+            return compute(self, num1, num2)
+        finally:
+            key = keys.get(self.__class__)
+            if key is None:
+                key = keys[self.__class__] = _metric_key('operation_seconds', {'operation': self.name})
+            metrics.timer_for_key(key).observe(time.perf_counter() - start)
+    return timed_compute
@@ -0,0 +1,254 @@
+import decimal
+from fractions import Fraction
+
+class NumericBackend:
+    """
+    The number type that calculations are carried out in: `float` by default, or an exact type.
+
+    A backend parses the numbers entered by the user, converts numbers given by library callers,
+    and computes an operation on two numbers of its type. The float backend is the built-in
+    behaviour of the operations; callers check `backend is FLOAT` to skip the backend entirely.
+
+    Attributes:
+        name (str): The name the backend is selected by, such as 'decimal'.
+    """
+
+    name = 'float'
+
+    def parse(self, text):
+        """
+        Parses a number entered as text.
+
+        Args:
+            text (str): The text, such as "2.5".
+
+        Returns:
+            The number.
+
+        Raises:
+            ValueError: If the text is not a valid number for this backend.
+        """
+        return float(text)
+
+    def convert(self, value):
+        """
+        Converts a number of another type, or its text, to this backend's type.
+
+        Args:
+            value (int, float, Decimal, Fraction or str): The number.
+
+        Returns:
+            The number.
+
+        Raises:
+            ValueError: If the number cannot be represented by this backend.
+        """
+        return float(value)
+
+    def compute(self, operation, num1, num2):
+        """
+        Computes an operation on two numbers of this backend's type.
+
+        Args:
+            operation (Command): The operation, exposing `compute(num1, num2)`.
+            num1: The first number.
+            num2: The second number.
+
+        Returns:
+            The result, of this backend's type.
+
+        Raises:
+            ZeroDivisionError: If a division by zero is attempted.
+        """
+        return operation.compute(num1, num2)
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class FloatBackend(NumericBackend):
+    """
+    Binary floating point, the default. Use the shared `FLOAT` instance.
+    """
+
+    def __reduce__(self):
+        # Unpickled as the shared instance, so worker processes keep the float fast path
+        return 'FLOAT'
+
+
+class DecimalBackend(NumericBackend):
+    """
+    Decimal floating point with a configurable precision and rounding, for financial amounts.
+
+    Numbers are parsed from their text exactly, and every operation is computed in the
+    backend's own `decimal.Context`, whatever the context of the calling thread.
+
+    Attributes:
+        context (decimal.Context): The context operations are computed in.
+    """
+
+    name = 'decimal'
+
+    def __init__(self, precision=28, rounding=decimal.ROUND_HALF_EVEN, context=None):
+        """
+        Initializes the DecimalBackend.
+
+        Args:
+            precision (int): Number of significant digits of the results.
+            rounding (str): The rounding mode, such as `decimal.ROUND_HALF_UP`.
+            context (decimal.Context, optional): A complete context, instead of a precision
+                and a rounding mode.
+        """
+        self.context = context if context is not None else decimal.Context(prec=precision, rounding=rounding)
+
+    def parse(self, text):
+        """
+        Parses a decimal number exactly, such as "0.1".
+        """
+        try:
+            return decimal.Decimal(text.strip())
+        except decimal.InvalidOperation:
+            raise ValueError(f"Invalid decimal number: {text!r}") from None
+
+    def convert(self, value):
+        """
+        Converts a number to a Decimal; a Fraction is rounded to the precision of the context.
+        """
+        if isinstance(value, str):
+            return self.parse(value)
+        if isinstance(value, Fraction):
+            return self.context.divide(decimal.Decimal(value.numerator), value.denominator)
+        # repr gives the shortest text of a float, so 0.1 becomes Decimal('0.1')
+        return decimal.Decimal(repr(value) if isinstance(value, float) else value)
+
+    def compute(self, operation, num1, num2):
+        """
+        Computes an operation in the backend's context.
+        """
+        with decimal.localcontext(self.context):
+            return operation.compute(num1, num2)
+
+    def __repr__(self):
+        return f"DecimalBackend(precision={self.context.prec}, rounding={self.context.rounding!r})"
+
+
+class FractionBackend(NumericBackend):
+    """
+    Exact rational numbers, such as 1/3, which never round.
+    """
+
+    name = 'fraction'
+
+    def parse(self, text):
+        """
+        Parses a fraction or a decimal number exactly, such as "1/3" or "0.1".
+        """
+        try:
+            return Fraction(text.strip())
+        except ZeroDivisionError:
+            raise ValueError(f"Invalid fraction: {text!r}") from None
+
+    def convert(self, value):
+        """
+        Converts a number to a Fraction.
+        """
+        if isinstance(value, str):
+            return self.parse(value)
+        # repr gives the shortest text of a float, so 0.1 becomes Fraction(1, 10)
+        return Fraction(repr(value) if isinstance(value, float) else value)
+
+
+class IntegerBackend(NumericBackend):
+    """
+    Arbitrary-size integers. A division that does not come out even gives an exact Fraction.
+    """
+
+    name = 'int'
+
+    def parse(self, text):
+        """
+        Parses an integer of any size.
+        """
+        return int(text.strip())
+
+    def convert(self, value):
+        """
+        Converts a number with no fractional part to an integer.
+        """
+        if isinstance(value, str):
+            return self.parse(value)
+        if value != int(value):
+            raise ValueError(f"Not an integer: {value}")
+        return int(value)
+
+    def compute(self, operation, num1, num2):
+        """
+        Computes an operation; a division is computed exactly on Fractions.
+        """
+        if getattr(operation, 'symbol', None) != '/':
+            return operation.compute(num1, num2)
+        result = operation.compute(Fraction(num1), num2)
+        return result.numerator if result.denominator == 1 else result
+
+
+FLOAT = FloatBackend()
+
+BACKENDS = {
+    'float': FloatBackend,
+    'decimal': DecimalBackend,
+    'fraction': FractionBackend,
+    'int': IntegerBackend,
+}
+
+
+def get_backend(backend=None, **options):
+    """
+    Returns a numeric backend by name, or the backend itself if one is given.
+
+    Args:
+        backend (str or NumericBackend, optional): 'float', 'decimal', 'fraction' or 'int', or
+            a backend. Defaults to the process-wide backend.
+        **options: Options of the backend, such as `precision` for 'decimal'.
+
+    Returns:
+        NumericBackend: The backend; `FLOAT` for 'float'.
+
+    Raises:
+        ValueError: If no backend has that name.
+    """
+    if backend is None:
+        return _shared_backend
+    if isinstance(backend, NumericBackend):
+        return backend
+    if backend == 'float':
+        return FLOAT
+    try:
+        return BACKENDS[backend](**options)
+    except KeyError:
+        raise ValueError(f"Unknown numeric backend: {backend}") from None
+
+
+_shared_backend = FLOAT
+
+
+def get_numeric_backend():
+    """
+    Returns the process-wide numeric backend used by the calculator commands.
+    """
+    return _shared_backend
+
+
+def configure_numeric_backend(backend='float', **options):
+    """
+    Replaces the process-wide numeric backend used by the calculator commands.
+
+    Args:
+        backend (str or NumericBackend): 'float', 'decimal', 'fraction' or 'int', or a backend.
+        **options: Options of the backend, such as `precision` for 'decimal'.
+
+    Returns:
+        NumericBackend: The new shared backend.
+    """
+    global _shared_backend  # pylint: disable=global-statement
+    _shared_backend = get_backend(backend, **options)
+    return _shared_backend
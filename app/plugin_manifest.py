@@ -0,0 +1,103 @@
+import json
+import logging
+import os
+
+class PluginManifest:
+    """
+    Caches the commands found in plugin packages so that they can be registered without
+    importing every plugin module on start.
+
+    For each package the manifest stores the discovered `(command name, module, class)` entries
+    together with a fingerprint of the package directory: the modification time of every module
+    and sub-package in it. The entries are reused as long as the fingerprint is unchanged, so
+    adding, removing or editing a plugin module triggers a fresh discovery.
+
+    Attributes:
+        path (str): Path to the JSON file holding the manifest.
+    """
+
+    def __init__(self, path=None):
+        """
+        Initializes the PluginManifest.
+
+        Args:
+            path (str, optional): Path to the JSON file holding the manifest. Defaults to the
+                `PLUGIN_MANIFEST` environment variable, or '.plugin_manifest.json'.
+        """
+        self.path = path if path is not None else os.environ.get('PLUGIN_MANIFEST', '.plugin_manifest.json')
+
+    @staticmethod
+    def fingerprint(package_path):
+        """
+        Computes the modification times of the modules and sub-packages in a package directory.
+
+        Args:
+            package_path (str): The directory of the package.
+
+        Returns:
+            dict: A dictionary mapping module and sub-package file names to modification times.
+        """
+        fingerprint = {}
+        with os.scandir(package_path) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith('.py'):
+                    fingerprint[entry.name] = entry.stat().st_mtime_ns
+                elif entry.is_dir():
+                    init_path = os.path.join(entry.path, '__init__.py')
+                    if os.path.exists(init_path):
+                        fingerprint[entry.name] = os.stat(init_path).st_mtime_ns
+        return fingerprint
+
+    def read(self):
+        """
+        Reads the manifest file.
+
+        Returns:
+            dict: The cached packages, or an empty dictionary if the file is missing or unreadable.
+        """
+        try:
+            with open(self.path, encoding='utf-8') as manifest_file:
+                return json.load(manifest_file)
+        except (OSError, ValueError):
+            return {}
+
+    def load_entries(self, package, discover):
+        """
+        Returns the command entries of a package, discovering them only if the cache is stale.
+
+        Args:
+            package (str): The dotted name of the plugin package.
+            discover (callable): Called without arguments to discover the entries when the
+                cached ones are missing or out of date. Must return a list of
+                `[command name, module, class]` entries.
+
+        Returns:
+            list: The `[command name, module, class]` entries of the package.
+        """
+        fingerprint = self.fingerprint(package.replace('.', '/'))
+        manifest = self.read()
+        cached = manifest.get(package)
+        if cached is not None and cached.get('fingerprint') == fingerprint:
+            logging.info("Loaded plugin manifest for '%s'.", package)
+            return cached['entries']
+
+        entries = discover()
+        manifest[package] = {'fingerprint': fingerprint, 'entries': entries}
+        self.write(manifest)
+        logging.info("Plugin manifest for '%s' rebuilt.", package)
+        return entries
+
+    def write(self, manifest):
+        """
+        Atomically replaces the manifest file.
+
+        Args:
+            manifest (dict): The cached packages to store.
+        """
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as manifest_file:
+                json.dump(manifest, manifest_file)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logging.warning("Could not write plugin manifest %s: %s", self.path, e)
@@ -3,7 +3,9 @@
 import pkgutil
 import importlib
 import logging
-from app.commands import Command
+from app.commands import Command, LazyCommand
+from app.plugin_manifest import PluginManifest
+from app.session import SessionClosed
 
 class CalculatorCommand(Command):
     """
@@ -11,35 +13,54 @@ class CalculatorCommand(Command):
     
     Attributes:
         plugins_package (str): The package where calculator operation plugins are stored.
+        plugin_manifest (PluginManifest): The cache of discovered operations.
         operations (dict): A dictionary mapping operation indices to Command instances.
     """
 
-    def __init__(self, plugins_package='app.plugins.calculator'):
+    def __init__(self, plugins_package='app.plugins.calculator', plugin_manifest=None):
         """
-        Initialize the calculator by dynamically loading operations from the specified plugins package.
+        Initialize the calculator by registering the operations found in the specified plugins package.
 
         Args:
             plugins_package (str): The package path where plugin modules for operations are located.
+            plugin_manifest (PluginManifest, optional): The cache of discovered operations.
+                Defaults to the application's plugin manifest file.
         """
         self.plugins_package = plugins_package
+        self.plugin_manifest = plugin_manifest if plugin_manifest is not None else PluginManifest()
         self.operations = self.load_operations()
-        logging.info(f"Calculator operations initialized with {len(self.operations)} operations.")
+        logging.info("Calculator operations initialized with %s operations.", len(self.operations))
 
     def load_operations(self):
         """
-        Dynamically loads available calculator operation plugins from the plugins package.
+        Registers the available calculator operation plugins from the plugins package.
+
+        The operations are looked up in the plugin manifest, which is rebuilt only when a
+        module of the package has changed. Each operation is registered as a LazyCommand,
+        so its module is imported the first time the operation is used.
 
         Returns:
             dict: A dictionary mapping operation indices to Command instances.
         """
-        operations = {}
+        entries = self.plugin_manifest.load_entries(self.plugins_package, self.discover_operations)
+        operations = {index: LazyCommand(module_name, class_name) for index, module_name, class_name in entries}
+        logging.info("Loaded operations: %s", list(operations.keys()))
+        return operations
+
+    def discover_operations(self):
+        """
+        Imports every calculator operation plugin to discover the operations it provides.
+
+        Returns:
+            list: The `[index, module, class]` entries of all operations.
+        """
+        entries = []
         plugin_paths = [self.plugins_package.replace('.', '/')]
         found_plugins = pkgutil.iter_modules(plugin_paths)
 
         # Sort plugins by name to ensure consistent order
         sorted_plugins = sorted(found_plugins, key=lambda x: x[1])
 
-        index = 1  # Start indexing at 1
         for finder, name, ispkg in sorted_plugins:
             if ispkg:
                 continue  # Skip sub-packages
@@ -47,49 +68,52 @@ class CalculatorCommand(Command):
                 # Dynamically import the plugin module
                 plugin_module = importlib.import_module(f"{self.plugins_package}.{name}")
                 # Register the plugin commands
-                index = self.register_operations(plugin_module, name, index, operations)
+                self.register_operations(plugin_module, name, entries)
             except ImportError as e:
-                logging.error(f"Error importing plugin {name}: {e}")
+                logging.error("Error importing plugin %s: %s", name, e)
             except Exception as e:
-                logging.error(f"Unexpected error while loading plugin {name}: {e}")
-
-        logging.info(f"Loaded operations: {list(operations.keys())}")
-        return operations
+                logging.error("Unexpected error while loading plugin %s: %s", name, e)
+        return entries
 
-    def register_operations(self, plugin_module, name, index, operations):
+    def register_operations(self, plugin_module, name, entries):
         """
         Registers operations from a plugin module.
 
         Args:
             plugin_module (module): The module containing the operation class.
             name (str): The name of the module.
-            index (int): The current index to assign to the operation.
-            operations (dict): The dictionary to store the operations.
-
-        Returns:
-            int: The updated index after registering the operations in the module.
+            entries (list): The list receiving the `[index, module, class]` entries. Indices
+                continue from the entries already in the list, starting at 1.
         """
         try:
             for attribute_name in dir(plugin_module):
                 attribute = getattr(plugin_module, attribute_name)
                 # Ensure the attribute is a class and a valid Command subclass
-                if isinstance(attribute, type) and issubclass(attribute, Command) and attribute is not Command:
-                    operations[str(index)] = attribute()
-                    logging.info(f"Registered operation: {name} as {attribute_name} with index {index}")
-                    index += 1  # Increment index for the next command
+                if isinstance(attribute, type) and issubclass(attribute, Command) and attribute not in (Command, LazyCommand):
+                    index = len(entries) + 1
+                    entries.append([str(index), plugin_module.__name__, attribute_name])
+                    logging.info("Registered operation: %s as %s with index %s", name, attribute_name, index)
         except TypeError as e:
-            logging.error(f"Error registering operation {name}: {e}")
-        return index  # Return the updated index
+            logging.error("Error registering operation %s: %s", name, e)
+
+    def render_menu(self):
+        """
+        Renders the list of available calculator operations in a user-friendly menu format.
+
+        Returns:
+            str: The menu text.
+        """
+        lines = ["\nCalculator Operations:"]
+        # Ensure menu items are displayed in order
+        lines.extend(f"{key}. {self.operations[key].name}" for key in sorted(self.operations.keys(), key=int))
+        lines.append("0. Back")
+        return "\n".join(lines)
 
     def display_menu(self):
         """
         Displays the list of available calculator operations in a user-friendly menu format.
         """
-        print("\nCalculator Operations:")
-        # Ensure menu items are displayed in order
-        for key in sorted(self.operations.keys(), key=int):
-            print(f"{key}. {self.operations[key].__class__.__name__}")
-        print("0. Back")
+        print(self.render_menu())
 
     def execute(self):
         """
@@ -110,11 +134,44 @@ class CalculatorCommand(Command):
             operation = self.operations.get(choice)
             if operation:
                 try:
-                    logging.info(f"Executing operation: {operation.__class__.__name__}")
+                    logging.info("Executing operation: %s", operation.name)
                     operation.execute()  # Execute the selected operation
                 except Exception as e:
-                    logging.error(f"Error executing operation {operation.__class__.__name__}: {e}")
+                    logging.error("Error executing operation %s: %s", operation.name, e)
                     print(f"An error occurred: {e}")
             else:
-                logging.warning(f"Invalid operation selection: {choice}")
+                logging.warning("Invalid operation selection: %s", choice)
                 print("Invalid selection. Please try again.")
+
+    async def execute_async(self, session):
+        """
+        Executes the calculator command in an asynchronous session.
+
+        Like `execute`, but the menu, prompts and the selected operations go through the session.
+
+        Args:
+            session (Session): The session of the user running the command.
+        """
+        while True:
+            session.print(self.render_menu())
+
+            choice = (await session.input("Select an operation: ")).strip()
+            if choice == '0':
+                logging.info("Exiting calculator menu.")
+                break
+
+            operation = self.operations.get(choice)
+            if operation:
+                try:
+                    logging.info("Executing operation: %s", operation.name)
+                    await operation.execute_async(session)
+                except NotImplementedError:
+                    session.print(f"{operation.name} is not available in this session.")
+                except SessionClosed:
+                    raise
+                except Exception as e:  # pylint: disable=broad-except
+                    logging.error("Error executing operation %s: %s", operation.name, e)
+                    session.print(f"An error occurred: {e}")
+            else:
+                logging.warning("Invalid operation selection: %s", choice)
+                session.print("Invalid selection. Please try again.")
@@ -1,6 +1,10 @@
 import logging
+import numpy as np # type: ignore
 from app.commands import Command
-from app.history_manager import HistoryManager
+from app.history_manager import get_history_manager
+from app.metrics import timed_operation
+from app.numeric import get_numeric_backend
+from app.result_cache import memoize
 
 class Divide(Command):
     """
@@ -8,13 +12,64 @@ class Divide(Command):
 
     Attributes:
         history_manager (HistoryManager): Manages the history of calculation records.
+        symbol (str): The infix operator of the operation in expressions.
+        precedence (int): The binding strength of the operator in expressions.
     """
 
-    def __init__(self):
+    symbol = '/'
+    precedence = 2
+
+    def __init__(self, history_manager=None):
         """
         Initializes the Divide command with a history manager to log the operation's result.
+
+        Args:
+            history_manager (HistoryManager, optional): The history store to use. Defaults to
+                the process-wide history manager.
+        """
+        self.history_manager = history_manager if history_manager is not None else get_history_manager()
+
+    @timed_operation
+    @memoize
+    def compute(self, num1, num2):
+        """
+        Computes the quotient of two numbers without any input, output or history side effects.
+
+        Args:
+            num1 (float): The first number.
+            num2 (float): The second number.
+
+        Returns:
+            float: The result of `num1 / num2`.
+
+        Raises:
+            ZeroDivisionError: If `num2` is zero.
         """
-        self.history_manager = HistoryManager()
+        return num1 / num2
+
+    def apply(self, num1, num2):
+        """
+        Computes the element-wise quotient of two arrays in one vectorized call.
+
+        Like `execute`, division by zero does not abort the calculation: elements with a zero
+        divisor are masked out of the result and reported in the log.
+
+        Args:
+            num1 (array_like): The dividends, as a NumPy array, buffer or sequence.
+            num2 (array_like): The divisors, broadcastable against `num1`.
+
+        Returns:
+            numpy.ma.MaskedArray: The element-wise results as float64 values, masked where
+                the divisor is zero.
+        """
+        num1 = np.asarray(num1, dtype=float)
+        num2 = np.asarray(num2, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = np.divide(num1, num2)
+        zero_divisors = np.broadcast_to(num2 == 0, result.shape)
+        if zero_divisors.any():
+            logging.error("Attempted division by zero in %s of %s elements.", np.count_nonzero(zero_divisors), result.size)
+        return np.ma.masked_where(zero_divisors, result)
 
     def execute(self):
         """
@@ -26,20 +81,52 @@ class Divide(Command):
         """
         try:
             # EAFP: Assume inputs are valid numbers and that division can proceed
-            num1 = float(input("Enter first number: "))
-            num2 = float(input("Enter second number: "))
+            backend = get_numeric_backend()
+            num1 = backend.parse(input("Enter first number: "))
+            num2 = backend.parse(input("Enter second number: "))
 
-            result = num1 / num2
-            logging.info(f"Dividing {num1} by {num2}: Result = {result}")
+            result = backend.compute(self, num1, num2)
+            logging.info("Dividing %s by %s: Result = %s", num1, num2, result)
             print(f"The result of {num1} / {num2} is {result}")
             # Store the result in history
             self.history_manager.add_record("Divide", num1, num2, result)
 
         except ValueError as e:
             # Handle cases where inputs are not valid numbers
-            logging.error(f"Invalid input for division: {e}")
+            logging.error("Invalid input for division: %s", e)
             print("Error: Please enter valid numbers.")
         except ZeroDivisionError:
             # Handle division by zero specifically
             logging.error("Attempted division by zero.")
             print("Error: Cannot divide by zero.")
+
+    async def execute_async(self, session):
+        """
+        Executes the division operation in an asynchronous session.
+
+        Like `execute`, but prompts and output go through the session, and the record is
+        stored without blocking the event loop.
+
+        Args:
+            session (Session): The session of the user running the command.
+        """
+        try:
+            # EAFP: Assume inputs are valid numbers and that division can proceed
+            backend = session.numeric_backend or get_numeric_backend()
+            num1 = backend.parse(await session.input("Enter first number: "))
+            num2 = backend.parse(await session.input("Enter second number: "))
+
+            result = backend.compute(self, num1, num2)
+            logging.info("Dividing %s by %s: Result = %s", num1, num2, result)
+            session.print(f"The result of {num1} / {num2} is {result}")
+            # Store the result in history
+            await self.history_manager.add_record_async("Divide", num1, num2, result)
+
+        except ValueError as e:
+            # Handle cases where inputs are not valid numbers
+            logging.error("Invalid input for division: %s", e)
+            session.print("Error: Please enter valid numbers.")
+        except ZeroDivisionError:
+            # Handle division by zero specifically
+            logging.error("Attempted division by zero.")
+            session.print("Error: Cannot divide by zero.")
@@ -0,0 +1,101 @@
+import logging
+from app.commands import Command
+from app.expression import ExpressionError
+from app.history_manager import get_history_manager
+
+class Expression(Command):
+    """
+    Command to evaluate an infix expression, such as `(2+3)*4/7`, over the calculator operations.
+
+    Compiled expressions are cached, so entering the same expression again, for example with
+    other values for its variables, does not parse it again.
+
+    Attributes:
+        history_manager (HistoryManager): Manages the history of calculation records.
+    """
+
+    def __init__(self, history_manager=None):
+        """
+        Initializes the Expression command with a history manager to record the operations applied.
+
+        Args:
+            history_manager (HistoryManager, optional): The history store to use. Defaults to
+                the process-wide history manager.
+        """
+        self.history_manager = history_manager if history_manager is not None else get_history_manager()
+        self._calculator = None
+
+    @property
+    def calculator(self):
+        """
+        The calculator over the operation plugins, created on first use.
+
+        It is not created with the command, since creating it loads every operation,
+        this one included.
+        """
+        if self._calculator is None:
+            # Imported here, as the calculator facade imports this plugin package
+            from app.calculator import Calculator  # pylint: disable=import-outside-toplevel
+            self._calculator = Calculator.from_command(history_manager=self.history_manager)
+        return self._calculator
+
+    def execute(self):
+        """
+        Executes the expression command by prompting the user for an expression.
+
+        Prompts for the expression and then for the value of each of its variables, displays
+        the result, and records every operation applied in the history. Handles invalid
+        expressions, invalid numbers and division by zero with error messages.
+        """
+        try:
+            expression = input("Enter expression: ").strip()
+            compiled = self.calculator.compile(expression)
+            bindings = {name: float(input(f"Enter value for {name}: ")) for name in compiled.variables}
+            result = self.calculator.evaluate(expression, bindings)
+            print(f"The result of {expression} is {result}")
+        except (ExpressionError, ValueError, ZeroDivisionError) as e:
+            print(self.describe_error(e))
+
+    async def execute_async(self, session):
+        """
+        Executes the expression command in an asynchronous session.
+
+        The operations applied are recorded in the history without blocking the event loop.
+
+        Args:
+            session (Session): The session of the user running the command.
+        """
+        try:
+            expression = (await session.input("Enter expression: ")).strip()
+            compiled = self.calculator.compile(expression)
+            bindings = {}
+            for name in compiled.variables:
+                bindings[name] = float(await session.input(f"Enter value for {name}: "))
+            steps = []
+            result = compiled.evaluate(bindings, trace=steps)
+            logging.info("Evaluated %s with %s: Result = %s", expression, bindings, result)
+            session.print(f"The result of {expression} is {result}")
+            await self.history_manager.add_records_async(steps)
+        except (ExpressionError, ValueError, ZeroDivisionError) as e:
+            session.print(self.describe_error(e))
+
+    @staticmethod
+    def describe_error(error):
+        """
+        Logs an error raised while evaluating an expression and returns the message for the user.
+
+        Args:
+            error (Exception): An ExpressionError, a ValueError for an invalid number, or a
+                ZeroDivisionError.
+
+        Returns:
+            str: The error message to display.
+        """
+        if isinstance(error, ExpressionError):
+            logging.error("Invalid expression: %s", error)
+            return f"Error: {error}"
+        if isinstance(error, ZeroDivisionError):
+            logging.error("Attempted division by zero.")
+            return "Error: Cannot divide by zero."
+        logging.error("Invalid input for expression: %s", error)
+        return "Error: Please enter valid numbers."
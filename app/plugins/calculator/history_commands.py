@@ -1,27 +1,60 @@
 from app.commands import Command
-from app.history_manager import HistoryManager
+from app.history_manager import get_history_manager
 import logging
+import time
 
 class ShowHistory(Command):
     """
-    Command to display the calculation history.
+    Command to display the calculation history, one page at a time.
     
     Attributes:
         history_manager (HistoryManager): Manages the history of calculation records.
+        page_size (int): Number of records displayed per page.
     """
 
-    def __init__(self):
+    MORE_PROMPT = "Press Enter for more records, or 'q' to stop: "
+
+    def __init__(self, history_manager=None, page_size=20):
         """
         Initializes the ShowHistory command with a history manager to retrieve calculation history.
+
+        Args:
+            history_manager (HistoryManager, optional): The history store to use. Defaults to
+                the process-wide history manager.
+            page_size (int): Number of records displayed per page.
         """
-        self.history_manager = HistoryManager()
+        self.history_manager = history_manager if history_manager is not None else get_history_manager()
+        self.page_size = page_size
 
     def execute(self):
         """
-        Executes the show history command, displaying all records in the calculation history.
+        Executes the show history command, displaying the records in the calculation history.
+
+        If there are more than `page_size` records, the user is asked before each next page.
         """
         print("\nCalculation History:")
-        self.history_manager.show_history()
+        offset = 0
+        while True:
+            self.history_manager.show_history(offset=offset, limit=self.page_size)
+            offset += self.page_size
+            if offset >= self.history_manager.count_records() or input(self.MORE_PROMPT).strip().lower() == 'q':
+                break
+
+    async def execute_async(self, session):
+        """
+        Executes the show history command in an asynchronous session.
+
+        Args:
+            session (Session): The session of the user running the command.
+        """
+        session.print("\nCalculation History:")
+        offset = 0
+        while True:
+            session.print("\n".join(self.history_manager.format_history(offset=offset, limit=self.page_size)))
+            offset += self.page_size
+            if (offset >= self.history_manager.count_records()
+                    or (await session.input(self.MORE_PROMPT)).strip().lower() == 'q'):
+                break
 
 
 class ClearHistory(Command):
@@ -32,11 +65,15 @@ class ClearHistory(Command):
         history_manager (HistoryManager): Manages the history of calculation records.
     """
 
-    def __init__(self):
+    def __init__(self, history_manager=None):
         """
         Initializes the ClearHistory command with a history manager to clear all calculation records.
+
+        Args:
+            history_manager (HistoryManager, optional): The history store to use. Defaults to
+                the process-wide history manager.
         """
-        self.history_manager = HistoryManager()
+        self.history_manager = history_manager if history_manager is not None else get_history_manager()
 
     def execute(self):
         """
@@ -46,24 +83,98 @@ class ClearHistory(Command):
         self.history_manager.clear_history()
         print("History has been cleared.")
 
+    async def execute_async(self, session):
+        """
+        Executes the clear history command in an asynchronous session, rewriting the history
+        file without blocking the event loop.
+
+        Args:
+            session (Session): The session of the user running the command.
+        """
+        await self.history_manager.clear_history_async()
+        session.print("History cleared.")
+        session.print("History has been cleared.")
+
+
+class HistoryStats(Command):
+    """
+    Command to display the count, sum, mean, minimum and maximum of the results of every
+    operation in the calculation history, over all of it or over the last minutes.
+
+    Attributes:
+        history_manager (HistoryManager): Manages the history of calculation records.
+    """
+
+    WINDOW_PROMPT = "Enter the number of minutes to include (Enter for all): "
+
+    def __init__(self, history_manager=None):
+        """
+        Initializes the HistoryStats command with a history manager to aggregate the records of.
+
+        Args:
+            history_manager (HistoryManager, optional): The history store to use. Defaults to
+                the process-wide history manager.
+        """
+        self.history_manager = history_manager if history_manager is not None else get_history_manager()
+
+    def stats_lines(self, answer):
+        """
+        Returns the lines of the statistics table for the answer to the window prompt.
+
+        Raises:
+            ValueError: If the answer is neither empty nor a number of minutes.
+        """
+        since = None
+        if answer.strip():
+            since = time.time() - 60 * float(answer)
+        return self.history_manager.format_stats(self.history_manager.history_stats(since=since))
+
+    def execute(self):
+        """
+        Executes the history stats command, prompting the user for a time window.
+
+        Handles invalid input with an error message.
+        """
+        try:
+            print("\n".join(self.stats_lines(input(self.WINDOW_PROMPT))))
+        except ValueError:
+            print("Invalid input. Please enter a valid number.")
+
+    async def execute_async(self, session):
+        """
+        Executes the history stats command in an asynchronous session.
+
+        Args:
+            session (Session): The session of the user running the command.
+        """
+        try:
+            session.print("\n".join(self.stats_lines(await session.input(self.WINDOW_PROMPT))))
+        except ValueError:
+            session.print("Invalid input. Please enter a valid number.")
+
 
 class DeleteSpecificRecord(Command):
     """
-    Command to delete a specific record from the calculation history by index.
+    Command to delete a specific record from the calculation history by the id shown in
+    the history, which stays the same when other records are deleted.
     
     Attributes:
         history_manager (HistoryManager): Manages the history of calculation records.
     """
 
-    def __init__(self):
+    def __init__(self, history_manager=None):
         """
         Initializes the DeleteSpecificRecord command with a history manager to delete individual records.
+
+        Args:
+            history_manager (HistoryManager, optional): The history store to use. Defaults to
+                the process-wide history manager.
         """
-        self.history_manager = HistoryManager()
+        self.history_manager = history_manager if history_manager is not None else get_history_manager()
 
     def execute(self):
         """
-        Executes the delete specific record command, prompting the user to specify a record index 
+        Executes the delete specific record command, prompting the user to specify a record id
         to delete from the calculation history.
 
         Handles invalid input with an error message.
@@ -72,7 +183,24 @@ class DeleteSpecificRecord(Command):
             ValueError: If the input is not a valid integer.
         """
         try:
-            index = int(input("Enter the record index to delete: "))
-            self.history_manager.delete_record(index)
+            record_id = int(input("Enter the record ID to delete: "))
+            self.history_manager.delete_record(record_id)
         except ValueError:
             print("Invalid input. Please enter a valid number.")
+
+    async def execute_async(self, session):
+        """
+        Executes the delete specific record command in an asynchronous session, writing the
+        history file without blocking the event loop.
+
+        Args:
+            session (Session): The session of the user running the command.
+        """
+        try:
+            record_id = int(await session.input("Enter the record ID to delete: "))
+            if await self.history_manager.delete_record_async(record_id):
+                session.print(f"Record {record_id} deleted.")
+            else:
+                session.print("Invalid record ID.")
+        except ValueError:
+            session.print("Invalid input. Please enter a valid number.")
@@ -1,6 +1,10 @@
 import logging
+import numpy as np # type: ignore
 from app.commands import Command
-from app.history_manager import HistoryManager
+from app.history_manager import get_history_manager
+from app.metrics import timed_operation
+from app.numeric import get_numeric_backend
+from app.result_cache import memoize
 
 class Multiply(Command):
     """
@@ -8,13 +12,50 @@ class Multiply(Command):
 
     Attributes:
         history_manager (HistoryManager): Manages the history of calculation records.
+        symbol (str): The infix operator of the operation in expressions.
+        precedence (int): The binding strength of the operator in expressions.
     """
 
-    def __init__(self):
+    symbol = '*'
+    precedence = 2
+
+    def __init__(self, history_manager=None):
         """
         Initializes the Multiply command with a history manager to log the operation's result.
+
+        Args:
+            history_manager (HistoryManager, optional): The history store to use. Defaults to
+                the process-wide history manager.
+        """
+        self.history_manager = history_manager if history_manager is not None else get_history_manager()
+
+    @timed_operation
+    @memoize
+    def compute(self, num1, num2):
+        """
+        Computes the product of two numbers without any input, output or history side effects.
+
+        Args:
+            num1 (float): The first number.
+            num2 (float): The second number.
+
+        Returns:
+            float: The result of `num1 * num2`.
+        """
+        return num1 * num2
+
+    def apply(self, num1, num2):
+        """
+        Computes the element-wise product of two arrays in one vectorized call.
+
+        Args:
+            num1 (array_like): The first numbers, as a NumPy array, buffer or sequence.
+            num2 (array_like): The second numbers, broadcastable against `num1`.
+
+        Returns:
+            numpy.ndarray: The element-wise results as float64 values.
         """
-        self.history_manager = HistoryManager()
+        return np.multiply(np.asarray(num1, dtype=float), np.asarray(num2, dtype=float))
 
     def execute(self):
         """
@@ -25,14 +66,40 @@ class Multiply(Command):
         """
         try:
             # EAFP: Assume inputs are valid floats and proceed with multiplication
-            num1 = float(input("Enter first number: "))
-            num2 = float(input("Enter second number: "))
-            result = num1 * num2
-            logging.info(f"Multiplying {num1} and {num2}: Result = {result}")
+            backend = get_numeric_backend()
+            num1 = backend.parse(input("Enter first number: "))
+            num2 = backend.parse(input("Enter second number: "))
+            result = backend.compute(self, num1, num2)
+            logging.info("Multiplying %s and %s: Result = %s", num1, num2, result)
             print(f"The result of {num1} * {num2} is {result}")
             # Store the result in history
             self.history_manager.add_record("Multiply", num1, num2, result)
         except ValueError as e:
             # Handle cases where inputs are not valid numbers
-            logging.error(f"Invalid input for multiplication: {e}")
+            logging.error("Invalid input for multiplication: %s", e)
             print("Error: Please enter valid numbers.")
+
+    async def execute_async(self, session):
+        """
+        Executes the multiplication operation in an asynchronous session.
+
+        Like `execute`, but prompts and output go through the session, and the record is
+        stored without blocking the event loop.
+
+        Args:
+            session (Session): The session of the user running the command.
+        """
+        try:
+            # EAFP: Assume inputs are valid floats and proceed with multiplication
+            backend = session.numeric_backend or get_numeric_backend()
+            num1 = backend.parse(await session.input("Enter first number: "))
+            num2 = backend.parse(await session.input("Enter second number: "))
+            result = backend.compute(self, num1, num2)
+            logging.info("Multiplying %s and %s: Result = %s", num1, num2, result)
+            session.print(f"The result of {num1} * {num2} is {result}")
+            # Store the result in history
+            await self.history_manager.add_record_async("Multiply", num1, num2, result)
+        except ValueError as e:
+            # Handle cases where inputs are not valid numbers
+            logging.error("Invalid input for multiplication: %s", e)
+            session.print("Error: Please enter valid numbers.")
@@ -1,6 +1,10 @@
 import logging
+import numpy as np # type: ignore
 from app.commands import Command
-from app.history_manager import HistoryManager
+from app.history_manager import get_history_manager
+from app.metrics import timed_operation
+from app.numeric import get_numeric_backend
+from app.result_cache import memoize
 
 class Subtract(Command):
     """
@@ -8,13 +12,50 @@ class Subtract(Command):
 
     Attributes:
         history_manager (HistoryManager): Manages the history of calculation records.
+        symbol (str): The infix operator of the operation in expressions.
+        precedence (int): The binding strength of the operator in expressions.
     """
 
-    def __init__(self):
+    symbol = '-'
+    precedence = 1
+
+    def __init__(self, history_manager=None):
         """
         Initializes the Subtract command with a history manager to log the operation's result.
+
+        Args:
+            history_manager (HistoryManager, optional): The history store to use. Defaults to
+                the process-wide history manager.
+        """
+        self.history_manager = history_manager if history_manager is not None else get_history_manager()
+
+    @timed_operation
+    @memoize
+    def compute(self, num1, num2):
+        """
+        Computes the difference of two numbers without any input, output or history side effects.
+
+        Args:
+            num1 (float): The first number.
+            num2 (float): The second number.
+
+        Returns:
+            float: The result of `num1 - num2`.
+        """
+        return num1 - num2
+
+    def apply(self, num1, num2):
+        """
+        Computes the element-wise difference of two arrays in one vectorized call.
+
+        Args:
+            num1 (array_like): The first numbers, as a NumPy array, buffer or sequence.
+            num2 (array_like): The second numbers, broadcastable against `num1`.
+
+        Returns:
+            numpy.ndarray: The element-wise results as float64 values.
         """
-        self.history_manager = HistoryManager()
+        return np.subtract(np.asarray(num1, dtype=float), np.asarray(num2, dtype=float))
 
     def execute(self):
         """
@@ -25,14 +66,40 @@ class Subtract(Command):
         """
         try:
             # EAFP: Assume inputs are valid numbers and proceed with subtraction
-            num1 = float(input("Enter first number: "))
-            num2 = float(input("Enter second number: "))
-            result = num1 - num2
-            logging.info(f"Subtracting {num2} from {num1}: Result = {result}")
+            backend = get_numeric_backend()
+            num1 = backend.parse(input("Enter first number: "))
+            num2 = backend.parse(input("Enter second number: "))
+            result = backend.compute(self, num1, num2)
+            logging.info("Subtracting %s from %s: Result = %s", num2, num1, result)
             print(f"The result of {num1} - {num2} is {result}")
             # Store the result in history
             self.history_manager.add_record("Subtract", num1, num2, result)
         except ValueError as e:
             # Handle invalid input where conversion to float fails
-            logging.error(f"Invalid input for subtraction: {e}")
+            logging.error("Invalid input for subtraction: %s", e)
             print("Error: Please enter valid numbers.")
+
+    async def execute_async(self, session):
+        """
+        Executes the subtraction operation in an asynchronous session.
+
+        Like `execute`, but prompts and output go through the session, and the record is
+        stored without blocking the event loop.
+
+        Args:
+            session (Session): The session of the user running the command.
+        """
+        try:
+            # EAFP: Assume inputs are valid numbers and proceed with subtraction
+            backend = session.numeric_backend or get_numeric_backend()
+            num1 = backend.parse(await session.input("Enter first number: "))
+            num2 = backend.parse(await session.input("Enter second number: "))
+            result = backend.compute(self, num1, num2)
+            logging.info("Subtracting %s from %s: Result = %s", num2, num1, result)
+            session.print(f"The result of {num1} - {num2} is {result}")
+            # Store the result in history
+            await self.history_manager.add_record_async("Subtract", num1, num2, result)
+        except ValueError as e:
+            # Handle invalid input where conversion to float fails
+            logging.error("Invalid input for subtraction: %s", e)
+            session.print("Error: Please enter valid numbers.")
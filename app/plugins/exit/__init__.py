@@ -1,6 +1,7 @@
 import sys
 import logging
 from app.commands import Command
+from app.session import SessionClosed
 
 class ExitCommand(Command):
     """
@@ -20,8 +21,21 @@ class ExitCommand(Command):
             sys.exit("Exiting...")
         except SystemExit as e:
             # EAFP: Handle the expected SystemExit to log and re-raise for a graceful shutdown
-            logging.info(f"System exit with message: {e}")
+            logging.info("System exit with message: %s", e)
             raise  # Re-raise to ensure the application terminates
         except Exception as e:
             # Catch any other unexpected exceptions
-            logging.error(f"An unexpected error occurred while exiting: {e}")
+            logging.error("An unexpected error occurred while exiting: %s", e)
+
+    async def execute_async(self, session):
+        """
+        Executes the exit command in an asynchronous session, ending only that session.
+
+        Args:
+            session (Session): The session of the user running the command.
+
+        Raises:
+            SessionClosed: Always, to end the session.
+        """
+        logging.info("ExitCommand executed: Session is ending.")
+        raise SessionClosed()
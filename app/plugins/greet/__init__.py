@@ -16,10 +16,20 @@ class GreetCommand(Command):
             # EAFP: Assume logging will succeed, handle unexpected issues
             logging.info("Hello, World!")
         except Exception as e:
-            logging.error(f"Failed to log greeting message: {e}")
+            logging.error("Failed to log greeting message: %s", e)
 
         try:
             # EAFP: Assume print will succeed, handle unexpected issues
             print("Hello, World!")
         except Exception as e:
-            logging.error(f"Failed to print greeting message: {e}")
+            logging.error("Failed to print greeting message: %s", e)
+
+    async def execute_async(self, session):
+        """
+        Executes the greet command in an asynchronous session.
+
+        Args:
+            session (Session): The session of the user running the command.
+        """
+        logging.info("Hello, World!")
+        session.print("Hello, World!")
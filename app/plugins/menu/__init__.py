@@ -1,6 +1,7 @@
 import sys
 import logging
 from app.commands import Command, CommandHandler
+from app.session import SessionClosed
 
 class MenuCommand(Command):
     """
@@ -18,6 +19,24 @@ class MenuCommand(Command):
             command_handler (CommandHandler): The handler that manages available commands.
         """
         self.command_handler = command_handler
+        self._menu = None
+        self._menu_revision = None
+
+    def render_menu(self):
+        """
+        Renders the main menu, reusing the cached text until the registered commands change.
+
+        Returns:
+            str: The main menu text.
+        """
+        if self._menu_revision != self.command_handler.revision:
+            lines = ["\nMain Menu:"]
+            lines.extend(f"{index}. {command_name.capitalize()}"
+                         for index, command_name in enumerate(self.command_handler.command_names, start=1))
+            lines.append("Enter the number of the command to execute, or '0' to exit.")
+            self._menu = "\n".join(lines)
+            self._menu_revision = self.command_handler.revision
+        return self._menu
 
     def execute(self):
         """
@@ -26,13 +45,8 @@ class MenuCommand(Command):
         Prompts the user to select a command by number or exit by selecting '0'. Handles
         errors like invalid input, out-of-range selections, and unexpected exceptions.
         """
-        commands = list(self.command_handler.commands.keys())
-
         # Display the menu
-        print("\nMain Menu:")
-        for index, command_name in enumerate(commands, start=1):
-            print(f"{index}. {command_name.capitalize()}")
-        print("Enter the number of the command to execute, or '0' to exit.")
+        print(self.render_menu())
 
         try:
             # EAFP: Assume input can be converted to integer and is within range
@@ -42,8 +56,8 @@ class MenuCommand(Command):
                 sys.exit("Exiting program.")  # Exit if the user selects '0'
 
             # Attempt to retrieve and execute the command
-            command_name = commands[selection - 1]  # Adjust for zero-based indexing
-            logging.info(f"User selected command: {command_name}")
+            command_name = self.command_handler.command_names[selection - 1]  # Adjust for zero-based indexing
+            logging.info("User selected command: %s", command_name)
             self.command_handler.execute_command(command_name)
 
         except ValueError:
@@ -52,11 +66,11 @@ class MenuCommand(Command):
             print("Invalid selection. Please enter a valid number.")
         except IndexError:
             # Handle selection out of range
-            logging.warning(f"Invalid selection: {selection} is out of range.")
+            logging.warning("Invalid selection: %s is out of range.", selection)
             print("Invalid selection. Please enter a valid number.")
         except KeyError:
             # Handle command not found
-            logging.error(f"Command '{command_name}' could not be executed.")
+            logging.error("Command '%s' could not be executed.", command_name)
             print("Selected command could not be executed.")
         except SystemExit:
             # Allow SystemExit for graceful program termination
@@ -64,5 +78,35 @@ class MenuCommand(Command):
             raise
         except Exception as e:
             # Handle any other unexpected errors
-            logging.error(f"Unexpected error occurred: {e}")
+            logging.error("Unexpected error occurred: %s", e)
             print("An unexpected error occurred. Please try again.")
+
+    async def execute_async(self, session):
+        """
+        Executes the menu command in an asynchronous session.
+
+        Selecting '0' ends the session instead of the program.
+
+        Args:
+            session (Session): The session of the user running the command.
+
+        Raises:
+            SessionClosed: If the user selects '0'.
+        """
+        session.print(self.render_menu())
+        try:
+            selection = int(await session.input("Selection: "))
+        except ValueError:
+            logging.warning("Invalid input: non-numeric selection entered.")
+            session.print("Invalid selection. Please enter a valid number.")
+            return
+        if selection == 0:
+            logging.info("User selected to end the session.")
+            raise SessionClosed()
+        if not 0 < selection <= len(self.command_handler.command_names):
+            logging.warning("Invalid selection: %s is out of range.", selection)
+            session.print("Invalid selection. Please enter a valid number.")
+            return
+        command_name = self.command_handler.command_names[selection - 1]
+        logging.info("User selected command: %s", command_name)
+        await self.command_handler.execute_command_async(command_name, session)
@@ -0,0 +1,68 @@
+import logging
+from app.commands import Command
+from app.metrics import get_metrics
+
+class StatsCommand(Command):
+    """
+    Command to display the latency metrics of the commands, operations and history store.
+
+    After the table is shown, the metrics can be saved to a file in the Prometheus text
+    format (.prom) or as JSON (.json).
+    """
+
+    SAVE_PROMPT = "Save the metrics to a file (.prom or .json), or press Enter to skip: "
+
+    def render_stats(self):
+        """
+        Renders the table of metrics, or a notice when metrics are disabled.
+
+        Returns:
+            str: The text to display.
+        """
+        metrics = get_metrics()
+        if metrics is None:
+            return "Metrics are disabled. Set METRICS=true to record them."
+        return "\n".join(["\nMetrics:"] + metrics.format_stats())
+
+    def save(self, path):
+        """
+        Saves the metrics to a file, telling the format from its extension.
+
+        Args:
+            path (str): Path of the file.
+
+        Returns:
+            str: The message to display.
+        """
+        try:
+            get_metrics().dump(path)
+        except (OSError, ValueError) as e:
+            logging.error("Failed to save metrics to %s: %s", path, e)
+            return f"Could not save the metrics: {e}"
+        logging.info("Metrics saved to %s.", path)
+        return f"Metrics saved to {path}."
+
+    def execute(self):
+        """
+        Executes the stats command, displaying the metrics and offering to save them.
+        """
+        print(self.render_stats())
+        if get_metrics() is None:
+            return
+        path = input(self.SAVE_PROMPT).strip()
+        if path:
+            print(self.save(path))
+
+    async def execute_async(self, session):
+        """
+        Executes the stats command in an asynchronous session.
+
+        Args:
+            session (Session): The session of the user running the command.
+        """
+        session.print(self.render_stats())
+        if get_metrics() is None:
+            return
+        path = (await session.input(self.SAVE_PROMPT)).strip()
+        if path:
+            session.print(self.save(path))
@@ -0,0 +1,219 @@
+import cProfile
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+class Profiler:
+    """
+    Profiles individual runs, such as one command, and writes a profile file for each.
+
+    Every run is profiled twice at once:
+
+    - with cProfile, written as a `.prof` file for `pstats`, snakeviz and similar tools;
+    - by a thread sampling the stack of the profiled thread every `interval` seconds, written
+      as `.collapsed` stacks, one `frame;frame;frame count` line per distinct stack, ready
+      for flamegraph.pl or speedscope.
+
+    Runs nested in a profiled run on the same thread, such as a command run from the menu
+    command, are part of the outer profile.
+
+    Attributes:
+        directory (str): The directory the profile files are written to.
+        interval (float): Seconds between two stack samples.
+    """
+
+    def __init__(self, directory=os.path.join('logs', 'profiles'), interval=0.001):
+        """
+        Initializes the Profiler without creating its directory.
+
+        Args:
+            directory (str): The directory the profile files are written to.
+            interval (float): Seconds between two stack samples.
+        """
+        self.directory = directory
+        self.interval = interval
+        self._active = threading.local()
+        self._lock = threading.Lock()
+        self._runs = 0
+
+    def run(self, name, function, *args, **kwargs):
+        """
+        Calls a function under the profilers and writes its profile files.
+
+        The files are written even if the function raises.
+
+        Args:
+            name (str): The name of the run, used in the file names, such as 'greet'.
+            function (callable): The function to profile.
+            *args: Positional arguments of the function.
+            **kwargs: Keyword arguments of the function.
+
+        Returns:
+            The result of the function.
+        """
+        if getattr(self._active, 'profiling', False):
+            return function(*args, **kwargs)
+        self._active.profiling = True
+        sampler = StackSampler(threading.get_ident(), self.interval, stop_code=Profiler.run.__code__)
+        profile = cProfile.Profile()
+        sampler.start()
+        try:
+            profile.enable()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profile.disable()
+        finally:
+            sampler.stop()
+            self._active.profiling = False
+            self.write(name, profile, sampler.stacks)
+
+    def write(self, name, profile, stacks):
+        """
+        Writes the `.prof` file and the `.collapsed` stacks of a run.
+
+        Errors are logged rather than raised, so that they do not mask the result of the run.
+
+        Args:
+            name (str): The name of the run.
+            profile (cProfile.Profile): The cProfile profile of the run.
+            stacks (Counter): The number of samples of every collapsed stack.
+
+        Returns:
+            str or None: The path of the files without their extension, or None on error.
+        """
+        with self._lock:
+            self._runs += 1
+            run = self._runs
+        safe_name = ''.join(char if char.isalnum() or char in '-_' else '_' for char in name)
+        base = os.path.join(self.directory, f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{run}")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            profile.dump_stats(base + '.prof')
+            with open(base + '.collapsed', 'w', encoding='utf-8') as collapsed_file:
+                collapsed_file.writelines(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+        except OSError as e:
+            logging.error("Failed to write the profile of %s: %s", name, e)
+            return None
+        logging.info("Profile of %s written to %s.prof and %s.collapsed (%s samples).",
+                     name, base, base, sum(stacks.values()))
+        return base
+
+
+class StackSampler:
+    """
+    Samples the Python stack of one thread at a fixed interval from a background thread.
+
+    Attributes:
+        thread_id (int): The identifier of the sampled thread.
+        interval (float): Seconds between two samples.
+        stacks (Counter): The number of samples of every collapsed stack, outermost frame first.
+    """
+
+    def __init__(self, thread_id, interval, stop_code=None):
+        """
+        Initializes the StackSampler without starting it.
+
+        Args:
+            thread_id (int): The identifier of the thread to sample.
+            interval (float): Seconds between two samples.
+            stop_code (code, optional): The code object of the frame where stacks are cut off;
+                it and the frames that called it are left out of the samples.
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stop_code = stop_code
+        self.stacks = Counter()
+        self._labels = {}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample_loop, name="stack-sampler", daemon=True)
+
+    def start(self):
+        """
+        Starts sampling.
+        """
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops sampling and waits for the sampling thread to end.
+        """
+        self._stopped.set()
+        self._thread.join()
+
+    def _sample_loop(self):
+        """
+        Takes a sample every `interval` seconds until stopped.
+        """
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)  # pylint: disable=protected-access
+            if frame is None:
+                return
+            stack = self.collapse(frame)
+            del frame
+            if stack:
+                self.stacks[stack] += 1
+
+    def collapse(self, frame):
+        """
+        Collapses a stack into a single `frame;frame;frame` line, outermost frame first.
+
+        Args:
+            frame (frame): The innermost frame of the stack.
+
+        Returns:
+            str: The collapsed stack, which is empty if the stop frame is innermost or the
+            sampled thread is starting or stopping this sampler.
+        """
+        labels = []
+        code = None
+        while frame is not None and frame.f_code is not self.stop_code:
+            code = frame.f_code
+            labels.append(self.label(code))
+            frame = frame.f_back
+        if code in _SAMPLER_CODES:
+            return ''
+        return ';'.join(reversed(labels))
+
+    def label(self, code):
+        """
+        Returns the label of a function in a collapsed stack, such as "add.py:Add.compute".
+        """
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, 'co_qualname', code.co_name)
+            label = self._labels[code] = f"{os.path.basename(code.co_filename)}:{name}".replace(';', ':').replace(' ', '_')
+        return label
+
+
+# Code of the sampler run by the sampled thread itself, which is left out of the samples
+_SAMPLER_CODES = (StackSampler.start.__code__, StackSampler.stop.__code__)
+
+_shared_profiler = None
+
+
+def get_profiler():
+    """
+    Returns the process-wide profiler, or None when profiling is disabled (the default).
+    """
+    return _shared_profiler
+
+
+def configure_profiler(enabled=True, directory=os.path.join('logs', 'profiles'), interval=0.001):
+    """
+    Replaces the process-wide profiler used when commands are run.
+
+    Args:
+        enabled (bool): Whether commands are profiled.
+        directory (str): The directory the profile files are written to.
+        interval (float): Seconds between two stack samples.
+
+    Returns:
+        Profiler or None: The new shared profiler, or None if profiling is disabled.
+    """
+    global _shared_profiler  # pylint: disable=global-statement
+    _shared_profiler = Profiler(directory, interval) if enabled else None
+    return _shared_profiler
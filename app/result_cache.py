@@ -0,0 +1,152 @@
+import functools
+import threading
+from decimal import Decimal, getcontext
+from collections import OrderedDict
+
+class ResultCache:
+    """
+    Size-bounded cache of calculation results, keyed by operation and operands.
+
+    When the cache is full, the least recently used result is evicted. Arithmetic errors are
+    cached like results, so a repeated division by zero raises a new ZeroDivisionError
+    without dividing again.
+
+    Attributes:
+        maxsize (int): Maximum number of cached results.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that had to compute the result.
+        evictions (int): Number of results evicted to make room for new ones.
+    """
+
+    def __init__(self, maxsize=1024):
+        """
+        Initializes an empty ResultCache.
+
+        Args:
+            maxsize (int): Maximum number of cached results.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_part(number):
+        """
+        Returns the part of the cache key for one operand.
+
+        Equal operands can still give different results, such as 1 and 1.0 (int and float)
+        or 0.0 and -0.0 (signed zeros), so the type and, for zeros, the text of the operand
+        are part of the key.
+        """
+        if isinstance(number, Decimal):
+            # Decimal results are rounded to the precision of the current context
+            context = getcontext()
+            return (Decimal, str(number), context.prec, context.rounding)
+        if number == 0:
+            return (type(number), str(number))
+        return (type(number), number)
+
+    def get_or_compute(self, operation, num1, num2, compute):
+        """
+        Returns the cached result of a calculation, computing and caching it on a miss.
+
+        Args:
+            operation (str): The operation name, such as "Divide".
+            num1 (float): The first number.
+            num2 (float): The second number.
+            compute (callable): Computes the result when it is not cached.
+
+        Returns:
+            The result of the calculation.
+
+        Raises:
+            ArithmeticError: The error raised by the calculation, such as ZeroDivisionError,
+                whether it was computed now or cached.
+        """
+        key = (operation, self.key_part(num1), self.key_part(num2))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+
+        if entry is None:
+            try:
+                entry = (compute(), None)
+            except ArithmeticError as error:
+                entry = (None, error)
+            with self._lock:
+                self._entries[key] = entry
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        result, error = entry
+        if error is not None:
+            raise type(error)(*error.args)
+        return result
+
+    def stats(self):
+        """
+        Returns the counters of the cache.
+
+        Returns:
+            dict: The hits, misses, evictions, current size and maximum size of the cache.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'size': len(self._entries), 'maxsize': self.maxsize}
+
+    def clear(self):
+        """
+        Removes all cached results and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+_shared_result_cache = None
+
+
+def get_result_cache():
+    """
+    Returns the process-wide result cache, or None when caching is disabled (the default).
+    """
+    return _shared_result_cache
+
+
+def configure_result_cache(maxsize):
+    """
+    Replaces the process-wide result cache used by the calculator operations.
+
+    Args:
+        maxsize (int): Maximum number of cached results, or 0 to disable caching.
+
+    Returns:
+        ResultCache or None: The new shared result cache, or None if caching is disabled.
+    """
+    global _shared_result_cache  # pylint: disable=global-statement
+    _shared_result_cache = ResultCache(maxsize) if maxsize > 0 else None
+    return _shared_result_cache
+
+
+def memoize(compute):
+    """
+    Decorates the `compute(num1, num2)` method of an operation to go through the result cache.
+
+    The results are cached under the operation's name. When caching is disabled, the method
+    is called directly.
+    """
+    @functools.wraps(compute)
+    def cached_compute(self, num1, num2):
+        cache = _shared_result_cache
+        if cache is None:
+            return compute(self, num1, num2)
+        return cache.get_or_compute(self.name, num1, num2, lambda: compute(self, num1, num2))
+    return cached_compute
@@ -0,0 +1,412 @@
+import logging
+import os
+import struct
+from collections import OrderedDict
+from app.history_manager import HistoryManager
+from app.metrics import increment, timed
+
+def slot_dtype():
+    """
+    Returns the NumPy dtype of a ring buffer slot: an operation code and three float64 values.
+
+    NumPy is only imported when this function is first called, so it stays out of the
+    application's start-up path.
+    """
+    import numpy as np  # type: ignore # pylint: disable=import-outside-toplevel
+    return np.dtype([('operation', 'u1'), ('num1', '<f8'), ('num2', '<f8'), ('result', '<f8')])
+
+class RingHistoryManager(HistoryManager):
+    """
+    Manages the history of calculations, stored in a fixed-capacity ring buffer file.
+
+    The file starts with a header of `HEADER_SIZE` bytes, followed by `max_records` slots of
+    `SLOT_SIZE` bytes each. A slot holds an operation code and the two operands and result as
+    float64 values. The header holds the capacity, the number of records written so far and
+    the table mapping operation codes to operation names.
+
+    Record number `n` is always stored in slot `n % capacity`, so once the buffer is full a new
+    record simply overwrites the oldest one. Adding records therefore writes only their slots
+    and the header; the file is never rewritten on insert, whatever the capacity. The id of a
+    record is its record number plus one. Deleting a record overwrites the operation code of
+    its slot with the `DELETED` tombstone, a one-byte write. The file is only rewritten by
+    `compact`, which `clear_history` uses, and which numbers the remaining records from 1.
+
+    The file always has room for every slot, so it can be memory-mapped once as a NumPy
+    structured array (see `mapped`). The records are loaded from that map, and `tail` and
+    `format_history` work on zero-copy views of it instead of parsing the file.
+
+    Attributes:
+        file_path (str): Path to the ring buffer file where history records are stored.
+        max_records (int): Capacity of the ring buffer, in records.
+    """
+
+    MAGIC = b'CALCRING'
+    VERSION = 1
+    HEADER_SIZE = 4096
+    HEADER = struct.Struct('<8sHHIQ')
+    SLOT = struct.Struct('<B3d')
+    SLOT_SIZE = SLOT.size
+    NAME_SIZE = 16
+    MAX_OPERATIONS = (HEADER_SIZE - 32) // NAME_SIZE
+    DELETED = 0xFF
+
+    def __init__(self, file_path='history.ring', max_records=5, flush_size=1, flush_interval=None):
+        """
+        Initializes the RingHistoryManager with a specified file path for the ring buffer file.
+
+        If the file does not exist, it is created with an empty buffer. Otherwise the retained
+        records are loaded into memory once. A file created with another capacity is migrated
+        to `max_records`, keeping its most recent records.
+
+        Args:
+            file_path (str): Path to the ring buffer file for storing calculation history.
+            max_records (int): Capacity of the ring buffer, in records.
+            flush_size (int): Number of buffered records that triggers a flush.
+            flush_interval (float or None): Seconds after which buffered records are flushed.
+        """
+        if max_records < 1:
+            raise ValueError("The ring buffer needs room for at least one record.")
+        self._written = 0
+        self._operations = []
+        self._map = None
+        super().__init__(file_path=file_path, max_records=max_records, flush_size=flush_size,
+                         flush_interval=flush_interval)
+
+    def _read_header(self, ring_file):
+        """
+        Reads the header of the ring buffer file.
+
+        Args:
+            ring_file (file): The ring buffer file, opened in binary mode.
+
+        Returns:
+            tuple: The capacity, the number of records written and the operation names.
+        """
+        ring_file.seek(0)
+        header = ring_file.read(self.HEADER_SIZE)
+        if len(header) < self.HEADER_SIZE:
+            raise ValueError(f"'{self.file_path}' is not a ring history file.")
+        magic, version, slot_size, capacity, written = self.HEADER.unpack_from(header)
+        if magic != self.MAGIC or version != self.VERSION or slot_size != self.SLOT_SIZE:
+            raise ValueError(f"'{self.file_path}' is not a ring history file.")
+        names = header[32:]
+        operations = []
+        for offset in range(0, len(names), self.NAME_SIZE):
+            name = names[offset:offset + self.NAME_SIZE].rstrip(b'\0')
+            if not name:
+                break
+            operations.append(name.decode('utf-8'))
+        return capacity, written, operations
+
+    def _pack_header(self):
+        """
+        Returns the header for the current capacity, record count and operation names.
+        """
+        header = bytearray(self.HEADER_SIZE)
+        self.HEADER.pack_into(header, 0, self.MAGIC, self.VERSION, self.SLOT_SIZE, self.max_records, self._written)
+        for code, name in enumerate(self._operations):
+            offset = 32 + code * self.NAME_SIZE
+            header[offset:offset + self.NAME_SIZE] = name.encode('utf-8').ljust(self.NAME_SIZE, b'\0')
+        return bytes(header)
+
+    def _operation_code(self, operation):
+        """
+        Returns the code of an operation name, adding it to the operation table if it is new.
+
+        Args:
+            operation (str): The operation name, such as "Add".
+
+        Returns:
+            int: The code stored in the slots of the operation's records.
+        """
+        try:
+            return self._operations.index(operation)
+        except ValueError:
+            pass
+        if len(operation.encode('utf-8')) > self.NAME_SIZE:
+            raise ValueError(f"Operation name '{operation}' is longer than {self.NAME_SIZE} bytes.")
+        if len(self._operations) >= self.MAX_OPERATIONS:
+            raise ValueError(f"The ring history file holds at most {self.MAX_OPERATIONS} operations.")
+        self._operations.append(operation)
+        return len(self._operations) - 1
+
+    @timed('history_load_seconds', store='ring')
+    def _open_existing(self):
+        """
+        Loads the records of an existing ring buffer file, migrating it if its capacity differs.
+
+        Returns:
+            OrderedDict: The `[operation, num1, num2, result]` records by id, oldest first.
+        """
+        with open(self.file_path, 'rb') as ring_file:
+            capacity, written, self._operations = self._read_header(ring_file)
+        if capacity != self.max_records:
+            logging.info("Migrating ring history file '%s' from %s to %s records.",
+                         self.file_path, capacity, self.max_records)
+            records = self.read_records()[-self.max_records:]
+            self._rewrite(records)
+            return OrderedDict(enumerate(records, start=1))
+        self._written = self._next_id = written
+        self._next_id += 1
+        self._reserve_slots()
+        views = self.tail()
+        return OrderedDict(self._items(views, written - sum(len(view) for view in views) + 1))
+
+    def _refresh(self):
+        """
+        Does nothing: the slots of the ring buffer file are only written by this process.
+        """
+
+    def _trim(self):
+        """
+        Drops the retained records whose slots the newest records overwrite.
+        """
+        while self._records and next(iter(self._records)) < self._next_id - self.max_records:
+            self._records.popitem(last=False)
+
+    def _reserve_slots(self):
+        """
+        Extends the file to its full size, so that every slot can be memory-mapped.
+        """
+        size = self.HEADER_SIZE + self.max_records * self.SLOT_SIZE
+        if os.path.getsize(self.file_path) < size:
+            os.truncate(self.file_path, size)
+
+    def mapped(self):
+        """
+        Returns the slots of the ring buffer file, memory-mapped as a read-only NumPy array.
+
+        The array has one element per slot, in slot order, with the fields `operation`,
+        `num1`, `num2` and `result`. The map is shared with the file, so it shows records as
+        soon as they are flushed.
+
+        Returns:
+            numpy.memmap: The structured array of all `max_records` slots.
+        """
+        import numpy as np  # type: ignore # pylint: disable=import-outside-toplevel
+        with self._lock:
+            if self._map is None:
+                self._map = np.memmap(self.file_path, dtype=slot_dtype(), mode='r',
+                                      offset=self.HEADER_SIZE, shape=(self.max_records,))
+            return self._map
+
+    def tail(self, count=None):
+        """
+        Returns the last records of the history as zero-copy views of the memory-mapped file.
+
+        Buffered records are flushed first. Since the records wrap around the end of the ring,
+        they are returned as one or two consecutive views, oldest first; use
+        `numpy.concatenate` if a single (copied) array is needed. The slots of deleted records
+        are part of the views, with the operation code `DELETED`.
+
+        Args:
+            count (int, optional): Number of most recent slots to return. Defaults to all
+                written slots.
+
+        Returns:
+            list: One or two structured arrays of slots, oldest first.
+        """
+        with self._lock:
+            self.flush()
+            retained = min(self._written, self.max_records)
+            count = retained if count is None else max(0, min(count, retained))
+            slots = self.mapped()
+            start = (self._written - count) % self.max_records
+            if start + count <= self.max_records:
+                return [slots[start:start + count]]
+            return [slots[start:], slots[:start + count - self.max_records]]
+
+    def operation_name(self, code):
+        """
+        Returns the operation name stored under an operation code, or None if it is unknown.
+        """
+        return self._operations[code] if code < len(self._operations) else None
+
+    def to_records(self, views):
+        """
+        Converts views of the slots into `[operation, num1, num2, result]` records.
+
+        Deleted slots and slots with an unknown operation code are skipped.
+
+        Args:
+            views (list): Structured arrays of slots, such as the ones returned by `tail`.
+
+        Returns:
+            list: The records, in the order of the views.
+        """
+        return [record for _, record in self._items(views, 0)]
+
+    def _items(self, views, first_id):
+        """
+        Converts views of consecutive slots into `(id, record)` pairs, numbering the slots from
+        `first_id`. Deleted slots and slots with an unknown operation code are skipped.
+        """
+        items = []
+        record_id = first_id
+        for view in views:
+            codes = view['operation'].tolist()
+            for code, num1, num2, result in zip(codes, view['num1'].tolist(),
+                                                view['num2'].tolist(), view['result'].tolist()):
+                operation = self.operation_name(code)
+                if operation is not None:
+                    items.append((record_id, [operation, num1, num2, result]))
+                elif code != self.DELETED:
+                    logging.warning("Skipping malformed history slot in '%s'.", self.file_path)
+                record_id += 1
+        return items
+
+    def read_records(self):
+        """
+        Reads all records from the ring buffer file, from the oldest slot to the newest.
+
+        Deleted slots and slots with an unknown operation code are skipped.
+
+        Returns:
+            list: The `[operation, num1, num2, result]` records in the file, oldest first.
+        """
+        with open(self.file_path, 'rb') as ring_file:
+            capacity, written, operations = self._read_header(ring_file)
+            count = min(written, capacity)
+            ring_file.seek(self.HEADER_SIZE)
+            data = ring_file.read(capacity * self.SLOT_SIZE)
+        records = []
+        for slot in ((written - count + offset) % capacity for offset in range(count)):
+            try:
+                code, num1, num2, result = self.SLOT.unpack_from(data, slot * self.SLOT_SIZE)
+                if code != self.DELETED:
+                    records.append([operations[code], num1, num2, result])
+            except (IndexError, struct.error):
+                logging.warning("Skipping malformed history slot: %s", slot)
+        return records
+
+    def iter_records(self, chunk_size=10000):
+        """
+        Streams the records of the ring buffer file in chunks, oldest first.
+
+        The records are converted from views of the memory-mapped file one chunk at a time.
+
+        Args:
+            chunk_size (int): Maximum number of records per chunk.
+
+        Yields:
+            list: Chunks of `[operation, num1, num2, result]` records.
+        """
+        for view in self.tail():
+            for start in range(0, len(view), chunk_size):
+                yield self.to_records([view[start:start + chunk_size]])
+
+    @timed('history_flush_seconds', store='ring')
+    def flush(self):
+        """
+        Writes all buffered records into their slots and updates the header.
+
+        Consecutive slots are written with a single write, so a flush costs at most two slot
+        writes and one header write, whatever the capacity of the buffer.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            # Only the newest `max_records` pending records survive in the buffer
+            pending = self._pending[-self.max_records:]
+            first = self._written + len(self._pending) - len(pending)
+            data = b''.join(self.SLOT.pack(self._operation_code(operation), num1, num2, result)
+                            for _, operation, num1, num2, result in pending)
+            with open(self.file_path, 'r+b') as ring_file:
+                slot = first % self.max_records
+                head = min(len(pending), self.max_records - slot) * self.SLOT_SIZE
+                ring_file.seek(self.HEADER_SIZE + slot * self.SLOT_SIZE)
+                ring_file.write(data[:head])
+                if head < len(data):
+                    ring_file.seek(self.HEADER_SIZE)
+                    ring_file.write(data[head:])
+                self._written += len(self._pending)
+                increment('history_records_written_total', len(pending), store='ring')
+                ring_file.seek(0)
+                ring_file.write(self._pack_header())
+            self._pending = []
+
+    def _rewrite(self, records):
+        """
+        Rewrites the ring buffer file so that it holds the given records in its first slots,
+        as records 1 to `len(records)`.
+
+        Args:
+            records (list): The `[operation, num1, num2, result]` records to keep, oldest first.
+        """
+        self._written = len(records)
+        self._next_id = self._written + 1
+        self._operations = []
+        data = b''.join(self.SLOT.pack(self._operation_code(operation), num1, num2, result)
+                        for operation, num1, num2, result in records)
+        # Rewrite in place, so that the file never shrinks under the memory map
+        with open(self.file_path, 'r+b' if os.path.exists(self.file_path) else 'wb') as ring_file:
+            ring_file.write(self._pack_header())
+            ring_file.write(data)
+            ring_file.truncate(self.HEADER_SIZE + self.max_records * self.SLOT_SIZE)
+
+    @timed('history_compact_seconds', store='ring')
+    def compact(self):
+        """
+        Rewrites the ring buffer file so that it only holds the retained records, without
+        deleted slots, and numbers them from 1.
+
+        Buffered records are part of the retained records, so they are written as well.
+        """
+        with self._lock:
+            records = list(self._records.values())
+            self._rewrite(records)
+            self._positions = {record_id: self._positions[old_id]
+                               for record_id, old_id in enumerate(self._records, start=1) if old_id in self._positions}
+            self._records = OrderedDict(enumerate(records, start=1))
+            self._pending = []
+
+    def remove_record(self, record_id):
+        """
+        Removes a specific record from the history by id, marking its slot as deleted.
+
+        Args:
+            record_id (int): The id of the record to remove.
+
+        Returns:
+            bool: True if the record was removed; False if no retained record has that id.
+        """
+        with self._lock:
+            self.flush()
+            if record_id not in self._records:
+                return False
+            self._forget(record_id)
+            with open(self.file_path, 'r+b') as ring_file:
+                ring_file.seek(self.HEADER_SIZE + (record_id - 1) % self.max_records * self.SLOT_SIZE)
+                ring_file.write(bytes([self.DELETED]))
+            return True
+
+    def format_history(self, count=None, offset=None, limit=None):
+        """
+        Formats the history of calculations as a table, straight from the memory-mapped file.
+
+        Pages with an `offset` or a `limit`, and the last `count` records when some of the
+        last `count` slots are deleted, are formatted from the retained records in memory.
+
+        Args:
+            count (int, optional): Number of most recent records to include. Defaults to all
+                retained records.
+            offset (int, optional): Index of the first record to include, instead of `count`.
+            limit (int, optional): Maximum number of records to include.
+
+        Returns:
+            list: The lines of the table, or a single line saying that no history is available.
+        """
+        if offset is not None or limit is not None:
+            return super().format_history(count, offset, limit)
+        views = self.tail(count)
+        slots = sum(len(view) for view in views)
+        items = self._items(views, self._written - slots + 1)
+        if count is not None and len(items) < slots:
+            return super().format_history(count, offset, limit)
+        if not items:
+            return ["No history available."]
+        lines = ["Calculation History:",
+                 f"{'ID':>5}  {'Operation':<10} {'Num1':>12} {'Num2':>12} {'Result':>12}"]
+        for record_id, (operation, num1, num2, result) in items:
+            lines.append(f"{record_id:>5}  {operation:<10} {num1:>12} {num2:>12} {result:>12}")
+        return lines
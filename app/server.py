@@ -0,0 +1,279 @@
+import json
+import logging
+from decimal import Decimal
+from fractions import Fraction
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.expression import ExpressionError
+from app.metrics import get_metrics
+from app.numeric import FLOAT
+
+class CalculatorService:
+    """
+    Answers JSON requests with the commands of a CalculatorCommand, independently of HTTP.
+
+    A request is a JSON object naming a command of the calculator's registry, in lower case,
+    with its arguments:
+
+    - an arithmetic operation: `{"command": "add", "num1": 2, "num2": 3}`
+    - an expression: `{"command": "expression", "expression": "x*2", "bindings": {"x": 4}}`
+    - the history commands: `{"command": "showhistory", "count": 10}` (or `"offset"` and
+      `"limit"` for a page), `{"command": "clearhistory"}`, `{"command":
+      "deletespecificrecord", "id": 1}` and `{"command": "historystats", "since": 1700000000}`
+      (with an optional `"operation"` and `"until"`)
+
+    Every response is a JSON object holding either the outcome or an `error` message.
+
+    Attributes:
+        calculator (Calculator): The headless calculator computing and recording results.
+        history_manager (HistoryManager): The history store shared by all requests.
+        commands (dict): A dictionary mapping lower-case command names to their handlers.
+    """
+
+    def __init__(self, calculator, calculator_command):
+        """
+        Initializes the CalculatorService.
+
+        Args:
+            calculator (Calculator): The headless calculator computing and recording results.
+            calculator_command (CalculatorCommand): The calculator whose registry of
+                operations and history commands is exposed.
+        """
+        self.calculator = calculator
+        self.history_manager = calculator.history_manager
+        history_handlers = {
+            'ShowHistory': self._show_history,
+            'ClearHistory': self._clear_history,
+            'DeleteSpecificRecord': self._delete_record,
+            'HistoryStats': self._history_stats,
+            'Expression': self._evaluate,
+        }
+        self.commands = {}
+        for operation in calculator_command.operations.values():
+            name = operation.name.lower()
+            if name in calculator.operations:
+                self.commands[name] = self._calculate
+            elif operation.name in history_handlers:
+                self.commands[name] = history_handlers[operation.name]
+
+    def describe(self):
+        """
+        Returns the names of the commands that can be requested, sorted.
+        """
+        return {'commands': sorted(self.commands)}
+
+    def handle(self, request):
+        """
+        Answers a single request.
+
+        Args:
+            request (dict): The request object.
+
+        Returns:
+            tuple: The response object and whether the request succeeded.
+        """
+        if not isinstance(request, dict):
+            return {'error': "A request must be a JSON object."}, False
+        name = str(request.get('command', '')).lower()
+        handler = self.commands.get(name)
+        if handler is None:
+            return {'error': f"No such command: {request.get('command')}"}, False
+        try:
+            return handler(name, request), True
+        except ZeroDivisionError:
+            return {'error': "Cannot divide by zero."}, False
+        except ArithmeticError:
+            return {'error': "The result is undefined or out of range."}, False
+        except ExpressionError as e:
+            return {'error': str(e)}, False
+        except (KeyError, TypeError, ValueError):
+            return {'error': "Please enter valid numbers."}, False
+
+    def handle_many(self, requests):
+        """
+        Answers a batch of requests, in order. Failing requests do not stop the batch.
+
+        Args:
+            requests (list): The request objects.
+
+        Returns:
+            list: The response objects, in the order of the requests.
+        """
+        return [self.handle(request)[0] for request in requests]
+
+    def _calculate(self, name, request):
+        """
+        Computes an arithmetic operation and records it in the history.
+        """
+        return {'result': self.calculator.calculate(name, self._number(request['num1']), self._number(request['num2']))}
+
+    def _evaluate(self, _, request):
+        """
+        Evaluates an infix expression and records the operations applied in the history.
+
+        Expressions are evaluated in floating point whatever the numeric backend, so the
+        bindings are converted to floats.
+        """
+        bindings = {name: float(value) for name, value in (request.get('bindings') or {}).items()}
+        return {'result': self.calculator.evaluate(str(request['expression']), bindings)}
+
+    def _number(self, value):
+        """
+        Converts an operand of a calculation to the calculator's numeric backend.
+
+        The exact backends parse the text of the number, so an integer of any size, or a
+        decimal sent as a JSON string such as "0.1000000000000000000001", keeps every digit.
+        """
+        backend = self.calculator.numeric
+        return float(value) if backend is FLOAT else backend.parse(str(value))
+
+    def _show_history(self, _, request):
+        """
+        Returns the retained history, its last `count` records, or the page of at most `limit`
+        records from `offset`, with the ids of the records.
+        """
+        total = self.history_manager.count_records()
+        count, offset, limit = request.get('count'), request.get('offset'), request.get('limit')
+        if offset is None:
+            offset = 0 if count is None else max(0, total - int(count))
+        offset, limit = int(offset), None if limit is None else int(limit)
+        records = self.history_manager.load_history(offset, limit)
+        return {'history': records, 'ids': self.history_manager.record_ids(offset, limit), 'offset': offset,
+                'total': total}
+
+    def _clear_history(self, _, __):
+        """
+        Removes all records from the history.
+        """
+        self.history_manager.clear_records()
+        return {'cleared': True}
+
+    def _delete_record(self, _, request):
+        """
+        Removes the record with the id `id` from the history.
+        """
+        return {'deleted': self.history_manager.remove_record(int(request['id']))}
+
+    def _history_stats(self, _, request):
+        """
+        Returns the statistics of every operation, or of `operation`, over the records added
+        between the times `since` and `until`, in seconds since the epoch.
+        """
+        since, until = request.get('since'), request.get('until')
+        return {'stats': self.history_manager.history_stats(
+            request.get('operation'), None if since is None else float(since), None if until is None else float(until))}
+
+class CalculatorRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves a CalculatorService over HTTP/1.1 with persistent (keep-alive) connections.
+
+    - `GET /commands` lists the commands that can be requested.
+    - `GET /metrics` sends the latency metrics in the Prometheus text format.
+    - `POST /` answers the JSON request in the body. A JSON array of requests is answered
+      with an array of responses, in order.
+
+    Every response carries a Content-Length, so the client can send its next request on the
+    same connection. Nagle's algorithm is disabled, so that the body written after the headers
+    is not held back waiting for the client's delayed acknowledgement.
+    """
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'CalculatorServer/1.0'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Lists the commands that can be requested, or sends the metrics.
+        """
+        path = self.path.rstrip('/')
+        if path == '/commands':
+            self.send_json(200, self.server.service.describe())
+        elif path == '/metrics':
+            self.send_metrics()
+        else:
+            self.send_json(404, {'error': f"Not found: {self.path}"})
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """
+        Answers a single request or a batch of requests.
+        """
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'null')
+        except ValueError:
+            self.send_json(400, {'error': "The request body must be JSON."})
+            return
+        if isinstance(body, list):
+            self.send_json(200, self.server.service.handle_many(body))
+        else:
+            response, ok = self.server.service.handle(body)
+            self.send_json(200 if ok else 400, response)
+
+    def send_metrics(self):
+        """
+        Sends the metrics in the Prometheus text format, or a 404 if metrics are disabled.
+        """
+        metrics = get_metrics()
+        if metrics is None:
+            self.send_json(404, {'error': "Metrics are disabled."})
+            return
+        data = metrics.to_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_json(self, status, payload):
+        """
+        Sends a JSON response.
+
+        Args:
+            status (int): The HTTP status code.
+            payload (object): The object sent as JSON.
+        """
+        data = json.dumps(payload, default=_exact_number).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """
+        Sends the access log to the application log instead of standard error.
+        """
+        logging.debug("%s - %s", self.address_string(), format % args)
+
+
+class CalculatorHTTPServer(ThreadingHTTPServer):
+    """
+    A threaded HTTP server answering calculator requests, one thread per connection.
+
+    All connections share the service, and with it one calculator and one history manager.
+
+    Attributes:
+        service (CalculatorService): The service answering the requests.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, service):
+        """
+        Initializes the server and binds it to its address.
+
+        Args:
+            address (tuple): The `(host, port)` to listen on; port 0 picks a free port.
+            service (CalculatorService): The service answering the requests.
+        """
+        super().__init__(address, CalculatorRequestHandler)
+        self.service = service
+
+
+def _exact_number(value):
+    """
+    Encodes the exact results of the decimal and fraction backends as JSON strings, such as "0.3"
+    or "1/3", so that no digits are lost.
+    """
+    if isinstance(value, (Decimal, Fraction)):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
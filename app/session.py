@@ -0,0 +1,126 @@
+from app.history_manager import run_in_thread
+
+class SessionClosed(Exception):
+    """
+    Raised when an asynchronous session ends, because its input is exhausted or the user exits.
+    """
+
+
+class Session:
+    """
+    The input and output of one user of the calculator in an asynchronous setting.
+
+    Commands running in a session prompt with `await session.input(...)` and display text
+    with `session.print(...)` instead of the blocking built-ins, so many sessions can share
+    one event loop.
+
+    Attributes:
+        numeric_backend (NumericBackend or None): The number type the session calculates in,
+            or None for the process-wide numeric backend.
+    """
+
+    numeric_backend = None
+
+    async def input(self, prompt=''):
+        """
+        Displays a prompt and waits for a line of input.
+
+        Args:
+            prompt (str): The text displayed before the input.
+
+        Returns:
+            str: The line entered, without its line break.
+
+        Raises:
+            SessionClosed: If the input is exhausted.
+        """
+        raise NotImplementedError
+
+    def print(self, *values, sep=' ', end='\n'):
+        """
+        Displays values, like the built-in `print`.
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        """
+        Releases the resources of the session once it has ended.
+        """
+
+
+class ConsoleSession(Session):
+    """
+    A session on the standard input and output of the process.
+
+    Reading standard input blocks, so it is done in a worker thread.
+    """
+
+    async def input(self, prompt=''):
+        """
+        Displays a prompt on standard output and reads a line from standard input.
+        """
+        try:
+            return await run_in_thread(input, prompt)
+        except EOFError:
+            raise SessionClosed() from None
+
+    def print(self, *values, sep=' ', end='\n'):
+        """
+        Displays values on standard output.
+        """
+        print(*values, sep=sep, end=end)
+
+
+class StreamSession(Session):
+    """
+    A session on an asyncio stream pair, such as a TCP connection of `asyncio.start_server`.
+
+    Attributes:
+        reader (asyncio.StreamReader): The stream the input lines are read from.
+        writer (asyncio.StreamWriter): The stream prompts and output are written to.
+        encoding (str): The encoding of the streams.
+    """
+
+    def __init__(self, reader, writer, encoding='utf-8'):
+        """
+        Initializes the StreamSession.
+
+        Args:
+            reader (asyncio.StreamReader): The stream the input lines are read from.
+            writer (asyncio.StreamWriter): The stream prompts and output are written to.
+            encoding (str): The encoding of the streams.
+        """
+        self.reader = reader
+        self.writer = writer
+        self.encoding = encoding
+
+    async def input(self, prompt=''):
+        """
+        Writes a prompt, waits until it is sent and reads a line from the stream.
+        """
+        self.writer.write(prompt.encode(self.encoding))
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise SessionClosed()
+        return line.decode(self.encoding).rstrip('\r\n')
+
+    def print(self, *values, sep=' ', end='\n'):
+        """
+        Writes values to the stream; they are sent with the next prompt at the latest.
+        """
+        self.writer.write((sep.join(str(value) for value in values) + end).encode(self.encoding))
+
+    async def close(self):
+        """
+        Sends any remaining output and closes the stream.
+        """
+        try:
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
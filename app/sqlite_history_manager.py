@@ -0,0 +1,223 @@
+import sqlite3
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from fractions import Fraction
+from app.history_manager import HistoryManager
+from app.metrics import increment, timed
+
+# Results of the exact numeric backends are stored as REAL values, like floats
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_adapter(Fraction, float)
+
+class SqliteHistoryManager(HistoryManager):
+    """
+    Manages the history of calculations, stored in a SQLite database.
+
+    The database runs in WAL mode, so readers never block the writer. Buffered records are
+    inserted with one prepared statement in a single transaction per flush, and the oldest rows
+    are evicted by primary key in the same transaction, so the table never holds more than
+    `max_records` rows. The id of a record is the primary key of its row, so `delete_record`
+    deletes by primary key. Rows are indexed by operation and by timestamp, so `find_records`
+    and `delete_record` never scan the table.
+
+    Attributes:
+        file_path (str): Path to the SQLite database where history records are stored.
+        max_records (int): Number of most recent records retained in the history.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS history ("
+        " id INTEGER PRIMARY KEY, operation TEXT NOT NULL, num1 REAL NOT NULL,"
+        " num2 REAL NOT NULL, result REAL NOT NULL, created_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS history_operation ON history (operation, id)",
+        "CREATE INDEX IF NOT EXISTS history_created_at ON history (created_at)",
+    )
+    INSERT = "INSERT INTO history (id, operation, num1, num2, result, created_at) VALUES (?, ?, ?, ?, ?, ?)"
+    EVICT = "DELETE FROM history WHERE id IN (SELECT id FROM history ORDER BY id LIMIT ?)"
+    DELETE = "DELETE FROM history WHERE id = ?"
+    SELECT_AFTER = "SELECT id, operation, num1, num2, result FROM history WHERE id > ? ORDER BY id LIMIT ?"
+    SELECT_RETAINED = ("SELECT id, operation, num1, num2, result FROM"
+                       " (SELECT * FROM history ORDER BY id DESC LIMIT ?) ORDER BY id")
+
+    def __init__(self, file_path='history.db', max_records=5, flush_size=1, flush_interval=None):
+        """
+        Initializes the SqliteHistoryManager with a specified path for the database.
+
+        The database and its table and indexes are created if they do not exist, and the
+        retained records are loaded into memory once.
+
+        Args:
+            file_path (str): Path to the SQLite database for storing calculation history.
+            max_records (int): Number of most recent records to retain.
+            flush_size (int): Number of buffered records that triggers a flush.
+            flush_interval (float or None): Seconds after which buffered records are flushed.
+        """
+        # The background flusher shares the connection, always under the manager's lock
+        self._connection = sqlite3.connect(file_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            for statement in self.SCHEMA:
+                self._connection.execute(statement)
+        self._count = 0
+        super().__init__(file_path=file_path, max_records=max_records, flush_size=flush_size,
+                         flush_interval=flush_interval)
+
+    @timed('history_load_seconds', store='sqlite')
+    def _open_existing(self):
+        """
+        Reads the retained records of the database, evicting rows beyond `max_records`.
+
+        Returns:
+            OrderedDict: The `[operation, num1, num2, result]` records by id, oldest first.
+        """
+        rows = self._connection.execute(self.SELECT_RETAINED, (self.max_records,)).fetchall()
+        self._next_id = self._connection.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM history").fetchone()[0]
+        self._count = self._connection.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+        if self._count > self.max_records:
+            with self._connection:
+                self._connection.execute(self.EVICT, (self._count - self.max_records,))
+            self._count = self.max_records
+        return OrderedDict((row[0], list(row[1:])) for row in rows)
+
+    def _record_times(self):
+        """
+        Returns the time every retained record was written, from the `created_at` column, so
+        that time windows of the columnar store cover the records of earlier sessions too.
+        """
+        times = dict(self._connection.execute("SELECT id, created_at FROM history"))
+        return [times[record_id] for record_id in self._records]
+
+    def read_records(self):
+        """
+        Reads all records from the database.
+
+        Returns:
+            list: The `[operation, num1, num2, result]` records in the database, oldest first.
+        """
+        with self._lock:
+            rows = self._connection.execute(self.SELECT_RETAINED, (self.max_records,)).fetchall()
+        return [list(row[1:]) for row in rows]
+
+    def find_records(self, operation=None, limit=None, since=None):
+        """
+        Queries the history through the indexes, such as the last ten multiplications.
+
+        Buffered records are flushed first so that they are part of the result.
+
+        Args:
+            operation (str, optional): Only return records of this operation, such as "Multiply".
+            limit (int, optional): Only return this many of the most recent matching records.
+            since (float, optional): Only return records written at or after this Unix timestamp.
+
+        Returns:
+            list: The matching records as dictionaries keyed by column name, oldest first.
+        """
+        conditions, parameters = [], []
+        if operation is not None:
+            conditions.append("operation = ?")
+            parameters.append(operation)
+        if since is not None:
+            conditions.append("created_at >= ?")
+            parameters.append(since)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        parameters.append(limit if limit is not None else -1)
+        query = f"SELECT operation, num1, num2, result FROM history{where} ORDER BY id DESC LIMIT ?"
+        with self._lock:
+            self.flush()
+            rows = self._connection.execute(query, parameters).fetchall()
+        return [dict(zip(self.COLUMNS, row)) for row in reversed(rows)]
+
+    def iter_records(self, chunk_size=10000):
+        """
+        Streams the records of the database in chunks, oldest first.
+
+        Each chunk is one query seeking past the last id of the previous chunk through the
+        primary key, so the connection is only held while a chunk is read.
+
+        Args:
+            chunk_size (int): Maximum number of records per chunk.
+
+        Yields:
+            list: Chunks of `[operation, num1, num2, result]` records.
+        """
+        last_id = 0
+        while True:
+            with self._lock:
+                self.flush()
+                rows = self._connection.execute(self.SELECT_AFTER, (last_id, chunk_size)).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [list(row[1:]) for row in rows]
+
+    @timed('history_flush_seconds', store='sqlite')
+    def flush(self):
+        """
+        Inserts all buffered records in a single transaction and evicts the oldest rows.
+
+        The records are stamped with the time of the flush, and their ids are the primary keys
+        of their rows.
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            pending = self._pending[-self.max_records:]
+            created_at = time.time()
+            with self._connection:
+                self._connection.executemany(self.INSERT, (row + [created_at] for row in pending))
+                self._count += len(pending)
+                if self._count > self.max_records:
+                    self._connection.execute(self.EVICT, (self._count - self.max_records,))
+                    self._count = self.max_records
+            increment('history_records_written_total', len(pending), store='sqlite')
+            self._pending = []
+
+    def close(self):
+        """
+        Stops the background flusher, if any, flushes all buffered records and closes the database.
+        """
+        super().close()
+        with self._lock:
+            self._connection.close()
+
+    def compact(self):
+        """
+        Flushes all buffered records; evicted rows are already deleted on every flush.
+        """
+        self.flush()
+
+    def clear_records(self):
+        """
+        Removes all records from the calculation history by deleting every row of the table.
+        """
+        with self._lock:
+            self._records.clear()
+            if self._columnar is not None:
+                self._columnar.clear()
+                self._positions = {}
+            self._pending = []
+            with self._connection:
+                self._connection.execute("DELETE FROM history")
+            self._count = 0
+
+    def remove_record(self, record_id):
+        """
+        Removes a specific record from the history by id, with a single delete by primary key.
+
+        Args:
+            record_id (int): The id of the record to remove.
+
+        Returns:
+            bool: True if the record was removed; False if no retained record has that id.
+        """
+        with self._lock:
+            self.flush()
+            if record_id not in self._records:
+                return False
+            with self._connection:
+                self._connection.execute(self.DELETE, (record_id,))
+            self._forget(record_id)
+            self._count -= 1
+            return True
@@ -0,0 +1,67 @@
+"""
+Measures batch throughput of the serial BatchProcessor and of the ParallelBatchProcessor with
+an increasing number of worker processes.
+
+Each parallel run includes starting the worker pool, so small inputs mostly measure the
+start-up of the workers; the scaling with cores shows on inputs of a million rows or more.
+
+Usage:
+    python benchmarks/batch_scaling.py [--rows N] [--workers N ...] [--json PATH]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.batch import BatchProcessor, ParallelBatchProcessor  # pylint: disable=wrong-import-position
+from app.history_manager import HistoryManager  # pylint: disable=wrong-import-position
+from app.plugins.calculator import CalculatorCommand  # pylint: disable=wrong-import-position
+
+OPERATIONS = ('add', 'subtract', 'multiply', 'divide')
+
+
+def run(rows, worker_counts):
+    """
+    Measures the serial processor and the parallel processor for every worker count.
+
+    Args:
+        rows (int): Number of rows in the batch.
+        worker_counts (list): The worker counts of the parallel runs.
+
+    Returns:
+        dict: Rows per second, keyed by 'serial' and by the number of workers.
+    """
+    source = ''.join(f"{OPERATIONS[i % 4]},{i % 97 + 1},{i % 13 + 1}\n" for i in range(rows))
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        history_manager = HistoryManager(file_path=os.path.join(temp_dir, 'history.csv'))
+        processors = [('serial', BatchProcessor.from_calculator(CalculatorCommand(), history_manager))]
+        processors += [(str(workers), ParallelBatchProcessor(history_manager, workers=workers))
+                       for workers in worker_counts]
+        for name, processor in processors:
+            start = time.perf_counter()
+            processor.run(io.StringIO(source), io.StringIO())
+            results[name] = rows / (time.perf_counter() - start)
+        history_manager.close()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument('--json', metavar='PATH', help="also write the results to PATH as JSON")
+    args = parser.parse_args()
+    results = run(args.rows, sorted(set(args.workers)))
+    for name, throughput in results.items():
+        label = name if name == 'serial' else f"{name} workers"
+        print(f"{label:12} {throughput:12,.0f} rows/s  {throughput / results['serial']:5.2f}x")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as json_file:
+            json.dump(results, json_file, indent=2)
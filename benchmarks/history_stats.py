@@ -0,0 +1,89 @@
+"""
+Measures aggregate queries over the columnar history store at tens of millions of records.
+
+The records are loaded column by column, spread evenly over one day, and every query is
+timed over the whole store and over time windows of several sizes, which are aggregated
+from the summaries of the blocks they cover.
+
+Usage:
+    python benchmarks/history_stats.py [--records N] [--repeat N] [--json PATH]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np  # type: ignore
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.columnar_history import ColumnarHistory  # pylint: disable=wrong-import-position
+
+OPERATIONS = np.array(['Add', 'Subtract', 'Multiply', 'Divide'])
+DAY = 86400.0
+CHUNK = 1000000
+
+
+def load(records):
+    """
+    Builds a store of random records spread evenly over one day, a million at a time.
+
+    Returns:
+        ColumnarHistory: The store.
+    """
+    rng = np.random.default_rng(0)
+    store = ColumnarHistory(capacity=records)
+    for start in range(0, records, CHUNK):
+        count = min(CHUNK, records - start)
+        num1, num2 = rng.uniform(-100, 100, count), rng.uniform(-100, 100, count)
+        store.add_columns(OPERATIONS[rng.integers(0, 4, count)], num1, num2, num1 + num2,
+                          np.arange(start, start + count) * (DAY / records))
+    return store
+
+
+def run(records, repeat):
+    """
+    Measures loading the store and the best time of every query.
+
+    Args:
+        records (int): Number of records in the store.
+        repeat (int): Number of times every query is run.
+
+    Returns:
+        dict: Seconds to load the store ('load') and the best milliseconds of every query.
+    """
+    start = time.perf_counter()
+    store = load(records)
+    results = {'load': time.perf_counter() - start}
+    queries = {
+        'all': {},
+        'all, one operation': {'operation': 'Add'},
+        'last hour': {'since': DAY - 3600},
+        'middle 12 hours': {'since': DAY / 4, 'until': 3 * DAY / 4},
+        'whole day window': {'since': 0.0, 'until': DAY},
+    }
+    for name, arguments in queries.items():
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            store.aggregate(**arguments)
+            times.append(time.perf_counter() - start)
+        results[name] = min(times) * 1000
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=20000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', metavar='PATH', help="also write the results to PATH as JSON")
+    args = parser.parse_args()
+    results = run(args.records, args.repeat)
+    print(f"{'load':>20}  {results['load']:10.2f} s for {args.records:,} records")
+    for query, milliseconds in results.items():
+        if query != 'load':
+            print(f"{query:>20}  {milliseconds:10.3f} ms")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as json_file:
+            json.dump(results, json_file, indent=2)
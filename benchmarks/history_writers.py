@@ -0,0 +1,93 @@
+"""
+Measures history write throughput with an increasing number of concurrent writers.
+
+Writers are threads sharing one HistoryManager, whose writes are committed as a group, or
+processes with one HistoryManager each, sharing the history file through its lock. Every
+record is written through, and with `--durable` synced to disk, before the writer continues.
+
+Usage:
+    python benchmarks/history_writers.py [--records N] [--writers N ...] [--processes]
+                                         [--durable] [--json PATH]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.history_manager import HistoryManager  # pylint: disable=wrong-import-position
+
+
+def write_records(manager, name, count):
+    """
+    Adds `count` records, one at a time, to the history.
+    """
+    for i in range(count):
+        manager.add_record(name, i, 1, i + 1)
+
+
+def write_records_in_process(file_path, name, count, durable):
+    """
+    Adds `count` records to the history file through a HistoryManager of this process.
+    """
+    manager = HistoryManager(file_path=file_path, max_records=1000, durable=durable)
+    write_records(manager, name, count)
+    manager.close()
+
+
+def run(records, writer_counts, processes=False, durable=False):
+    """
+    Measures the throughput of every writer count, each writer adding `records` records.
+
+    Args:
+        records (int): Number of records added by each writer.
+        writer_counts (list): The numbers of concurrent writers.
+        processes (bool): Whether the writers are processes instead of threads.
+        durable (bool): Whether every write is synced to disk.
+
+    Returns:
+        dict: Records per second, keyed by the number of writers.
+    """
+    results = {}
+    for writers in writer_counts:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'history.csv')
+            manager = HistoryManager(file_path=file_path, max_records=1000, durable=durable)
+            if processes:
+                workers = [multiprocessing.Process(target=write_records_in_process,
+                                                   args=(file_path, f'w{n}', records, durable))
+                           for n in range(writers)]
+            else:
+                workers = [threading.Thread(target=write_records, args=(manager, f'w{n}', records))
+                           for n in range(writers)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            results[str(writers)] = writers * records / (time.perf_counter() - start)
+            manager.close()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=2000, help="records added by each writer")
+    parser.add_argument('--writers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--processes', action='store_true', help="use processes instead of threads")
+    parser.add_argument('--durable', action='store_true', help="sync every write to disk")
+    parser.add_argument('--json', metavar='PATH', help="also write the results to PATH as JSON")
+    args = parser.parse_args()
+    results = run(args.records, sorted(set(args.writers)), args.processes, args.durable)
+    baseline = next(iter(results.values()))
+    for writers, throughput in results.items():
+        print(f"{writers:>3} writers {throughput:12,.0f} records/s  {throughput / baseline:5.2f}x")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as json_file:
+            json.dump(results, json_file, indent=2)
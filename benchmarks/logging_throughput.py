@@ -0,0 +1,123 @@
+"""
+Measures calculation throughput with synchronous logging, queue-based logging and logging
+turned off.
+
+Two paths are measured:
+
+- ``batch``: the BatchProcessor evaluating an in-memory CSV of calculations, which logs once
+  per run.
+- ``calculate``: the Calculator facade called once per calculation, which logs every
+  calculation.
+
+The handlers mirror `logging.conf`: a rotating file handler and a console handler (writing
+to the null device here), both with the same formatter.
+
+Usage:
+    python benchmarks/logging_throughput.py [--rows N] [--json PATH]
+"""
+
+import argparse
+import io
+import json
+import logging
+import logging.handlers
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.batch import BatchProcessor  # pylint: disable=wrong-import-position
+from app.calculator import Calculator  # pylint: disable=wrong-import-position
+from app.history_manager import HistoryManager  # pylint: disable=wrong-import-position
+from app.log_queue import start_queue_logging, stop_queue_logging  # pylint: disable=wrong-import-position
+
+OPERATIONS = ('add', 'subtract', 'multiply', 'divide')
+
+
+def configure_handlers(temp_dir, mode):
+    """
+    Sets up the root logger for one logging mode.
+
+    Args:
+        temp_dir (str): Directory receiving the log file.
+        mode (str): 'sync', 'queue' or 'off'.
+
+    Returns:
+        list: The handlers attached for the run, to be closed afterwards.
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = [
+        logging.handlers.RotatingFileHandler(os.path.join(temp_dir, 'bench.log'), 'a', 1048576, 5),
+        logging.StreamHandler(open(os.devnull, 'w', encoding='utf-8')),  # pylint: disable=consider-using-with
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        root.addHandler(handler)
+    root.setLevel(logging.WARNING if mode == 'off' else logging.INFO)
+    if mode == 'queue':
+        start_queue_logging()
+    return handlers
+
+
+def release_handlers(handlers):
+    """
+    Drains the queue, if any, and closes the handlers of a run.
+    """
+    stop_queue_logging()
+    root = logging.getLogger()
+    for handler in handlers:
+        root.removeHandler(handler)
+        handler.close()
+
+
+def run(rows):
+    """
+    Measures both paths in every logging mode.
+
+    Args:
+        rows (int): Number of calculations per measurement.
+
+    Returns:
+        dict: Calculations per second, keyed by path and logging mode.
+    """
+    source = ''.join(f"{OPERATIONS[i % 4]},{i % 97 + 1},{i % 13 + 1}\n" for i in range(rows))
+    calculations = [(OPERATIONS[i % 4], float(i % 97 + 1), float(i % 13 + 1)) for i in range(rows)]
+    results = {'batch': {}, 'calculate': {}}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        history_manager = HistoryManager(file_path=os.path.join(temp_dir, 'history.csv'), flush_size=1000)
+        calculator = Calculator.from_command(history_manager=history_manager)
+        processor = BatchProcessor(calculator.operations, history_manager)
+        for mode in ('sync', 'queue', 'off'):
+            handlers = configure_handlers(temp_dir, mode)
+            try:
+                start = time.perf_counter()
+                processor.run(io.StringIO(source), io.StringIO())
+                results['batch'][mode] = rows / (time.perf_counter() - start)
+
+                start = time.perf_counter()
+                for name, num1, num2 in calculations:
+                    calculator.calculate(name, num1, num2)
+                results['calculate'][mode] = rows / (time.perf_counter() - start)
+            finally:
+                release_handlers(handlers)
+        history_manager.close()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--json', metavar='PATH', help="also write the results to PATH as JSON")
+    args = parser.parse_args()
+    results = run(args.rows)
+    for path, modes in results.items():
+        for mode, throughput in modes.items():
+            print(f"{path:10} logging {mode:6} {throughput:12,.0f} calculations/s")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as json_file:
+            json.dump(results, json_file, indent=2)
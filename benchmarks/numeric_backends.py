@@ -0,0 +1,74 @@
+"""
+Measures calculation throughput of every numeric backend, in batches and one call at a time.
+
+The float backend evaluates batches with NumPy and skips the backend on single calls; the
+exact backends (decimal, fraction and int) evaluate every row in Python, so this shows the
+cost of exact arithmetic against the float fast path.
+
+Usage:
+    python benchmarks/numeric_backends.py [--rows N] [--calls N] [--json PATH]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.batch import BatchProcessor  # pylint: disable=wrong-import-position
+from app.calculator import Calculator  # pylint: disable=wrong-import-position
+from app.history_manager import HistoryManager  # pylint: disable=wrong-import-position
+from app.plugins.calculator import CalculatorCommand  # pylint: disable=wrong-import-position
+
+OPERATIONS = ('add', 'subtract', 'multiply', 'divide')
+BACKENDS = ('float', 'decimal', 'fraction', 'int')
+
+
+def run(rows, calls):
+    """
+    Measures batch and per-call throughput of every backend.
+
+    Args:
+        rows (int): Number of rows in the batch.
+        calls (int): Number of single calculations.
+
+    Returns:
+        dict: Rows per second ('batch') and calculations per second ('calculate'), keyed by
+        backend name.
+    """
+    source = ''.join(f"{OPERATIONS[i % 4]},{i % 97 + 1},{i % 13 + 1}\n" for i in range(rows))
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        history_manager = HistoryManager(file_path=os.path.join(temp_dir, 'history.csv'))
+        calculator_command = CalculatorCommand()
+        calculator = Calculator.from_command(calculator_command, log=False, record_history=False)
+        for backend in BACKENDS:
+            processor = BatchProcessor.from_calculator(calculator_command, history_manager, numeric=backend)
+            start = time.perf_counter()
+            processor.run(io.StringIO(source), io.StringIO())
+            batch = rows / (time.perf_counter() - start)
+            start = time.perf_counter()
+            for i in range(calls):
+                calculator.calculate(OPERATIONS[i % 4], i % 97 + 1, i % 13 + 1, numeric=backend)
+            results[backend] = {'batch': batch, 'calculate': calls / (time.perf_counter() - start)}
+        history_manager.close()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--calls', type=int, default=100000)
+    parser.add_argument('--json', metavar='PATH', help="also write the results to PATH as JSON")
+    args = parser.parse_args()
+    results = run(args.rows, args.calls)
+    for backend, throughput in results.items():
+        print(f"{backend:>8}  batch {throughput['batch']:12,.0f} rows/s"
+              f"  calculate {throughput['calculate']:12,.0f} calls/s")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as json_file:
+            json.dump(results, json_file, indent=2)
@@ -0,0 +1,276 @@
+"""
+Benchmark suite for the calculator and history hot paths.
+
+Covers HistoryManager add_record/load_history/delete_record at several history sizes,
+opening a history in every storage format, compute and apply of every operation, plugin loading in App.load_plugins, and the REPL
+loop fed from a scripted standard input. Every run is saved as JSON, by default to
+benchmarks/results/<timestamp>.json, and can be compared against an earlier run.
+
+Usage:
+    python benchmarks/run.py [--quick] [--only NAME ...] [--output PATH] [--compare PATH]
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import App  # pylint: disable=wrong-import-position
+from app.calculator import Calculator  # pylint: disable=wrong-import-position
+from app.history_manager import HistoryManager, configure_history_manager  # pylint: disable=wrong-import-position
+from app.ring_history_manager import RingHistoryManager  # pylint: disable=wrong-import-position
+from app.sqlite_history_manager import SqliteHistoryManager  # pylint: disable=wrong-import-position
+
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    """
+    Registers a benchmark function under its name.
+    """
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def measure(func, number, repeat=5):
+    """
+    Times a function the way `timeit` does: `repeat` rounds of `number` calls each.
+
+    Args:
+        func (callable): The function to time, called without arguments.
+        number (int): Number of calls per round.
+        repeat (int): Number of rounds.
+
+    Returns:
+        dict: The best and median time per call in microseconds, and the call counts.
+    """
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number * 1e6)
+    return {'best_us': min(rounds), 'median_us': statistics.median(rounds), 'number': number, 'repeat': repeat}
+
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Silences standard output, standard error and logging below WARNING while benchmarking.
+
+    The REPL benchmark configures logging as the application does, so its records are
+    still written to logs/app.log.
+    """
+    root = logging.getLogger()
+    level = root.level
+    root.setLevel(logging.WARNING)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            yield
+    finally:
+        root.setLevel(level)
+
+
+@benchmark
+def history(scale, temp_dir):
+    """
+    HistoryManager add_record, load_history and delete_record at several history sizes.
+    """
+    results = {}
+    for size in (10, 1000, 100000)[:2 if scale < 1 else 3]:
+        path = os.path.join(temp_dir, f'history_{size}.csv')
+        manager = HistoryManager(file_path=path, max_records=size, compact_every=size)
+        manager.add_records([['Add', float(i), 1.0, float(i + 1)] for i in range(size)])
+        number = max(1, int(200 * scale))
+        results[f'add_record[{size}]'] = measure(lambda: manager.add_record('Add', 1.0, 2.0, 3.0), number)
+        results[f'load_history[{size}]'] = measure(manager.load_history, max(1, number // 10))
+        # Keep the total number of deletions well below the history size
+        deletions = max(1, min(number // 10, size // 10))
+        results[f'delete_record[{size}]'] = measure(lambda: manager.delete_record(manager.record_ids(0, 1)[0]), deletions)
+        manager.close()
+    return results
+
+
+@benchmark
+def history_formats(scale, temp_dir):
+    """
+    Opening (loading) a full history in every storage format, and the last 1,000 records of
+    the memory-mapped ring buffer.
+    """
+    size = 100000 if scale >= 1 else 10000
+    records = [['Add', float(i), 1.0, float(i + 1)] for i in range(size)]
+    results = {}
+    for name, manager_class in (('csv', HistoryManager), ('ring', RingHistoryManager), ('sqlite', SqliteHistoryManager)):
+        path = os.path.join(temp_dir, f'formats_{size}.{name}')
+        manager = manager_class(file_path=path, max_records=size)
+        manager.add_records(records)
+        manager.close()
+        results[f'{name}.open[{size}]'] = measure(lambda cls=manager_class, p=path: cls(file_path=p, max_records=size).close(),
+                                                  max(1, int(5 * scale)), repeat=3)
+    ring = RingHistoryManager(file_path=os.path.join(temp_dir, f'formats_{size}.ring'), max_records=size)
+    results['ring.tail[1000]'] = measure(lambda: ring.tail(1000), max(1, int(10000 * scale)))
+    ring.close()
+    return results
+
+
+@benchmark
+def operations(scale, temp_dir):
+    """
+    compute() of every operation for one pair of numbers, and apply() over 100,000 pairs.
+    """
+    import numpy as np  # type: ignore # pylint: disable=import-outside-toplevel
+    calculator = Calculator.from_command(history_manager=HistoryManager(os.path.join(temp_dir, 'ops.csv')))
+    num1 = np.linspace(1, 1000, 100000)
+    num2 = np.linspace(1000, 1, 100000)
+    results = {}
+    for name, operation in sorted(calculator.operations.items()):
+        results[f'{name}.compute'] = measure(lambda op=operation: op.compute(6.0, 3.0), int(100000 * scale))
+        results[f'{name}.apply[100000]'] = measure(lambda op=operation: op.apply(num1, num2), max(1, int(20 * scale)))
+    return results
+
+
+@benchmark
+def plugin_loading(scale, temp_dir):
+    """
+    App.load_plugins with an up-to-date plugin manifest and with a missing one.
+    """
+    manifest_path = os.path.join(temp_dir, 'plugin_manifest.json')
+    os.environ['PLUGIN_MANIFEST'] = manifest_path
+    os.environ['HISTORY_FILE'] = os.path.join(temp_dir, 'plugins_history.csv')
+    app = App()
+
+    def load_plugins(rebuild):
+        if rebuild and os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        app.command_handler.commands = {}
+        app.load_plugins()
+
+    number = max(1, int(100 * scale))
+    results = {
+        'manifest': measure(lambda: load_plugins(False), number),
+        'no-manifest': measure(lambda: load_plugins(True), number),
+    }
+    app.history_manager.close()
+    return results
+
+
+@benchmark
+def repl(scale, temp_dir):
+    """
+    The REPL loop fed from a scripted standard input, performing additions through the
+    calculator menu.
+    """
+    calculations = max(1, int(1000 * scale))
+    # Main menu: 1 = calculator; calculator menu: 1 = Add, 0 = back
+    script = "1\n" + "1\n2\n3\n" * calculations + "0\nexit\n"
+    os.environ['HISTORY_FILE'] = os.path.join(temp_dir, 'repl_history.csv')
+
+    def run_session():
+        app = App()
+        stdin = sys.stdin
+        sys.stdin = io.StringIO(script)
+        try:
+            app.start()
+        except SystemExit:
+            pass
+        finally:
+            sys.stdin = stdin
+
+    result = measure(run_session, 1, repeat=3)
+    result['per_calculation_us'] = result['best_us'] / calculations
+    return {f'session[{calculations}]': result}
+
+
+def git_revision():
+    """
+    Returns the current git commit, or None outside a git checkout.
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names, scale):
+    """
+    Runs the selected benchmarks.
+
+    Args:
+        names (list): Names of the benchmarks to run.
+        scale (float): Factor applied to the number of calls and sizes.
+
+    Returns:
+        dict: The run metadata and the results of every benchmark.
+    """
+    report = {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': scale,
+        'results': {},
+    }
+    environ = dict(os.environ)
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir, quiet():
+            # Keep the operations' own history manager away from the real history file
+            configure_history_manager(file_path=os.path.join(temp_dir, 'shared_history.csv'))
+            for name in names:
+                report['results'][name] = BENCHMARKS[name](scale, temp_dir)
+    finally:
+        os.environ.clear()
+        os.environ.update(environ)
+    return report
+
+
+def compare(report, baseline):
+    """
+    Prints the ratio of every best time to the same measurement in a baseline report.
+    """
+    print(f"\nCompared with {baseline.get('revision')} ({baseline.get('timestamp')}):")
+    for name, cases in report['results'].items():
+        for case, timing in cases.items():
+            previous = baseline.get('results', {}).get(name, {}).get(case)
+            if previous:
+                ratio = timing['best_us'] / previous['best_us']
+                flag = '  REGRESSION' if ratio > 1.2 else ''
+                print(f"  {name + '.' + case:45} {ratio:6.2f}x{flag}")
+
+
+if __name__ == '__main__':
+    os.chdir(ROOT)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--quick', action='store_true', help="run with fewer calls and smaller histories")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--output', metavar='PATH', help="where to save the JSON results")
+    parser.add_argument('--compare', metavar='PATH', help="JSON results of an earlier run to compare with")
+    args = parser.parse_args()
+
+    report = run(args.only, 0.1 if args.quick else 1.0)
+    for name, cases in report['results'].items():
+        for case, timing in cases.items():
+            print(f"{name + '.' + case:45} best {timing['best_us']:12.2f} us   median {timing['median_us']:12.2f} us")
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results',
+                                         report['timestamp'].replace(':', '-') + '.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as json_file:
+        json.dump(report, json_file, indent=2)
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as json_file:
+            compare(report, json.load(json_file))
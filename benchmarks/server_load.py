@@ -0,0 +1,147 @@
+"""
+Load-tests the HTTP/JSON server with concurrent clients on keep-alive connections.
+
+Each client thread opens one persistent connection and sends calculation requests back to
+back, either one per HTTP request or in batches with `--batch`. The latency of every HTTP
+request is measured, and p50/p99 latency and requests per second are reported.
+
+Without `--port`, a server is started in this process on a free port, with a temporary
+history file; otherwise the server already listening on `--host` and `--port` is used, such as
+one started with `python main.py --serve`.
+
+Usage:
+    python benchmarks/server_load.py [--clients N] [--requests N] [--batch N]
+                                     [--host HOST] [--port PORT] [--json PATH]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.calculator import Calculator  # pylint: disable=wrong-import-position
+from app.history_manager import HistoryManager  # pylint: disable=wrong-import-position
+from app.plugins.calculator import CalculatorCommand  # pylint: disable=wrong-import-position
+from app.server import CalculatorHTTPServer, CalculatorService  # pylint: disable=wrong-import-position
+
+OPERATIONS = ('add', 'subtract', 'multiply', 'divide')
+
+
+def percentile(sorted_values, fraction):
+    """
+    Returns the value below which `fraction` of the sorted values fall (nearest rank).
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run_client(host, port, requests, batch, latencies):
+    """
+    Sends `requests` HTTP requests on one keep-alive connection, appending their latencies.
+
+    Args:
+        host (str): The server address.
+        port (int): The server port.
+        requests (int): Number of HTTP requests to send.
+        batch (int): Number of calculations per HTTP request; 1 sends single requests.
+        latencies (list): The list receiving the latency of every request, in seconds.
+    """
+    connection = http.client.HTTPConnection(host, port)
+    headers = {'Content-Type': 'application/json'}
+    try:
+        for i in range(requests):
+            calculations = [{'command': OPERATIONS[(i + j) % 4], 'num1': i % 97 + 1, 'num2': j % 13 + 1}
+                            for j in range(batch)]
+            body = json.dumps(calculations if batch > 1 else calculations[0])
+            start = time.perf_counter()
+            connection.request('POST', '/', body, headers)
+            response = connection.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - start)
+            if response.status != 200:
+                raise RuntimeError(f"Request failed with status {response.status}")
+    finally:
+        connection.close()
+
+
+def run(host, port, clients, requests, batch):
+    """
+    Drives the server with concurrent clients and measures the latency of their requests.
+
+    Args:
+        host (str): The server address.
+        port (int): The server port.
+        clients (int): Number of concurrent clients, each with its own connection.
+        requests (int): Number of HTTP requests sent by each client.
+        batch (int): Number of calculations per HTTP request.
+
+    Returns:
+        dict: The number of requests, requests and calculations per second, and the p50, p99
+            and maximum latency in milliseconds.
+    """
+    latencies = []
+    threads = [threading.Thread(target=run_client, args=(host, port, requests, batch, latencies))
+               for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'requests_per_s': len(latencies) / elapsed,
+        'calculations_per_s': len(latencies) * batch / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'max_ms': (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+def run_local(clients, requests, batch):
+    """
+    Starts a server in this process on a free port and load-tests it; see `run`.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        history_manager = HistoryManager(file_path=os.path.join(temp_dir, 'history.csv'),
+                                         flush_size=1000, flush_interval=1.0)
+        calculator_command = CalculatorCommand()
+        calculator = Calculator.from_command(calculator_command, history_manager=history_manager, log=False)
+        server = CalculatorHTTPServer(('127.0.0.1', 0), CalculatorService(calculator, calculator_command))
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+        try:
+            return run('127.0.0.1', server.server_address[1], clients, requests, batch)
+        finally:
+            server.shutdown()
+            server.server_close()
+            history_manager.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=500, help="HTTP requests per client")
+    parser.add_argument('--batch', type=int, default=1, help="calculations per HTTP request")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help="load-test a running server instead of starting one")
+    parser.add_argument('--json', metavar='PATH', help="also write the results to PATH as JSON")
+    args = parser.parse_args()
+    if args.port is None:
+        results = run_local(args.clients, args.requests, args.batch)
+    else:
+        results = run(args.host, args.port, args.clients, args.requests, args.batch)
+    print(f"{results['requests']:,} requests from {args.clients} clients, {args.batch} calculation(s) each")
+    print(f"{results['requests_per_s']:12,.0f} requests/s  {results['calculations_per_s']:12,.0f} calculations/s")
+    print(f"p50 {results['p50_ms']:8.3f} ms  p99 {results['p99_ms']:8.3f} ms  max {results['max_ms']:8.3f} ms")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as json_file:
+            json.dump(results, json_file, indent=2)
@@ -0,0 +1,86 @@
+"""
+Measures the cold start of the calculator REPL: the time from launching `python main.py`
+until the first '>>> ' prompt is shown.
+
+Each scenario is run several times and the median is reported:
+
+- ``no-manifest``: the plugin manifest is deleted before every run, so every plugin module
+  is imported to rediscover the commands.
+- ``manifest``: the manifest is up to date, so commands are registered from the cache and
+  plugin modules are only imported when a command runs.
+
+Usage:
+    python benchmarks/startup.py [--runs N] [--json PATH]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_to_first_prompt(env):
+    """
+    Launches the REPL and measures how long it takes to print its first prompt.
+
+    Args:
+        env (dict): The environment of the child process.
+
+    Returns:
+        float: The elapsed time in milliseconds.
+    """
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, 'main.py'], cwd=ROOT, env=env,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    output = b''
+    while not output.endswith(b'>>> '):
+        chunk = process.stdout.read1(4096)
+        if not chunk:
+            raise RuntimeError("The application exited before showing a prompt.")
+        output += chunk
+    elapsed = (time.perf_counter() - start) * 1000
+    process.communicate(b'exit\n')
+    return elapsed
+
+
+def run(runs):
+    """
+    Runs both start-up scenarios.
+
+    Args:
+        runs (int): Number of runs per scenario.
+
+    Returns:
+        dict: The median and minimum time to first prompt, in milliseconds, per scenario.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manifest_path = os.path.join(temp_dir, 'plugin_manifest.json')
+        env = dict(os.environ, PLUGIN_MANIFEST=manifest_path, HISTORY_FILE=os.path.join(temp_dir, 'history.csv'))
+        results = {}
+        for scenario in ('no-manifest', 'manifest'):
+            timings = []
+            for _ in range(runs):
+                if scenario == 'no-manifest' and os.path.exists(manifest_path):
+                    os.remove(manifest_path)
+                timings.append(time_to_first_prompt(env))
+            results[scenario] = {'median_ms': statistics.median(timings), 'min_ms': min(timings)}
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--json', metavar='PATH', help="also write the results to PATH as JSON")
+    args = parser.parse_args()
+    results = run(args.runs)
+    for scenario, timing in results.items():
+        print(f"{scenario:12} median {timing['median_ms']:8.1f} ms   min {timing['min_ms']:8.1f} ms")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as json_file:
+            json.dump(results, json_file, indent=2)
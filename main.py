@@ -1,6 +1,50 @@
 # main.py
+import argparse
+import os
 from app import App    
 
+def parse_args(argv=None):
+    """
+    Parses the command line arguments.
+
+    Args:
+        argv (list, optional): The arguments to parse. Defaults to `sys.argv[1:]`.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Advanced command line calculator.")
+    parser.add_argument('--batch', metavar='SOURCE',
+                        help="evaluate 'operation,num1,num2' rows from a CSV file, or '-' for stdin")
+    parser.add_argument('--output', metavar='PATH', help="write batch results to PATH instead of stdout")
+    parser.add_argument('--export', metavar='PATH', help="export the history to a .csv, .jsonl or .cols file")
+    parser.add_argument('--import', dest='import_path', metavar='PATH',
+                        help="import history records from a .csv, .jsonl or .cols file")
+    parser.add_argument('--format', choices=['csv', 'jsonl', 'columnar'],
+                        help="format of the exported or imported file, instead of its extension")
+    parser.add_argument('--serve', action='store_true', help="serve the commands over a local HTTP/JSON API")
+    parser.add_argument('--host', default='127.0.0.1', help="address the server listens on (default 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8000, help="port the server listens on (default 8000)")
+    parser.add_argument('--profile', action='store_true',
+                        help="profile every command and write .prof and collapsed stack files to logs/profiles")
+    return parser.parse_args(argv)
+
 # You must put this in your main.py because this forces the program to start when you run it from the command line.
 if __name__ == "__main__":
-    app = App().start()  # Instantiate an instance of App
\ No newline at end of file
+    args = parse_args()
+    if args.profile:
+        os.environ['PROFILE'] = 'true'  # Read with the other settings by App
+    if args.batch:
+        if args.output:
+            with open(args.output, 'w', newline='') as output:
+                App().run_batch(args.batch, output)
+        else:
+            App().run_batch(args.batch)
+    elif args.export:
+        print(f"Exported {App().export_history(args.export, args.format)} records to {args.export}.")
+    elif args.import_path:
+        print(f"Imported {App().import_history(args.import_path, args.format)} records from {args.import_path}.")
+    elif args.serve:
+        App().serve(args.host, args.port)
+    else:
+        app = App().start()  # Instantiate an instance of App
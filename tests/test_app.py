@@ -2,8 +2,12 @@
 Unit tests for the App class, focusing on REPL commands and environment variable handling.
 """
 
+import logging
 import pytest
 from app import App
+from app.numeric import FLOAT
+from app.profiling import configure_profiler
+from app.ring_history_manager import RingHistoryManager
 
 
 def test_app_start_invalid_command_name(capfd, monkeypatch):
@@ -118,3 +122,84 @@ def simulate_inputs(monkeypatch, inputs_list):
     monkeypatch.setattr('builtins.input', lambda _: next(inputs))
 
 # Add a final newline to avoid pylint error
+
+
+def test_app_configures_history_retention(monkeypatch, tmp_path):
+    """
+    Test that the history format and retention are read from the environment.
+
+    Verifies that an invalid retention falls back to the default of 5 records.
+    """
+    monkeypatch.setenv('HISTORY_FORMAT', 'ring')
+    monkeypatch.setenv('HISTORY_FILE', str(tmp_path / 'history.ring'))
+    monkeypatch.setenv('HISTORY_MAX_RECORDS', '10000')
+    app = App()
+    assert isinstance(app.history_manager, RingHistoryManager)
+    assert app.history_manager.max_records == 10000
+
+    monkeypatch.setenv('HISTORY_FORMAT', 'csv')
+    monkeypatch.setenv('HISTORY_FILE', str(tmp_path / 'history.csv'))
+    monkeypatch.setenv('HISTORY_MAX_RECORDS', 'many')
+    app = App()
+    assert not isinstance(app.history_manager, RingHistoryManager)
+    assert app.history_manager.max_records == 5
+    app.history_manager.close()
+
+
+@pytest.mark.parametrize("interval, expected", [("0.25", 0.25), ("soon", 1.0), ("-1", 1.0), ("0", 1.0), ("nan", 1.0)])
+def test_app_validates_history_flush_interval(monkeypatch, tmp_path, interval, expected):
+    """
+    Test that an invalid HISTORY_FLUSH_INTERVAL falls back to one second with a warning.
+    """
+    warnings = []
+    monkeypatch.setattr(logging, 'warning', lambda message, *args: warnings.append(message % args))
+    monkeypatch.setenv('HISTORY_FILE', str(tmp_path / 'history.csv'))
+    monkeypatch.setenv('HISTORY_FLUSH_INTERVAL', interval)
+    app = App()
+    assert app.history_manager.flush_interval == expected
+    assert (f"Invalid value '{interval}' for HISTORY_FLUSH_INTERVAL, using 1.0." in warnings) == (expected != 0.25)
+    app.history_manager.close()
+
+
+def test_app_configures_result_cache(monkeypatch):
+    """
+    Test that the result cache is disabled by default and sized from RESULT_CACHE_SIZE.
+    """
+    monkeypatch.delenv('RESULT_CACHE_SIZE', raising=False)
+    assert App().result_cache is None
+    monkeypatch.setenv('RESULT_CACHE_SIZE', '100')
+    app = App()
+    assert app.result_cache.maxsize == 100
+    monkeypatch.setenv('RESULT_CACHE_SIZE', '0')
+    assert App().result_cache is None
+
+def test_app_configures_numeric_backend(monkeypatch):
+    """
+    Test that the numeric backend is float by default, set from NUMERIC_BACKEND and
+    DECIMAL_PRECISION, and falls back to float when the setting is unknown.
+    """
+    monkeypatch.delenv('NUMERIC_BACKEND', raising=False)
+    assert App().numeric_backend is FLOAT
+    monkeypatch.setenv('NUMERIC_BACKEND', 'decimal')
+    monkeypatch.setenv('DECIMAL_PRECISION', '12')
+    assert App().numeric_backend.context.prec == 12
+    monkeypatch.setenv('NUMERIC_BACKEND', 'complex')
+    assert App().numeric_backend is FLOAT
+
+def test_app_configures_profiler(monkeypatch, tmp_path):
+    """
+    Test that profiling is disabled by default and enabled by PROFILE, writing to PROFILE_DIR.
+    """
+    monkeypatch.delenv('PROFILE', raising=False)
+    assert App().profiler is None
+    monkeypatch.setenv('PROFILE', 'true')
+    monkeypatch.setenv('PROFILE_DIR', str(tmp_path))
+    monkeypatch.setenv('PROFILE_INTERVAL', 'often')
+    app = App()
+    try:
+        assert app.profiler.directory == str(tmp_path)
+        assert app.profiler.interval == 0.001
+        assert app.profile('sum', sum, [1, 2]) == 3
+        assert len(list(tmp_path.glob('sum-*.collapsed'))) == 1
+    finally:
+        configure_profiler(False)
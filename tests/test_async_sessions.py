@@ -0,0 +1,132 @@
+"""
+Test suite for asynchronous sessions, which run many calculator users on one event loop.
+"""
+
+import asyncio
+import pytest
+from app import App
+from app.commands import AsyncCommandHandler, Command
+from app.history_manager import HistoryManager
+from app.session import Session, SessionClosed, StreamSession
+
+class ScriptedSession(Session):
+    """
+    A session fed from a list of input lines, collecting its output.
+
+    Every prompt yields to the event loop, so concurrent sessions interleave.
+    """
+
+    def __init__(self, lines):
+        self.lines = iter(lines)
+        self.output = []
+
+    async def input(self, prompt=''):
+        await asyncio.sleep(0)
+        self.output.append(prompt)
+        try:
+            return next(self.lines)
+        except StopIteration:
+            raise SessionClosed() from None
+
+    def print(self, *values, sep=' ', end='\n'):
+        self.output.append(sep.join(str(value) for value in values) + end)
+
+    @property
+    def text(self):
+        """
+        The prompts and output of the session.
+        """
+        return "".join(self.output)
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    """
+    Fixture to create an App with its plugins loaded and a temporary history file.
+    """
+    monkeypatch.setenv('HISTORY_FILE', str(tmp_path / 'async_history.csv'))
+    monkeypatch.setenv('HISTORY_MAX_RECORDS', '10')
+    application = App()
+    application.load_plugins()
+    yield application
+    application.history_manager.close()
+
+def test_sessions_share_one_event_loop(app):
+    """
+    Test that two sessions run concurrently, each with its own input and output, and record
+    their calculations in the shared history.
+    """
+    # Main menu: 1 = calculator; calculator menu: 1 = Add, 2 = Divide, 9 = Subtract, 0 = back
+    first = ScriptedSession(["1", "1", "2", "3", "2", "1", "0", "0", "exit"])
+    second = ScriptedSession(["1", "9", "10", "4", "0", "3", "exit"])
+
+    async def main():
+        await asyncio.gather(app.command_handler.run_session(first), app.command_handler.run_session(second))
+
+    asyncio.run(main())
+    assert "The result of 2.0 + 3.0 is 5.0" in first.text
+    assert "Error: Cannot divide by zero." in first.text
+    assert "The result of 10.0 - 4.0 is 6.0" in second.text
+    assert "Hello, World!" in second.text
+    assert "Hello, World!" not in first.text
+    assert sorted(record['Operation'] for record in app.history_manager.load_history()) == ['Add', 'Subtract']
+
+def test_exit_command_ends_only_the_session(app):
+    """
+    Test that the exit command and the end of the input end a session without exiting the process.
+    """
+    exit_index = str(app.command_handler.command_names.index('exit') + 1)
+    session = ScriptedSession(["x", exit_index, "never read"])
+    asyncio.run(app.command_handler.run_session(session))
+    assert "Only numbers are allowed, wrong input." in session.text
+    assert session.text.count(">>> ") == 2
+    asyncio.run(app.command_handler.run_session(ScriptedSession([])))
+
+def test_commands_without_async_support():
+    """
+    Test that a command without an asynchronous implementation is reported, not run.
+    """
+    class BlockingCommand(Command):
+        def execute(self):
+            input("This would block the event loop: ")
+
+    handler = AsyncCommandHandler()
+    handler.register_command("blocking", BlockingCommand())
+    session = ScriptedSession(["1", "exit"])
+    asyncio.run(handler.run_session(session))
+    assert "The blocking command is not available in this session." in session.text
+
+def test_history_writes_are_awaitable(tmp_path):
+    """
+    Test the awaitable history methods, which write the file in a worker thread.
+    """
+    manager = HistoryManager(file_path=str(tmp_path / "history.csv"), max_records=3)
+
+    async def main():
+        await manager.add_record_async('Add', 1.0, 2.0, 3.0)
+        await manager.add_records_async([['Multiply', 2.0, 2.0, 4.0], ['Divide', 1.0, 4.0, 0.25]])
+        assert await manager.delete_record_async(1)
+        assert not await manager.delete_record_async(5)
+
+    asyncio.run(main())
+    assert [record[0] for record in manager.read_records()] == ['Multiply', 'Divide']
+    asyncio.run(manager.clear_history_async())
+    assert manager.read_records() == []
+
+def test_stream_session_over_tcp(app):
+    """
+    Test serving sessions over TCP with asyncio streams.
+    """
+    async def main():
+        server = await asyncio.start_server(
+            lambda reader, writer: app.command_handler.run_session(StreamSession(reader, writer)), '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b"1\n8\n4\n2.5\n0\nexit\n")
+        await writer.drain()
+        output = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return output.decode()
+
+    assert "The result of 4.0 * 2.5 is 10.0" in asyncio.run(main())
@@ -0,0 +1,85 @@
+"""
+Test suite for the BatchProcessor, which evaluates calculator records without the REPL.
+"""
+
+import io
+import os
+import pytest
+from app.batch import BatchProcessor, ParallelBatchProcessor
+from app.history_manager import HistoryManager
+from app.plugins.calculator import CalculatorCommand
+
+@pytest.fixture
+def history_manager(tmp_path):
+    """
+    Fixture to initialize a write-through HistoryManager with a temporary file path.
+    """
+    return HistoryManager(file_path=str(tmp_path / "batch_history.csv"))
+
+@pytest.fixture
+def processor(history_manager):
+    """
+    Fixture to create a BatchProcessor over the real calculator operations.
+    """
+    return BatchProcessor.from_calculator(CalculatorCommand(), history_manager, chunk_size=2)
+
+def test_batch_evaluates_rows(processor, history_manager):
+    """
+    Test that every row is evaluated and written out in order.
+
+    Verifies the output rows, the returned counts and that the results reach the history.
+    """
+    source = io.StringIO("add,2,3\nsubtract,5,1\n\nmultiply,4,2.5\ndivide,9,3\n")
+    output = io.StringIO()
+    assert processor.run(source, output) == (4, 0)
+    assert output.getvalue().splitlines() == [
+        "Add,2.0,3.0,5.0",
+        "Subtract,5.0,1.0,4.0",
+        "Multiply,4.0,2.5,10.0",
+        "Divide,9.0,3.0,3.0",
+    ]
+    assert [record['Operation'] for record in history_manager.load_history()] == ['Add', 'Subtract', 'Multiply', 'Divide']
+
+def test_batch_reports_invalid_rows(processor, history_manager):
+    """
+    Test that rows which cannot be evaluated are reported without stopping the batch.
+    """
+    source = io.StringIO("divide,1,0\nfoo,1,2\nadd,x,1\nadd,1\nadd,1,1\n")
+    output = io.StringIO()
+    assert processor.run(source, output) == (5, 4)
+    assert output.getvalue().splitlines() == [
+        "divide,1,0,Error: Cannot divide by zero.",
+        "foo,1,2,Error: Unknown operation 'foo'.",
+        "add,x,1,Error: Please enter valid numbers.",
+        "add,1,Error: Please enter valid numbers.",
+        "Add,1.0,1.0,2.0",
+    ]
+    assert len(history_manager.load_history()) == 1
+
+def test_batch_run_path(processor, tmp_path):
+    """
+    Test that run_path reads records from a file.
+    """
+    source_path = tmp_path / "ops.csv"
+    source_path.write_text("add,1,1\nmultiply,3,3\n")
+    output = io.StringIO()
+    assert processor.run_path(str(source_path), output) == (2, 0)
+    assert output.getvalue().splitlines() == ["Add,1.0,1.0,2.0", "Multiply,3.0,3.0,9.0"]
+
+def test_parallel_batch_matches_serial(processor, tmp_path):
+    """
+    Test that the parallel processor writes the same rows as the serial one, in input order,
+    and records the retained results with a single history write, while the workers open
+    no history or lock file of their own.
+    """
+    source = "".join(f"{op},{i},{i % 3}\n" for i in range(50) for op in ("add", "divide", "bogus"))
+    serial_output = io.StringIO()
+    expected = processor.run(io.StringIO(source), serial_output)
+
+    history_manager = HistoryManager(file_path=str(tmp_path / "parallel_history.csv"), max_records=5)
+    parallel = ParallelBatchProcessor(history_manager, workers=2, chunk_size=7)
+    parallel_output = io.StringIO()
+    assert parallel.run(io.StringIO(source), parallel_output) == expected == (150, 67)
+    assert parallel_output.getvalue() == serial_output.getvalue()
+    assert [record['Num1'] for record in history_manager.load_history()] == [47.0, 47.0, 48.0, 49.0, 49.0]
+    assert not os.path.exists(f"{os.devnull}.lock")
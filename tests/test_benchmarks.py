@@ -0,0 +1,24 @@
+"""
+Smoke test for the benchmark suite in the `benchmarks` directory.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.mark.slow
+def test_benchmark_suite_writes_json(tmp_path):
+    """
+    Test that a quick run of the benchmark suite covers every benchmark and saves JSON results.
+    """
+    output = tmp_path / "results.json"
+    subprocess.run([sys.executable, os.path.join(ROOT, 'benchmarks', 'run.py'), '--quick', '--output', str(output)],
+                   cwd=ROOT, capture_output=True, check=True)
+    report = json.loads(output.read_text())
+    assert set(report['results']) == {'history', 'history_formats', 'operations', 'plugin_loading', 'repl'}
+    assert report['results']['history']['add_record[10]']['best_us'] > 0
+    assert 'add.compute' in report['results']['operations']
@@ -4,6 +4,7 @@ Unit tests for the Calculator plugin commands.
 
 import unittest
 from unittest.mock import patch
+import numpy as np # type: ignore
 from app.plugins.calculator.add import Add
 from app.plugins.calculator.subtract import Subtract
 from app.plugins.calculator.multiply import Multiply
@@ -82,5 +83,31 @@ class TestCalculatorCommands(unittest.TestCase):
         # Check that the print statement was called with the correct output
         mock_print.assert_called_with("The result of 6.0 / 3.0 is 2.0")
 
+    def test_apply_vectorized(self):
+        """
+        Test the vectorized array API of the arithmetic operations.
+
+        Verifies that each operation computes element-wise results over whole arrays.
+        """
+        num1 = np.array([6.0, 4.0, 9.0])
+        num2 = np.array([3.0, 2.0, 1.5])
+        np.testing.assert_array_equal(Add().apply(num1, num2), [9.0, 6.0, 10.5])
+        np.testing.assert_array_equal(Subtract().apply(num1, num2), [3.0, 2.0, 7.5])
+        np.testing.assert_array_equal(Multiply().apply(num1, num2), [18.0, 8.0, 13.5])
+        np.testing.assert_array_equal(Divide().apply(num1, num2), [2.0, 2.0, 6.0])
+
+    def test_apply_divide_masks_zero_divisors(self):
+        """
+        Test that vectorized division masks zero divisors instead of raising.
+
+        Verifies that only the elements with a zero divisor are masked and that the
+        division by zero is reported in the log.
+        """
+        with self.assertLogs(level='ERROR') as logs:
+            result = Divide().apply([6.0, 1.0, 8.0], [3.0, 0.0, 4.0])
+        self.assertEqual(result.mask.tolist(), [False, True, False])
+        self.assertEqual(result.compressed().tolist(), [2.0, 2.0])
+        self.assertIn("division by zero in 1 of 3 elements", logs.output[0])
+
 if __name__ == '__main__':
     unittest.main()
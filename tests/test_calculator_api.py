@@ -0,0 +1,61 @@
+"""
+Test suite for the headless Calculator facade used as a library API.
+"""
+
+import pytest
+from app.calculator import Calculator
+from app.history_manager import HistoryManager
+
+@pytest.fixture
+def history_manager(tmp_path):
+    """
+    Fixture to initialize a HistoryManager with a temporary file path.
+    """
+    return HistoryManager(file_path=str(tmp_path / "api_history.csv"))
+
+@pytest.fixture
+def calculator(history_manager):
+    """
+    Fixture to create a Calculator over the real calculator operations.
+    """
+    return Calculator.from_command(history_manager=history_manager)
+
+def test_calculate_records_history(calculator, history_manager, monkeypatch, capsys):
+    """
+    Test that calculate computes the result and records it without any prompt or output.
+    """
+    monkeypatch.setattr('builtins.input', lambda _: pytest.fail("input() must not be called"))
+    assert calculator.calculate('add', 2, 3) == 5
+    assert calculator.calculate('Divide', 9, 3) == 3
+    assert capsys.readouterr().out == ""
+    assert [record['Operation'] for record in history_manager.load_history()] == ['Add', 'Divide']
+
+def test_calculate_can_skip_logging_and_history(calculator, history_manager, caplog):
+    """
+    Test that logging and history recording can be skipped per call.
+    """
+    with caplog.at_level('INFO'):
+        assert calculator.calculate('multiply', 4, 2, log=False, record_history=False) == 8
+    assert not caplog.records
+    assert not history_manager.load_history()
+
+def test_calculate_errors(calculator, history_manager):
+    """
+    Test that unknown operations and division by zero raise and record nothing.
+    """
+    with pytest.raises(KeyError):
+        calculator.calculate('power', 2, 3)
+    with pytest.raises(ZeroDivisionError):
+        calculator.calculate('divide', 1, 0)
+    assert not history_manager.load_history()
+
+def test_calculate_many_batches_history(calculator, history_manager, monkeypatch):
+    """
+    Test that calculate_many records all results with one bulk history write.
+    """
+    calls = []
+    monkeypatch.setattr(history_manager, 'add_record', lambda *args: calls.append(args))
+    results = calculator.calculate_many([('add', 1, 1), ('subtract', 5, 2), ('multiply', 3, 3)])
+    assert results == [2, 3, 9]
+    assert not calls
+    assert [record['Result'] for record in history_manager.load_history()] == [2, 3, 9]
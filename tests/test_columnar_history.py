@@ -0,0 +1,227 @@
+"""
+Test suite for the columnar in-memory history store and the aggregate queries over it.
+"""
+
+import math
+import time
+import numpy as np  # type: ignore
+import pytest
+from app.columnar_history import ColumnarHistory
+from app.history_manager import HistoryManager
+from app.plugins.calculator.history_commands import HistoryStats
+from app.ring_history_manager import RingHistoryManager
+from app.sqlite_history_manager import SqliteHistoryManager
+
+def test_aggregate_per_operation():
+    """
+    Test that the count, sum, mean, minimum and maximum are computed per operation.
+    """
+    store = ColumnarHistory()
+    store.add_records([['Add', 1, 2, 3], ['Divide', 1, 4, 0.25], ['Add', 2, 2, 4]])
+    assert len(store) == 3
+    assert store.aggregate() == {
+        'Add': {'count': 2, 'sum': 7.0, 'mean': 3.5, 'min': 3.0, 'max': 4.0},
+        'Divide': {'count': 1, 'sum': 0.25, 'mean': 0.25, 'min': 0.25, 'max': 0.25},
+    }
+    assert list(store.aggregate(operation='Divide')) == ['Divide']
+
+def test_time_window_leaves_out_untimed_records():
+    """
+    Test that a time window only includes the timed records added within it.
+    """
+    store = ColumnarHistory()
+    store.add_records([['Add', 1, 1, 2]], math.nan)
+    store.add_records([['Add', 1, 2, 3]], 100.0)
+    store.add_records([['Add', 2, 2, 4]], 200.0)
+    assert store.aggregate()['Add']['count'] == 3
+    assert store.aggregate(since=100)['Add']['sum'] == 7.0
+    assert store.aggregate(since=150)['Add']['sum'] == 4.0
+    assert store.aggregate(until=200)['Add']['sum'] == 3.0
+    assert store.aggregate(since=300) == {}
+
+def test_untimed_records_must_come_first():
+    """
+    Test that records without a timestamp cannot follow timed records.
+    """
+    store = ColumnarHistory()
+    store.add_records([['Add', 1, 2, 3]], 100.0)
+    with pytest.raises(ValueError):
+        store.add_columns(['Add'], [1], [1], [2])
+
+def test_timestamps_never_decrease():
+    """
+    Test that a record stamped earlier than the previous one falls in the same window.
+    """
+    store = ColumnarHistory()
+    store.add_records([['Add', 1, 2, 3]], 200.0)
+    store.add_records([['Add', 2, 2, 4]], 100.0)
+    assert store.aggregate(since=200)['Add']['count'] == 2
+
+def test_aggregates_span_blocks(monkeypatch):
+    """
+    Test that windows spanning several blocks and the blocks at their ends match a full scan,
+    also once records are removed.
+    """
+    monkeypatch.setattr(ColumnarHistory, 'BLOCK_SIZE', 16)
+    rng = np.random.default_rng(0)
+    operations = np.array(['Add', 'Subtract', 'Multiply'])[rng.integers(0, 3, 1000)]
+    results = rng.normal(size=1000)
+    store = ColumnarHistory()
+    store.add_columns(operations[:500], results[:500], results[:500], results[:500], np.arange(500.0))
+    for position in range(500, 1000):
+        store.add_records([[operations[position], 0, 0, results[position]]], float(position))
+    # Removing the extremes of a block reads the block again; other records are subtracted
+    removed = [int(np.argmin(results)), int(np.argmax(results)), 3, 18, 19, 20, 500, 999]
+    for position in removed:
+        assert store.remove(position)
+    kept = np.ones(1000, dtype=bool)
+    kept[removed] = False
+    for since, until in [(0, 1000), (3, 997), (17, 31), (5, 12), (480, 520)]:
+        window = slice(since, until)
+        selected = results[window][(operations[window] == 'Multiply') & kept[window]]
+        stats = store.aggregate('Multiply', since, until)['Multiply']
+        assert stats['count'] == len(selected)
+        assert stats['sum'] == pytest.approx(selected.sum())
+        assert (stats['min'], stats['max']) == (selected.min(), selected.max())
+
+def test_buffer_is_moved_once_a_block_is_buffered(monkeypatch):
+    """
+    Test that buffered records are moved into the columns in one append once a block's worth
+    is buffered, without waiting for a query, and keep their positions.
+    """
+    monkeypatch.setattr(ColumnarHistory, 'BLOCK_SIZE', 4)
+    appends = []
+    append = ColumnarHistory.__dict__['_append']
+    def counted(self, *columns):
+        appends.append(len(columns[0]))
+        append(self, *columns)
+    monkeypatch.setattr(ColumnarHistory, '_append', counted)
+    store = ColumnarHistory()
+    positions = [store.add_records([['Add', value, 0, value]], float(value)) for value in range(10)]
+    assert positions == list(range(10)) and len(store) == 10
+    assert appends == [4, 4]
+    assert store.remove(5) and store.aggregate()['Add']['sum'] == 40.0
+    assert appends == [4, 4, 2]
+
+def test_remove_and_clear(monkeypatch):
+    """
+    Test that removing a record by the position it was added at updates the aggregates, and
+    that clearing empties the store.
+    """
+    monkeypatch.setattr(ColumnarHistory, 'BLOCK_SIZE', 2)
+    store = ColumnarHistory(capacity=1)
+    assert store.add_records([['Add', 1, 2, 3], ['Add', 5, 5, 10]]) == 0
+    assert store.add_records([['Subtract', 5, 1, 4]]) == 2
+    assert store.remove(1)
+    assert not store.remove(1) and not store.remove(3)
+    assert len(store) == 2
+    assert store.aggregate() == {
+        'Add': {'count': 1, 'sum': 3.0, 'mean': 3.0, 'min': 3.0, 'max': 3.0},
+        'Subtract': {'count': 1, 'sum': 4.0, 'mean': 4.0, 'min': 4.0, 'max': 4.0},
+    }
+    store.clear()
+    assert len(store) == 0 and store.aggregate() == {}
+
+@pytest.mark.parametrize("manager_class, name", [
+    (HistoryManager, "history.csv"),
+    (RingHistoryManager, "history.ring"),
+    (SqliteHistoryManager, "history.db"),
+])
+def test_history_stats_of_managers(tmp_path, manager_class, name):
+    """
+    Test that every history manager keeps its columnar store in step with its records.
+    """
+    manager = manager_class(file_path=str(tmp_path / name), max_records=3)
+    manager.add_record('Add', 1, 2, 3)
+    manager.add_record('Multiply', 2, 3, 6)
+    assert manager.history_stats()['Multiply']['count'] == 1
+    start = time.time()
+    manager.add_record('Add', 5, 5, 10)
+    manager.add_record('Add', 1, 1, 2)
+    assert manager.history_stats(since=start) == {'Add': {'count': 2, 'sum': 12.0, 'mean': 6.0, 'min': 2.0, 'max': 10.0}}
+    # The store still holds the record dropped from the retained history
+    assert manager.remove_record(2)
+    assert manager.history_stats() == {'Add': {'count': 3, 'sum': 15.0, 'mean': 5.0, 'min': 2.0, 'max': 10.0}}
+    manager.clear_records()
+    assert manager.history_stats() == {}
+    manager.close()
+
+def test_history_stats_remove_records_by_id(tmp_path):
+    """
+    Test that a removed record is found in the store by its id, also once a compaction of the
+    ring buffer has numbered the records again.
+    """
+    manager = RingHistoryManager(file_path=str(tmp_path / "history.ring"), max_records=4)
+    for value in range(1, 7):
+        manager.add_record('Add', value, 0, value)
+    assert manager.history_stats()['Add']['sum'] == 18.0
+    manager.add_record('Add', 7, 0, 7)
+    assert manager.remove_record(5)
+    manager.compact()
+    assert manager.record_ids() == [1, 2, 3]
+    assert manager.remove_record(2)
+    assert manager.history_stats() == {'Add': {'count': 3, 'sum': 14.0, 'mean': 14.0 / 3, 'min': 3.0, 'max': 7.0}}
+    manager.close()
+
+def test_history_stats_picks_up_other_managers(tmp_path):
+    """
+    Test that the records another manager appends to the file, or deletes, update the store
+    instead of discarding it, also once the other manager has compacted the file.
+    """
+    file_path = str(tmp_path / "history.csv")
+    first = HistoryManager(file_path=file_path, max_records=10)
+    second = HistoryManager(file_path=file_path, max_records=10)
+    first.add_record('Add', 1, 2, 3)
+    store = first.columnar()
+    assert first.history_stats()['Add']['count'] == 1
+    start = time.time()
+    second.add_record('Add', 2, 2, 4)
+    second.add_record('Add', 3, 2, 5)
+    assert first.history_stats(since=start)['Add'] == {'count': 2, 'sum': 9.0, 'mean': 4.5, 'min': 4.0, 'max': 5.0}
+    second.remove_record(1)
+    assert first.history_stats()['Add']['count'] == 2
+    second.remove_record(2)
+    second.add_record('Multiply', 2, 3, 6)
+    second.compact()
+    assert first.history_stats() == {'Add': {'count': 1, 'sum': 5.0, 'mean': 5.0, 'min': 5.0, 'max': 5.0},
+                                     'Multiply': {'count': 1, 'sum': 6.0, 'mean': 6.0, 'min': 6.0, 'max': 6.0}}
+    assert first.columnar() is store
+
+def test_history_stats_windows_cover_the_session(tmp_path):
+    """
+    Test that the store is built from the retained records only, and that time windows of the
+    CSV history only cover the records added in the session, while those of the SQLite
+    history cover the records of earlier sessions too.
+    """
+    csv_path, db_path = str(tmp_path / "history.csv"), str(tmp_path / "history.db")
+    for manager in (HistoryManager(file_path=csv_path, max_records=3, compact_every=100),
+                    SqliteHistoryManager(file_path=db_path, max_records=3)):
+        for value in range(7):
+            manager.add_record('Add', value, 0, value)
+        manager.close()
+    reopened = HistoryManager(file_path=csv_path, max_records=3)
+    assert reopened.history_stats()['Add']['sum'] == 15.0
+    assert reopened.history_stats(since=0) == {}
+    reopened.add_record('Add', 7, 0, 7)
+    assert reopened.history_stats(since=0)['Add']['sum'] == 7.0
+    reopened.close()
+    reopened = SqliteHistoryManager(file_path=db_path, max_records=3)
+    assert reopened.history_stats(since=0)['Add']['sum'] == 15.0
+    assert reopened.history_stats(until=time.time() - 3600) == {}
+    reopened.close()
+
+def test_history_stats_command(tmp_path, capsys, monkeypatch):
+    """
+    Test that the HistoryStats command prints the statistics of the window asked for.
+    """
+    manager = HistoryManager(file_path=str(tmp_path / "history.csv"))
+    manager.add_record('Add', 1, 2, 3)
+    answers = iter(['', '5', 'x'])
+    monkeypatch.setattr('builtins.input', lambda _: next(answers))
+    command = HistoryStats(manager)
+    command.execute()
+    assert capsys.readouterr().out.splitlines()[-1].split() == ['Add', '1', '3', '3', '3', '3']
+    command.execute()
+    assert "No matching records." in capsys.readouterr().out
+    command.execute()
+    assert "Invalid input." in capsys.readouterr().out
@@ -158,3 +158,44 @@ def test_menu_command_invalid_selection(capfd: pytest.CaptureFixture[str], monke
 
     captured = capfd.readouterr()
     assert "Invalid selection. Please enter a valid number." in captured.out
+
+
+def test_command_handler_index_and_alias_lookup(command_handler_with_commands: CommandHandler):
+    """
+    Test that commands can be looked up by index, name and alias.
+    """
+    handler = command_handler_with_commands
+    handler.register_command('greet', MockCommand(), aliases=['hello', 'hi'])
+    assert handler.get_command_by_index(0) == 'test'
+    assert handler.get_command_by_index(2) == 'greet'
+    assert handler.get_command_by_index(3) is None
+    assert handler.get_command('hi') is handler.get_command('greet') is handler.commands['greet']
+    assert handler.get_command('unknown') is None
+
+
+def test_command_handler_execute_by_alias(capfd: pytest.CaptureFixture[str], command_handler_with_commands: CommandHandler):
+    """
+    Test that execute_command accepts aliases and reports unknown commands.
+    """
+    handler = command_handler_with_commands
+    handler.register_command('greet', MockCommand(), aliases=['hi'])
+    handler.execute_command('hi')
+    handler.execute_command('unknown')
+    captured = capfd.readouterr()
+    assert "Mock command executed." in captured.out
+    assert "No such command: unknown" in captured.out
+
+
+def test_command_handler_menu_is_cached(capfd: pytest.CaptureFixture[str], command_handler_with_commands: CommandHandler):
+    """
+    Test that the rendered menu is reused until a command is registered.
+    """
+    handler = command_handler_with_commands
+    menu = handler.menu
+    assert menu == "1. test\n2. help"
+    assert handler.menu is menu
+    handler.register_command('test', MockCommand())
+    assert handler.menu == menu and handler.menu is not menu
+    handler.register_command('greet', MockCommand())
+    handler.list_commands()
+    assert capfd.readouterr().out == "1. test\n2. help\n3. greet\n"
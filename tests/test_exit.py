@@ -34,7 +34,8 @@ class TestExitCommand(unittest.TestCase):
 
         # Check that the logging was called correctly
         mock_logging.assert_any_call("ExitCommand executed: Application is exiting.")
-        mock_logging.assert_any_call("System exit with message: Exiting...")
+        message, error = mock_logging.call_args_list[-1].args
+        self.assertEqual(message % error, "System exit with message: Exiting...")
 
 
 if __name__ == '__main__':
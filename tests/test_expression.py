@@ -0,0 +1,95 @@
+"""
+Test suite for infix expressions compiled over the calculator operations.
+"""
+
+import pytest
+from app.calculator import Calculator
+from app.expression import ExpressionError
+from app.history_manager import HistoryManager
+from app.plugins.calculator.expression import Expression
+
+@pytest.fixture
+def history_manager(tmp_path):
+    """
+    Fixture to initialize a HistoryManager with a temporary file path.
+    """
+    return HistoryManager(file_path=str(tmp_path / "expression_history.csv"), max_records=10)
+
+@pytest.fixture
+def calculator(history_manager):
+    """
+    Fixture to create a Calculator over the real operation plugins, without logging.
+    """
+    return Calculator.from_command(history_manager=history_manager, log=False)
+
+@pytest.mark.parametrize("expression, expected", [
+    ("(2+3)*4/7", (2 + 3) * 4 / 7),
+    ("2 + 3 * 4", 14.0),
+    ("2 - 3 - 4", -5.0),
+    ("8 / 4 / 2", 1.0),
+    ("-(1.5e1 + .5) * -2", 31.0),
+    ("2 * -3", -6.0),
+])
+def test_evaluate_expressions(calculator, expression, expected):
+    """
+    Test operator precedence, left associativity, parentheses, unary minus and number formats.
+    """
+    assert calculator.evaluate(expression, record_history=False) == pytest.approx(expected)
+
+@pytest.mark.parametrize("expression", ["", "2 +", "(2 + 3", "2 3", "2 % 3", ")"])
+def test_invalid_expressions(calculator, expression):
+    """
+    Test that malformed expressions raise ExpressionError.
+    """
+    with pytest.raises(ExpressionError):
+        calculator.evaluate(expression)
+
+def test_long_expressions(calculator):
+    """
+    Test that expressions nested too deeply for the Python compiler still evaluate, and
+    that parentheses nested past the recursion limit raise ExpressionError.
+    """
+    assert calculator.evaluate("+".join(["1"] * 300), record_history=False) == 300.0
+    assert calculator.evaluate("x" + "-1" * 5000, {'x': 5000.0}, record_history=False) == 0.0
+    trace = []
+    calculator.compile("+".join(["2"] * 300) + "*x").evaluate({'x': 3.0}, trace)
+    assert len(trace) == 300 and trace[0] == ['Add', 2.0, 2.0, 4.0] and trace[-1][-1] == 604.0
+    with pytest.raises(ExpressionError):
+        calculator.evaluate("(" * 5000 + "1" + ")" * 5000)
+
+def test_compiled_expressions_are_cached(calculator):
+    """
+    Test that re-evaluating an expression with new bindings reuses the compiled expression.
+    """
+    compiled = calculator.compile("x * x - y")
+    assert compiled.variables == ('x', 'y')
+    assert [calculator.evaluate("x * x - y", {'x': x, 'y': 1.0}, record_history=False) for x in (1.0, 2.0, 3.0)] == [0.0, 3.0, 8.0]
+    assert calculator.compile("x * x - y") is compiled
+    assert calculator.compiler.compile.cache_info().misses == 1
+    with pytest.raises(ExpressionError):
+        calculator.evaluate("x * x - y", {'x': 1.0})
+
+def test_evaluate_records_operations(calculator, history_manager):
+    """
+    Test that every operation applied is recorded, and nothing when the evaluation fails.
+    """
+    calculator.evaluate("(2+3)*4")
+    assert [(r['Operation'], r['Result']) for r in history_manager.load_history()] == [('Add', 5.0), ('Multiply', 20.0)]
+    with pytest.raises(ZeroDivisionError):
+        calculator.evaluate("1 + 2 / (3 - 3)")
+    assert len(history_manager.load_history()) == 2
+
+def test_expression_command(history_manager, monkeypatch, capsys):
+    """
+    Test the Expression command prompting for an expression and the value of its variable.
+    """
+    inputs = iter(["x / 4", "10", "1 / 0", "(1"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    command = Expression(history_manager)
+    command.execute()
+    command.execute()
+    command.execute()
+    output = capsys.readouterr().out
+    assert "The result of x / 4 is 2.5" in output
+    assert "Error: Cannot divide by zero." in output
+    assert "Error: Missing ')'" in output
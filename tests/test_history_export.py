@@ -0,0 +1,72 @@
+"""
+Test suite for streaming history export and import in the CSV, JSON Lines and columnar formats.
+"""
+
+import pytest
+from app.history_export import detect_format, export_history, import_history, stream_history
+from app.history_manager import HistoryManager
+
+@pytest.fixture
+def history_manager(tmp_path):
+    """
+    Fixture to initialize a HistoryManager holding more records in its file than it retains.
+    """
+    manager = HistoryManager(file_path=str(tmp_path / "history.csv"), max_records=5, compact_every=100)
+    for value in range(7):
+        manager.add_record('Multiply' if value % 2 else 'Add', float(value), 2.0, value * 2.0)
+    return manager
+
+def test_iter_records_streams_the_retained_records(history_manager):
+    """
+    Test that only the retained records are streamed, in bounded chunks, although the file
+    still holds the older ones.
+    """
+    with open(history_manager.file_path, encoding='utf-8') as history_file:
+        assert len(history_file.read().splitlines()) == 8
+    chunks = list(history_manager.iter_records(chunk_size=3))
+    assert [len(chunk) for chunk in chunks] == [3, 2]
+    assert [record[1] for chunk in chunks for record in chunk] == [float(value) for value in range(2, 7)]
+    assert chunks[0][1] == ['Multiply', 3.0, 2.0, 6.0]
+
+@pytest.mark.parametrize("file_name, history_format", [
+    ("export.csv", None), ("export.jsonl", None), ("export.cols", None), ("export.data", 'columnar'),
+])
+def test_export_import_round_trip(history_manager, tmp_path, file_name, history_format):
+    """
+    Test that exported records are streamed back unchanged and imported into another history.
+    """
+    path = str(tmp_path / file_name)
+    assert export_history(history_manager, path, history_format, chunk_size=2) == 5
+    chunks = list(stream_history(path, history_format, chunk_size=4))
+    assert max(len(chunk) for chunk in chunks) <= 4
+    assert [record for chunk in chunks for record in chunk] == [
+        ['Multiply' if value % 2 else 'Add', float(value), 2.0, value * 2.0] for value in range(2, 7)]
+
+    target = HistoryManager(file_path=str(tmp_path / "target.csv"), max_records=5)
+    assert import_history(target, path, history_format, chunk_size=4) == 5
+    assert [record['Num1'] for record in target.load_history()] == [2.0, 3.0, 4.0, 5.0, 6.0]
+
+def test_import_skips_malformed_records(tmp_path):
+    """
+    Test that malformed rows and lines are skipped without stopping the import.
+    """
+    csv_path = tmp_path / "import.csv"
+    csv_path.write_text("Add,1,2,3\nAdd,x,2,3\nDivide,6,3\nSubtract,5,1,4\n")
+    jsonl_path = tmp_path / "import.jsonl"
+    jsonl_path.write_text('{"Operation": "Add", "Num1": 1, "Num2": 2, "Result": 3}\nnot json\n\n{"Operation": "Add"}\n')
+    assert [record for chunk in stream_history(str(csv_path)) for record in chunk] == [
+        ['Add', 1.0, 2.0, 3.0], ['Subtract', 5.0, 1.0, 4.0]]
+    assert [record for chunk in stream_history(str(jsonl_path)) for record in chunk] == [['Add', 1.0, 2.0, 3.0]]
+
+def test_invalid_formats(tmp_path):
+    """
+    Test that unknown formats and invalid columnar files are reported.
+    """
+    with pytest.raises(ValueError, match="Cannot tell"):
+        detect_format("history.txt")
+    with pytest.raises(ValueError, match="Unknown history format"):
+        detect_format("history.csv", 'parquet')
+    path = tmp_path / "bad.cols"
+    path.write_bytes(b"not columnar")
+    with pytest.raises(ValueError, match="not a columnar history file"):
+        list(stream_history(str(path)))
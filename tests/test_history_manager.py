@@ -3,10 +3,15 @@ Test suite for HistoryManager class, which handles loading, saving, and
 managing a calculation history in a CSV file.
 """
 
+import multiprocessing
 import os
+import threading
+import time
 import pytest
 import pandas as pd  # type: ignore
-from app.history_manager import HistoryManager
+from app.history_manager import HistoryManager, configure_history_manager, get_history_manager
+from app.plugins.calculator.add import Add
+from app.plugins.calculator.history_commands import DeleteSpecificRecord, ShowHistory
 
 @pytest.fixture
 def history_manager(tmp_path):
@@ -31,7 +36,7 @@ def test_file_initialization(history_manager):
     """
     assert os.path.exists(history_manager.file_path)
     df = pd.read_csv(history_manager.file_path)
-    assert list(df.columns) == ['Operation', 'Num1', 'Num2', 'Result']
+    assert list(df.columns) == ['Id', 'Operation', 'Num1', 'Num2', 'Result']
 
 def test_add_record(history_manager):
     """
@@ -42,7 +47,7 @@ def test_add_record(history_manager):
     history_manager.add_record('add', 1, 2, 3)
     df = pd.read_csv(history_manager.file_path)
     assert len(df) == 1
-    assert df.iloc[0].to_dict() == {'Operation': 'add', 'Num1': 1, 'Num2': 2, 'Result': 3}
+    assert df.iloc[0].to_dict() == {'Id': 1, 'Operation': 'add', 'Num1': 1, 'Num2': 2, 'Result': 3}
 
 def test_load_history(history_manager):
     """
@@ -52,9 +57,9 @@ def test_load_history(history_manager):
     the loaded data matches the added record.
     """
     history_manager.add_record('subtract', 5, 3, 2)
-    df = history_manager.load_history()
-    assert len(df) == 1
-    assert df.iloc[0].to_dict() == {'Operation': 'subtract', 'Num1': 5, 'Num2': 3, 'Result': 2}
+    records = history_manager.load_history()
+    assert len(records) == 1
+    assert records[0] == {'Operation': 'subtract', 'Num1': 5, 'Num2': 3, 'Result': 2}
 
 def test_clear_history(history_manager):
     """
@@ -64,8 +69,8 @@ def test_clear_history(history_manager):
     """
     history_manager.add_record('multiply', 2, 3, 6)
     history_manager.clear_history()
-    df = history_manager.load_history()
-    assert df.empty
+    records = history_manager.load_history()
+    assert not records
 
 def test_limit_history_to_last_5_records(history_manager):
     """
@@ -75,33 +80,322 @@ def test_limit_history_to_last_5_records(history_manager):
     """
     for i in range(7):
         history_manager.add_record('add', i, i + 1, i + 2)
-    df = history_manager.load_history()
-    assert len(df) == 5  # Only the last 5 records should remain
-    assert df.iloc[0].to_dict() == {'Operation': 'add', 'Num1': 2, 'Num2': 3, 'Result': 4}
+    records = history_manager.load_history()
+    assert len(records) == 5  # Only the last 5 records should remain
+    assert records[0] == {'Operation': 'add', 'Num1': 2, 'Num2': 3, 'Result': 4}
 
 def test_delete_record(history_manager):
     """
-    Test deleting a specific record by index.
+    Test deleting a specific record by id.
     
-    Adds multiple records, deletes one by index, and verifies that the specific
+    Adds multiple records, deletes one by id, and verifies that the specific
     record is removed while others remain.
     """
     for i in range(3):
         history_manager.add_record('subtract', i + 2, i, i + 2)
-    history_manager.delete_record(1)  # Delete the second record
-    df = history_manager.load_history()
-    assert len(df) == 2  # One record should be deleted
-    assert df.iloc[0].to_dict() == {'Operation': 'subtract', 'Num1': 2, 'Num2': 0, 'Result': 2}
-    assert df.iloc[1].to_dict() == {'Operation': 'subtract', 'Num1': 4, 'Num2': 2, 'Result': 4}
+    history_manager.delete_record(2)  # Delete the second record
+    records = history_manager.load_history()
+    assert len(records) == 2  # One record should be deleted
+    assert records[0] == {'Operation': 'subtract', 'Num1': 2, 'Num2': 0, 'Result': 2}
+    assert records[1] == {'Operation': 'subtract', 'Num1': 4, 'Num2': 2, 'Result': 4}
 
 def test_delete_invalid_record(history_manager, capsys):
     """
-    Test deleting an invalid record index.
+    Test deleting an invalid record id.
     
-    Attempts to delete a record at an invalid index and verifies that an appropriate
+    Attempts to delete a record with an unknown id and verifies that an appropriate
     error message is printed.
     """
     history_manager.add_record('divide', 10, 2, 5)
-    history_manager.delete_record(5)  # Invalid index
+    history_manager.delete_record(5)  # Invalid id
     captured = capsys.readouterr()
-    assert "Invalid record index." in captured.out
+    assert "Invalid record ID." in captured.out
+
+def test_add_record_appends_without_rewrite(tmp_path):
+    """
+    Test that adding records appends to the file instead of rewriting it.
+    
+    Adds more records than are retained and verifies that the file keeps growing until
+    compaction, while the loaded history only exposes the most recent records.
+    """
+    manager = HistoryManager(file_path=str(tmp_path / "append.csv"), compact_every=10)
+    for i in range(7):
+        manager.add_record('add', i, i, i * 2)
+    assert len(pd.read_csv(manager.file_path)) == 7
+    assert len(manager.load_history()) == 5
+
+def test_compact_applies_retention(tmp_path):
+    """
+    Test that compaction trims the history file down to the retained records.
+    
+    Verifies both explicit compaction and the automatic compaction after `compact_every` appends.
+    """
+    manager = HistoryManager(file_path=str(tmp_path / "compact.csv"), compact_every=4)
+    for i in range(4):
+        manager.add_record('multiply', i, 2, i * 2)
+    assert len(pd.read_csv(manager.file_path)) == 4
+    manager.add_record('multiply', 4, 2, 8)
+    manager.add_record('multiply', 5, 2, 10)
+    manager.compact()
+    df = pd.read_csv(manager.file_path)
+    assert len(df) == 5
+    assert df.iloc[-1].to_dict() == {'Id': 6, 'Operation': 'multiply', 'Num1': 5, 'Num2': 2, 'Result': 10}
+
+def test_append_to_file_without_trailing_newline(tmp_path):
+    """
+    Test that appending to a file that lacks a trailing newline keeps rows separate.
+    """
+    file_path = tmp_path / "no_newline.csv"
+    file_path.write_text("Operation,Num1,Num2,Result\nAdd,1.0,2.0,3.0")
+    manager = HistoryManager(file_path=str(file_path))
+    manager.add_record('Add', 2.0, 2.0, 4.0)
+    records = manager.load_history()
+    assert len(records) == 2
+    assert records[1] == {'Operation': 'Add', 'Num1': 2.0, 'Num2': 2.0, 'Result': 4.0}
+
+def test_write_behind_buffers_until_flush(tmp_path):
+    """
+    Test that write-behind mode keeps records in memory until the buffer is flushed.
+    
+    Records are visible through load_history immediately, but only reach the file once
+    the flush size is reached or the manager is closed.
+    """
+    manager = HistoryManager(file_path=str(tmp_path / "buffered.csv"), flush_size=100)
+    manager.add_record('add', 1, 2, 3)
+    assert len(manager.load_history()) == 1
+    assert pd.read_csv(manager.file_path).empty
+    manager.close()
+    assert len(pd.read_csv(manager.file_path)) == 1
+
+def test_write_behind_flushes_on_interval(tmp_path):
+    """
+    Test that the background flusher writes buffered records once the interval elapses.
+    """
+    manager = HistoryManager(file_path=str(tmp_path / "interval.csv"), flush_size=100, flush_interval=0.01)
+    manager.add_record('divide', 6, 3, 2)
+    deadline = time.monotonic() + 2
+    while pd.read_csv(manager.file_path).empty and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(pd.read_csv(manager.file_path)) == 1
+    manager.close()
+
+def test_commands_share_history_manager(tmp_path):
+    """
+    Test that commands use the process-wide history manager unless one is injected.
+    """
+    shared = configure_history_manager(file_path=str(tmp_path / "shared.csv"))
+    assert get_history_manager() is shared
+    assert Add().history_manager is shared
+    assert ShowHistory().history_manager is shared
+    injected = HistoryManager(file_path=str(tmp_path / "injected.csv"))
+    assert Add(history_manager=injected).history_manager is injected
+    configure_history_manager()
+
+def test_add_records_in_bulk(history_manager):
+    """
+    Test adding many records at once.
+    
+    Verifies that only the retained records are kept and that they are written with one flush.
+    """
+    history_manager.add_records([['add', i, 1, i + 1] for i in range(10)])
+    df = pd.read_csv(history_manager.file_path)
+    assert len(df) == 5
+    assert df.iloc[0].to_dict() == {'Id': 1, 'Operation': 'add', 'Num1': 5, 'Num2': 1, 'Result': 6}
+    assert len(history_manager.load_history()) == 5
+
+def test_reload_from_file(history_manager):
+    """
+    Test that a new manager loads the records written by a previous one as floats.
+    """
+    history_manager.add_record('Divide', 9, 3, 3)
+    records = HistoryManager(file_path=history_manager.file_path).load_history()
+    assert records == [{'Operation': 'Divide', 'Num1': 9.0, 'Num2': 3.0, 'Result': 3.0}]
+
+def test_show_history(history_manager, capsys):
+    """
+    Test that show_history prints one line per retained record.
+    """
+    history_manager.show_history()
+    assert "No history available." in capsys.readouterr().out
+    history_manager.add_record('Add', 2.0, 3.0, 5.0)
+    history_manager.show_history()
+    output = capsys.readouterr().out
+    assert "Calculation History:" in output
+    assert "1  Add" in output and "5.0" in output
+
+def test_to_dataframe(history_manager):
+    """
+    Test exporting the history to a pandas DataFrame for analysis.
+    """
+    history_manager.add_record('Multiply', 2.0, 4.0, 8.0)
+    df = history_manager.to_dataframe()
+    assert list(df.columns) == ['Operation', 'Num1', 'Num2', 'Result']
+    assert df.iloc[0].to_dict() == {'Operation': 'Multiply', 'Num1': 2.0, 'Num2': 4.0, 'Result': 8.0}
+
+def add_records_in_process(file_path, name, count):
+    """
+    Adds `count` records to a shared history file from a separate process.
+    """
+    manager = HistoryManager(file_path=file_path, max_records=1000, compact_every=7)
+    for i in range(count):
+        manager.add_record(name, i, 1, i + 1)
+    manager.close()
+
+def test_concurrent_processes_keep_all_records(tmp_path):
+    """
+    Test that processes appending to and compacting the same file do not lose each other's records.
+    """
+    file_path = str(tmp_path / "shared.csv")
+    HistoryManager(file_path=file_path).close()
+    processes = [multiprocessing.Process(target=add_records_in_process, args=(file_path, f'p{n}', 40))
+                 for n in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    records = HistoryManager(file_path=file_path, max_records=1000).load_history()
+    assert len(records) == 160
+    for n in range(4):
+        assert [record['Num1'] for record in records if record['Operation'] == f'p{n}'] == list(range(40))
+
+def test_concurrent_threads_group_commit(tmp_path):
+    """
+    Test that threads writing through the same manager are committed without losing records.
+    """
+    manager = HistoryManager(file_path=str(tmp_path / "threads.csv"), max_records=1000, durable=True)
+    threads = [threading.Thread(target=lambda n=n: [manager.add_record(f't{n}', i, 1, i) for i in range(50)])
+               for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(manager.load_history()) == 400
+    assert len(HistoryManager(file_path=manager.file_path, max_records=1000).load_history()) == 400
+
+def test_picks_up_records_of_other_managers(tmp_path):
+    """
+    Test that records written by another manager of the same file are retained before writing,
+    and that clearing or deleting acts on them too.
+    """
+    file_path = str(tmp_path / "shared.csv")
+    first = HistoryManager(file_path=file_path)
+    second = HistoryManager(file_path=file_path)
+    first.add_record('Add', 1, 1, 2)
+    second.add_record('Multiply', 2, 3, 6)
+    assert [record['Operation'] for record in second.load_history()] == ['Add', 'Multiply']
+    assert second.record_ids() == [1, 2]
+    assert second.remove_record(1)
+    first.add_record('Subtract', 5, 1, 4)
+    assert [record['Operation'] for record in first.load_history()] == ['Multiply', 'Subtract']
+    second.clear_records()
+    first.add_record('Divide', 8, 2, 4)
+    assert [record['Operation'] for record in first.load_history()] == ['Divide']
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+def test_show_history_pages(history_manager, capsys):
+    """
+    Test that one page of the history is formatted, with a line saying which records are shown.
+    """
+    for i in range(5):
+        history_manager.add_record('Add', i, 1, i + 1)
+    lines = history_manager.format_history(offset=1, limit=2)
+    assert [line.split()[:3] for line in lines[2:4]] == [['2', 'Add', '1'], ['3', 'Add', '2']]
+    assert lines[-1] == "Records 1 to 2 of 5."
+    assert history_manager.load_history(4, 10) == [{'Operation': 'Add', 'Num1': 4, 'Num2': 1, 'Result': 5}]
+    assert history_manager.format_history(offset=5, limit=2) == ["No history available."]
+
+def test_show_history_command_pages(history_manager, capsys, monkeypatch):
+    """
+    Test that the ShowHistory command asks before displaying each next page.
+    """
+    for i in range(5):
+        history_manager.add_record('Add', i, 1, i + 1)
+    answers = iter(['', 'q'])
+    monkeypatch.setattr('builtins.input', lambda _: next(answers))
+    ShowHistory(history_manager, page_size=2).execute()
+    output = capsys.readouterr().out
+    assert "Records 0 to 1 of 5." in output and "Records 2 to 3 of 5." in output
+    assert "Records 4 to 4 of 5." not in output
+
+def test_delete_appends_tombstone(tmp_path):
+    """
+    Test that deleting a record appends a tombstone instead of rewriting the file, and that
+    the ids of the other records stay the same, also once the file is read again.
+    """
+    manager = HistoryManager(file_path=str(tmp_path / "tombstones.csv"), max_records=10)
+    for i in range(5):
+        manager.add_record('Add', i, 1, i + 1)
+    inode = os.stat(manager.file_path).st_ino
+    assert manager.remove_record(3)
+    assert not manager.remove_record(3)
+    assert os.stat(manager.file_path).st_ino == inode
+    with open(manager.file_path, encoding='utf-8') as history_file:
+        assert history_file.read().splitlines()[-1] == "3"
+    assert manager.record_ids() == [1, 2, 4, 5]
+    assert [record[1] for chunk in manager.iter_records() for record in chunk] == [0, 1, 3, 4]
+    reopened = HistoryManager(file_path=manager.file_path, max_records=10)
+    assert reopened.record_ids() == [1, 2, 4, 5]
+    reopened.add_record('Add', 5, 1, 6)
+    assert reopened.record_ids()[-1] == 6
+
+def test_compaction_runs_in_background(tmp_path):
+    """
+    Test that the background compactor drops tombstones and records beyond retention, keeping ids.
+    """
+    manager = HistoryManager(file_path=str(tmp_path / "background.csv"), max_records=2, compact_every=4)
+    for i in range(3):
+        manager.add_record('Add', i, 0, i)
+    manager.remove_record(3)
+    deadline = time.monotonic() + 2
+    while len(pd.read_csv(manager.file_path)) > 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pd.read_csv(manager.file_path)['Id'].tolist() == [2]
+    manager.close()
+
+def test_file_without_ids_is_migrated(tmp_path):
+    """
+    Test that a history file written before records had ids is rewritten with ids from 1.
+    """
+    file_path = tmp_path / "legacy.csv"
+    file_path.write_text("Operation,Num1,Num2,Result\nAdd,1.0,2.0,3.0\nSubtract,3.0,1.0,2.0\n")
+    manager = HistoryManager(file_path=str(file_path))
+    assert manager.record_ids() == [1, 2]
+    assert file_path.read_text().splitlines()[:2] == ["Id,Operation,Num1,Num2,Result", "1,Add,1.0,2.0,3.0"]
+
+def test_unwritten_records_follow_other_managers(tmp_path):
+    """
+    Test that buffered records get the next ids if another manager has used theirs meanwhile.
+    """
+    file_path = str(tmp_path / "shared_ids.csv")
+    first = HistoryManager(file_path=file_path, flush_size=100)
+    second = HistoryManager(file_path=file_path)
+    first.add_record('Add', 1, 1, 2)
+    second.add_record('Multiply', 2, 3, 6)
+    first.flush()
+    assert first.record_ids() == [1, 2]
+    assert [record['Operation'] for record in first.load_history()] == ['Multiply', 'Add']
+    assert pd.read_csv(file_path)['Id'].tolist() == [1, 2]
+    first.close()
+
+def test_delete_command_uses_ids(history_manager, capsys, monkeypatch):
+    """
+    Test that the ids shown by the history stay valid for the DeleteSpecificRecord command.
+    """
+    for i in range(3):
+        history_manager.add_record('Add', i, 1, i + 1)
+    answers = iter(['1', '2', '1'])
+    monkeypatch.setattr('builtins.input', lambda _: next(answers))
+    command = DeleteSpecificRecord(history_manager)
+    for _ in range(3):
+        command.execute()
+    output = capsys.readouterr().out
+    assert "Record 1 deleted." in output and "Record 2 deleted." in output
+    assert "Invalid record ID." in output
+    assert history_manager.record_ids() == [3]
+
+def test_new_file_is_created_silently(tmp_path, capsys):
+    """
+    Test that creating the history file prints nothing, so batch output on stdout stays clean.
+    """
+    HistoryManager(file_path=str(tmp_path / "new.csv"))
+    assert capsys.readouterr().out == ""
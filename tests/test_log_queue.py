@@ -0,0 +1,44 @@
+"""
+Test suite for queue-based logging, which moves log handlers off the logging thread.
+"""
+
+import logging
+import logging.handlers
+import threading
+from app.log_queue import start_queue_logging, stop_queue_logging
+
+
+class ThreadRecordingHandler(logging.Handler):
+    """Handler that remembers each message and the thread that handled it."""
+    def __init__(self):
+        super().__init__()
+        self.handled = []
+
+    def emit(self, record):
+        self.handled.append((record.getMessage(), threading.current_thread().name))
+
+
+def test_queue_logging_moves_handlers_to_listener():
+    """
+    Test that records reach the original handlers on the listener thread, and that the
+    handlers are put back once queue logging stops.
+    """
+    logger = logging.getLogger('test_log_queue')
+    logger.setLevel(logging.INFO)
+    handler = ThreadRecordingHandler()
+    logger.addHandler(handler)
+    try:
+        start_queue_logging(logger)
+        assert isinstance(logger.handlers[0], logging.handlers.QueueHandler)
+        logger.info("Adding %s and %s", 2, 3)
+        stop_queue_logging()
+
+        assert logger.handlers == [handler]
+        assert handler.handled[0][0] == "Adding 2 and 3"
+        assert handler.handled[0][1] != threading.current_thread().name
+
+        logger.info("After stop")
+        assert handler.handled[1] == ("After stop", threading.current_thread().name)
+    finally:
+        stop_queue_logging()
+        logger.removeHandler(handler)
@@ -0,0 +1,148 @@
+"""
+Test suite for the latency metrics of the commands, operations and history store.
+"""
+
+import json
+import pytest
+from app.calculator import Calculator
+from app.commands import CommandHandler
+from app.history_manager import HistoryManager
+from app.metrics import MetricsRegistry, Timer, configure_metrics, get_metrics, timed
+from app.plugins.greet import GreetCommand
+from app.plugins.stats import StatsCommand
+from app.sqlite_history_manager import SqliteHistoryManager
+
+@pytest.fixture
+def metrics():
+    """
+    Fixture enabling a fresh shared metrics registry for the duration of a test.
+    """
+    yield configure_metrics(True)
+    configure_metrics(False)
+
+def test_timer_summarises_durations():
+    """
+    Test that a timer counts durations in buckets and estimates percentiles from them.
+    """
+    timer = Timer()
+    assert timer.summary()['p50'] is None
+    for _ in range(99):
+        timer.observe(3e-6)
+    timer.observe(0.2)
+    summary = timer.summary()
+    assert summary['count'] == 100
+    assert summary['max'] == 0.2
+    assert summary['p50'] == 5e-6
+    assert summary['p99'] == 5e-6
+    assert timer.percentile(1.0) == 0.2
+    assert summary['mean'] == pytest.approx((99 * 3e-6 + 0.2) / 100)
+
+def test_timed_does_nothing_when_disabled():
+    """
+    Test that instrumented functions run without recording anything when metrics are disabled.
+    """
+    @timed('work_seconds')
+    def work(value):
+        return value * 2
+
+    configure_metrics(False)
+    assert work(2) == 4
+    assert get_metrics() is None
+
+def test_timed_records_calls_and_failures(metrics):
+    """
+    Test that instrumented functions are timed, including calls that raise.
+    """
+    @timed('work_seconds', kind='test')
+    def work(value):
+        return 1 / value
+
+    work(1)
+    with pytest.raises(ZeroDivisionError):
+        work(0)
+    assert metrics.timer('work_seconds', kind='test').count == 2
+
+def test_commands_and_operations_are_timed(metrics, capsys):
+    """
+    Test that command dispatch is timed by command name, resolving aliases, and operation
+    computations by operation name.
+    """
+    handler = CommandHandler()
+    handler.register_command('greet', GreetCommand(), aliases=['hello'])
+    handler.execute_command('greet')
+    handler.execute_command('hello')
+    handler.execute_command('missing')
+    assert "Hello, World!" in capsys.readouterr().out
+    assert metrics.timer('command_seconds', command='greet').count == 2
+
+    calculator = Calculator.from_command(log=False, record_history=False)
+    calculator.calculate('add', 1, 2)
+    calculator.calculate('divide', 1, 4)
+    with pytest.raises(ZeroDivisionError):
+        calculator.calculate('divide', 1, 0)
+    assert metrics.timer('operation_seconds', operation='Add').count == 1
+    assert metrics.timer('operation_seconds', operation='Divide').count == 2
+
+@pytest.mark.parametrize("manager_class, file_name, store", [
+    (HistoryManager, "metrics_history.csv", 'csv'),
+    (SqliteHistoryManager, "metrics_history.db", 'sqlite'),
+])
+def test_history_io_is_timed(metrics, tmp_path, manager_class, file_name, store):
+    """
+    Test that history loads and flushes are timed and written records counted per store.
+    """
+    history_manager = manager_class(file_path=str(tmp_path / file_name))
+    history_manager.add_records([['Add', 1.0, 2.0, 3.0], ['Subtract', 3.0, 1.0, 2.0]])
+    history_manager.close()
+    manager_class(file_path=str(tmp_path / file_name)).close()
+    assert metrics.timer('history_load_seconds', store=store).count >= 1
+    assert metrics.timer('history_flush_seconds', store=store).count >= 1
+    assert metrics.counter('history_records_written_total', store=store).value == 2
+
+def test_prometheus_and_json_dumps(tmp_path):
+    """
+    Test that the registry is written in the Prometheus text format and as JSON.
+    """
+    registry = MetricsRegistry()
+    registry.counter('records_total', store='csv').inc(3)
+    registry.timer('command_seconds', command='say "hi"').observe(0.002)
+    text = registry.to_prometheus()
+    assert '# TYPE calculator_records_total counter' in text
+    assert 'calculator_records_total{store="csv"} 3' in text
+    assert 'calculator_command_seconds_bucket{command="say \\"hi\\"",le="0.001"} 0' in text
+    assert 'calculator_command_seconds_bucket{command="say \\"hi\\"",le="0.0025"} 1' in text
+    assert 'calculator_command_seconds_bucket{command="say \\"hi\\"",le="+Inf"} 1' in text
+    assert 'calculator_command_seconds_count{command="say \\"hi\\""} 1' in text
+
+    registry.dump(str(tmp_path / "metrics.json"))
+    report = json.loads((tmp_path / "metrics.json").read_text())
+    assert report['counters'] == [{'name': 'records_total', 'labels': {'store': 'csv'}, 'value': 3}]
+    assert report['timers'][0]['count'] == 1
+    assert report['timers'][0]['buckets'] == {'0.0025': 1}
+    registry.dump(str(tmp_path / "metrics.prom"))
+    assert (tmp_path / "metrics.prom").read_text() == text
+    with pytest.raises(ValueError):
+        registry.dump(str(tmp_path / "metrics.xml"))
+
+def test_stats_command_shows_and_saves_metrics(metrics, tmp_path, monkeypatch, capsys):
+    """
+    Test that the stats command displays the metrics table and saves it on request.
+    """
+    metrics.timer('command_seconds', command='greet').observe(0.0015)
+    path = tmp_path / "stats.json"
+    monkeypatch.setattr('builtins.input', lambda _: str(path))
+    StatsCommand().execute()
+    output = capsys.readouterr().out
+    assert "command_seconds{greet}" in output
+    assert "1.50ms" in output
+    assert f"Metrics saved to {path}." in output
+    assert json.loads(path.read_text())['timers'][0]['labels'] == {'command': 'greet'}
+
+def test_stats_command_when_disabled(monkeypatch, capsys):
+    """
+    Test that the stats command explains that metrics are disabled without prompting.
+    """
+    configure_metrics(False)
+    monkeypatch.setattr('builtins.input', lambda _: pytest.fail("input() must not be called"))
+    StatsCommand().execute()
+    assert "Metrics are disabled" in capsys.readouterr().out
@@ -0,0 +1,154 @@
+"""
+Test suite for the numeric backends the calculations can be carried out in.
+"""
+
+import io
+import pickle
+from decimal import Decimal
+from fractions import Fraction
+import pytest
+from app.batch import BatchProcessor
+from app.calculator import Calculator
+from app.history_manager import HistoryManager
+from app.numeric import FLOAT, DecimalBackend, configure_numeric_backend, get_backend, get_numeric_backend
+from app.plugins.calculator import CalculatorCommand
+from app.result_cache import configure_result_cache, get_result_cache
+
+@pytest.fixture
+def calculator():
+    """
+    Fixture to create a Calculator that neither logs nor records its calculations.
+    """
+    return Calculator.from_command(log=False, record_history=False)
+
+@pytest.mark.parametrize("name, text, expected", [
+    ('float', "0.1", 0.1),
+    ('decimal', " 0.1 ", Decimal('0.1')),
+    ('fraction', "1/3", Fraction(1, 3)),
+    ('int', "123456789012345678901234567890", 123456789012345678901234567890),
+])
+def test_backends_parse_numbers_exactly(name, text, expected):
+    """
+    Test that every backend parses entered text into its own number type.
+    """
+    value = get_backend(name).parse(text)
+    assert value == expected
+    assert type(value) is type(expected)
+
+@pytest.mark.parametrize("name, text", [('decimal', "abc"), ('fraction', "1/0"), ('int', "1.5")])
+def test_backends_reject_invalid_numbers(name, text):
+    """
+    Test that invalid numbers raise ValueError, which the commands report as invalid input.
+    """
+    with pytest.raises(ValueError):
+        get_backend(name).parse(text)
+
+def test_backends_convert_floats_by_their_shortest_text():
+    """
+    Test that floats given by library callers convert to the number they are written as.
+    """
+    assert get_backend('decimal').convert(0.1) == Decimal('0.1')
+    assert get_backend('fraction').convert(0.1) == Fraction(1, 10)
+    assert get_backend('int').convert(4.0) == 4
+    with pytest.raises(ValueError):
+        get_backend('int').convert(4.5)
+
+def test_float_backend_is_shared_and_unknown_names_fail():
+    """
+    Test that 'float' always gives the shared FLOAT backend, even across pickling, and that
+    unknown names raise ValueError.
+    """
+    assert get_backend('float') is FLOAT
+    assert pickle.loads(pickle.dumps(FLOAT)) is FLOAT
+    with pytest.raises(ValueError, match="Unknown numeric backend"):
+        get_backend('complex')
+
+def test_calculate_in_exact_backends(calculator):
+    """
+    Test that per-call backends avoid binary rounding errors and divide exactly.
+    """
+    assert calculator.calculate('add', 0.1, 0.2) != 0.3
+    assert calculator.calculate('add', 0.1, 0.2, numeric='decimal') == Decimal('0.3')
+    assert calculator.calculate('divide', 1, 3, numeric='fraction') == Fraction(1, 3)
+    assert calculator.calculate('divide', 10, 4, numeric='int') == Fraction(5, 2)
+    assert calculator.calculate('divide', 10, 5, numeric='int') == 2
+    assert calculator.calculate('multiply', 2 ** 70, 2 ** 70, numeric='int') == 2 ** 140
+    with pytest.raises(ZeroDivisionError):
+        calculator.calculate('divide', 1, 0, numeric='decimal')
+
+def test_decimal_precision_and_rounding(calculator):
+    """
+    Test that decimal results are rounded in the backend's context, not the caller's.
+    """
+    backend = DecimalBackend(precision=4, rounding='ROUND_HALF_UP')
+    assert calculator.calculate('divide', 2, 3, numeric=backend) == Decimal('0.6667')
+    assert calculator.calculate('divide', 2, 3, numeric='decimal') == Decimal('0.6666666666666666666666666667')
+
+def test_calculator_default_backend():
+    """
+    Test that a calculator computes in its own backend unless a call overrides it.
+    """
+    calculator = Calculator.from_command(log=False, record_history=False, numeric='fraction')
+    assert calculator.calculate('subtract', 1, 0.9) == Fraction(1, 10)
+    assert calculator.calculate_many([('add', 1, 2), ('divide', 1, 4)]) == [3, Fraction(1, 4)]
+    assert calculator.calculate('divide', 1, 4, numeric='float') == 0.25
+
+def test_commands_use_the_configured_backend(monkeypatch, capsys):
+    """
+    Test that the interactive commands parse and compute in the process-wide backend.
+    """
+    command = CalculatorCommand().operations['1']
+    inputs = iter(["0.1", "0.2"])
+    monkeypatch.setattr('builtins.input', lambda _: next(inputs))
+    configure_numeric_backend('decimal', precision=10)
+    try:
+        assert get_numeric_backend().context.prec == 10
+        command.execute()
+    finally:
+        configure_numeric_backend('float')
+    assert "0.3" in capsys.readouterr().out
+    assert get_numeric_backend() is FLOAT
+
+def test_batch_in_decimal_backend(tmp_path):
+    """
+    Test that a batch evaluated in the decimal backend gives exact results and reports errors.
+    """
+    history_manager = HistoryManager(file_path=str(tmp_path / "numeric_history.csv"))
+    processor = BatchProcessor.from_calculator(CalculatorCommand(), history_manager, numeric='decimal')
+    output = io.StringIO()
+    source = "add,0.1,0.2\ndivide,1,0\nmultiply,x,1\nsubtract,inf,inf\nmultiply,1e999999999,1e999999999\n"
+    assert processor.run(io.StringIO(source), output) == (5, 4)
+    assert output.getvalue().splitlines() == [
+        "Add,0.1,0.2,0.3",
+        "divide,1,0,Error: Cannot divide by zero.",
+        "multiply,x,1,Error: Please enter valid numbers.",
+        "subtract,inf,inf,Error: The result is undefined or out of range.",
+        "multiply,1e999999999,1e999999999,Error: The result is undefined or out of range.",
+    ]
+    assert history_manager.load_history()[-1]['Result'] == Decimal('0.3')
+    history_manager.close()
+    assert HistoryManager(file_path=history_manager.file_path).load_history()[-1]['Result'] == 0.3
+
+def test_csv_history_reads_back_fractions(tmp_path):
+    """
+    Test that exact fractions written to the CSV history are read back as floats.
+    """
+    file_path = str(tmp_path / "fraction_history.csv")
+    history_manager = HistoryManager(file_path=file_path)
+    history_manager.add_record('Divide', Fraction(1), Fraction(3), Fraction(1, 3))
+    history_manager.close()
+    assert HistoryManager(file_path=file_path).load_history() == [
+        {'Operation': 'Divide', 'Num1': 1.0, 'Num2': 3.0, 'Result': 1 / 3}]
+
+def test_result_cache_keys_decimals_by_context(calculator):
+    """
+    Test that cached decimal results are not shared between different precisions.
+    """
+    configure_result_cache(8)
+    try:
+        assert calculator.calculate('divide', 1, 3, numeric=DecimalBackend(precision=4)) == Decimal('0.3333')
+        assert calculator.calculate('divide', 1, 3, numeric=DecimalBackend(precision=8)) == Decimal('0.33333333')
+        assert calculator.calculate('divide', 1, 3, numeric=DecimalBackend(precision=4)) == Decimal('0.3333')
+        assert get_result_cache().hits == 1
+    finally:
+        configure_result_cache(0)
@@ -0,0 +1,82 @@
+"""
+Test suite for the PluginManifest and LazyCommand, which let plugins be registered
+without importing them on start.
+"""
+
+import os
+import sys
+import pytest
+from app.commands import LazyCommand
+from app.plugin_manifest import PluginManifest
+
+PLUGIN_SOURCE = '''
+from app.commands import Command
+
+class SampleCommand(Command):
+    def execute(self):
+        print("Sample executed.")
+'''
+
+@pytest.fixture
+def plugin_package(tmp_path, monkeypatch):
+    """
+    Fixture to create an importable plugin package in a temporary directory.
+
+    Returns:
+        Path: The directory of the 'sample_plugins' package.
+    """
+    package_path = tmp_path / "sample_plugins"
+    package_path.mkdir()
+    (package_path / "__init__.py").write_text("")
+    (package_path / "sample.py").write_text(PLUGIN_SOURCE)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield package_path
+    sys.modules.pop('sample_plugins.sample', None)
+    sys.modules.pop('sample_plugins', None)
+
+def test_manifest_reuses_cached_entries(plugin_package):
+    """
+    Test that discovery runs only once while the package is unchanged.
+    """
+    calls = []
+    def discover():
+        calls.append(1)
+        return [['sample', 'sample_plugins.sample', 'SampleCommand']]
+
+    manifest = PluginManifest('manifest.json')
+    first = manifest.load_entries('sample_plugins', discover)
+    second = PluginManifest('manifest.json').load_entries('sample_plugins', discover)
+    assert first == second == [['sample', 'sample_plugins.sample', 'SampleCommand']]
+    assert len(calls) == 1
+
+def test_manifest_invalidated_by_module_mtime(plugin_package):
+    """
+    Test that changing a module's modification time triggers a fresh discovery.
+    """
+    calls = []
+    def discover():
+        calls.append(1)
+        return []
+
+    manifest = PluginManifest('manifest.json')
+    manifest.load_entries('sample_plugins', discover)
+    module_path = plugin_package / "sample.py"
+    stat = os.stat(module_path)
+    os.utime(module_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    manifest.load_entries('sample_plugins', discover)
+    (plugin_package / "other.py").write_text("")
+    manifest.load_entries('sample_plugins', discover)
+    assert len(calls) == 3
+
+def test_lazy_command_imports_on_first_use(plugin_package, capsys):
+    """
+    Test that a LazyCommand only imports its plugin module when the command runs.
+    """
+    command = LazyCommand('sample_plugins.sample', 'SampleCommand')
+    assert command.name == 'SampleCommand'
+    assert 'sample_plugins.sample' not in sys.modules
+    command.execute()
+    assert 'sample_plugins.sample' in sys.modules
+    assert capsys.readouterr().out == "Sample executed.\n"
+    assert command.load() is command.load()
@@ -0,0 +1,99 @@
+"""
+Test suite for the profiler that writes a cProfile file and collapsed stacks per command.
+"""
+
+import pstats
+import time
+import pytest
+from app.commands import CommandHandler
+from app.plugins.greet import GreetCommand
+from app.profiling import Profiler, StackSampler, configure_profiler
+
+@pytest.fixture
+def profiler(tmp_path):
+    """
+    Fixture enabling a shared profiler writing to a temporary directory for a test.
+    """
+    yield configure_profiler(True, str(tmp_path / "profiles"), interval=0.001)
+    configure_profiler(False)
+
+def busy_work(seconds):
+    """
+    Keeps the thread running Python code for the given number of seconds.
+    """
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += 1
+    return total
+
+def test_profiler_writes_prof_and_collapsed_stacks(tmp_path):
+    """
+    Test that a profiled run returns the function's result and writes a pstats file and
+    collapsed stacks starting at the profiled function.
+    """
+    profiler = Profiler(str(tmp_path), interval=0.001)
+    assert profiler.run('busy work', busy_work, 0.1) > 0
+    prof_files = list(tmp_path.glob('busy_work-*.prof'))
+    collapsed_files = list(tmp_path.glob('busy_work-*.collapsed'))
+    assert len(prof_files) == len(collapsed_files) == 1
+    stats = pstats.Stats(str(prof_files[0]))
+    assert any(function == 'busy_work' for _, _, function in stats.stats)
+    lines = collapsed_files[0].read_text().splitlines()
+    assert lines
+    for line in lines:
+        stack, count = line.rsplit(' ', 1)
+        assert stack.startswith('test_profiling.py:busy_work')
+        assert int(count) > 0
+
+def test_profiler_writes_files_when_the_function_raises(tmp_path):
+    """
+    Test that the profile of a failing run is written before the error propagates.
+    """
+    profiler = Profiler(str(tmp_path))
+    with pytest.raises(ZeroDivisionError):
+        profiler.run('fail', lambda: 1 / 0)
+    assert len(list(tmp_path.glob('fail-*.prof'))) == 1
+
+def test_nested_runs_are_part_of_the_outer_profile(tmp_path):
+    """
+    Test that a run nested in a profiled run does not start a profile of its own.
+    """
+    profiler = Profiler(str(tmp_path))
+    assert profiler.run('outer', lambda: profiler.run('inner', lambda: 42)) == 42
+    assert len(list(tmp_path.glob('outer-*.prof'))) == 1
+    assert not list(tmp_path.glob('inner-*'))
+
+def test_sampler_cuts_stacks_at_the_stop_frame():
+    """
+    Test that collapsed stacks leave out the stop frame and its callers.
+    """
+    def outer():
+        return inner()
+
+    def inner():
+        import sys  # pylint: disable=import-outside-toplevel
+        return sys._getframe()  # pylint: disable=protected-access
+
+    sampler = StackSampler(0, 0.001, stop_code=outer.__code__)
+    assert sampler.collapse(outer()) == 'test_profiling.py:test_sampler_cuts_stacks_at_the_stop_frame.<locals>.inner'
+
+def test_command_handler_profiles_commands(profiler, capsys):
+    """
+    Test that commands run through the command handler are profiled under their name.
+    """
+    handler = CommandHandler()
+    handler.register_command('greet', GreetCommand(), aliases=['hello'])
+    handler.execute_command('hello')
+    assert "Hello, World!" in capsys.readouterr().out
+    assert len(list(profiler_files(profiler, 'greet-*.prof'))) == 1
+    configure_profiler(False)
+    handler.execute_command('greet')
+    assert len(list(profiler_files(profiler, 'greet-*.prof'))) == 1
+
+def profiler_files(profiler, pattern):
+    """
+    Returns the files of a profiler's directory matching a pattern.
+    """
+    import pathlib  # pylint: disable=import-outside-toplevel
+    return pathlib.Path(profiler.directory).glob(pattern)
@@ -0,0 +1,78 @@
+"""
+Test suite for the ResultCache placed in front of the calculator operations.
+"""
+
+import pytest
+from app.calculator import Calculator
+from app.history_manager import HistoryManager
+from app.result_cache import ResultCache, configure_result_cache
+
+@pytest.fixture
+def result_cache():
+    """
+    Fixture enabling a small shared result cache for the duration of a test.
+    """
+    yield configure_result_cache(2)
+    configure_result_cache(0)
+
+@pytest.fixture
+def calculator(tmp_path):
+    """
+    Fixture to create a Calculator that neither logs nor records its calculations.
+    """
+    history_manager = HistoryManager(file_path=str(tmp_path / "cache_history.csv"))
+    return Calculator.from_command(history_manager=history_manager, log=False, record_history=False)
+
+def test_cache_counts_hits_and_evicts_least_recently_used():
+    """
+    Test that repeated calculations are answered from the cache and that the least recently
+    used result is evicted when the cache is full.
+    """
+    cache = ResultCache(maxsize=2)
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        return value
+
+    assert cache.get_or_compute('Add', 1.0, 1.0, lambda: compute(2.0)) == 2.0
+    assert cache.get_or_compute('Add', 1.0, 1.0, lambda: compute(2.0)) == 2.0
+    cache.get_or_compute('Add', 2.0, 2.0, lambda: compute(4.0))
+    cache.get_or_compute('Add', 1.0, 1.0, lambda: compute(2.0))  # Now the most recently used
+    cache.get_or_compute('Add', 3.0, 3.0, lambda: compute(6.0))  # Evicts 2 + 2
+    cache.get_or_compute('Add', 1.0, 1.0, lambda: compute(2.0))
+    assert calls == [2.0, 4.0, 6.0]
+    assert cache.stats() == {'hits': 3, 'misses': 3, 'evictions': 1, 'size': 2, 'maxsize': 2}
+
+def test_cache_keys_distinguish_signed_zeros_and_operations():
+    """
+    Test that operands which compare equal but give different results are cached separately.
+    """
+    cache = ResultCache()
+    assert cache.get_or_compute('Add', -0.0, -0.0, lambda: -0.0 + -0.0) == 0.0
+    assert str(cache.get_or_compute('Add', 0.0, 0.0, lambda: 0.0 + 0.0)) == '0.0'
+    assert str(cache.get_or_compute('Add', -0.0, -0.0, lambda: 0.0)) == '-0.0'
+    assert cache.get_or_compute('Multiply', 2.0, 2.0, lambda: 4.0) == 4.0
+    assert cache.stats()['misses'] == 3
+
+def test_cache_repeats_division_by_zero(calculator, result_cache):
+    """
+    Test that a cached division by zero still raises ZeroDivisionError on every call.
+    """
+    for _ in range(2):
+        with pytest.raises(ZeroDivisionError):
+            calculator.calculate('divide', 1.0, 0.0)
+    assert result_cache.stats()['hits'] == 1
+    assert calculator.calculate('divide', 1.0, 4.0) == 0.25
+
+def test_operations_use_shared_cache(calculator, result_cache):
+    """
+    Test that the operations consult the shared cache only while it is enabled.
+    """
+    assert calculator.calculate('multiply', 3.0, 4.0) == 12.0
+    assert calculator.calculate('multiply', 3.0, 4.0) == 12.0
+    assert calculator.calculate('subtract', 3.0, 4.0) == -1.0
+    assert result_cache.stats()['hits'] == 1
+    configure_result_cache(0)
+    assert calculator.calculate('multiply', 3.0, 4.0) == 12.0
+    assert result_cache.stats()['hits'] == 1
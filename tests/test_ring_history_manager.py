@@ -0,0 +1,149 @@
+"""
+Test suite for the RingHistoryManager, which keeps the history in a fixed-capacity ring buffer file.
+"""
+
+import os
+import pytest
+from app.ring_history_manager import RingHistoryManager
+
+@pytest.fixture
+def ring_path(tmp_path):
+    """
+    Fixture providing a temporary path for the ring buffer file.
+    """
+    return str(tmp_path / "history.ring")
+
+def test_ring_evicts_oldest_records(ring_path):
+    """
+    Test that the ring keeps only its capacity and that a full ring wraps around on disk.
+
+    Verifies the retained records in memory and after reopening the file, and that the file
+    never grows past its header and capacity.
+    """
+    manager = RingHistoryManager(file_path=ring_path, max_records=3)
+    for value in range(1, 8):
+        manager.add_record('Add', float(value), 1.0, value + 1.0)
+    expected = [[5.0, 6.0], [6.0, 7.0], [7.0, 8.0]]
+    assert [[r['Num1'], r['Result']] for r in manager.load_history()] == expected
+    assert os.path.getsize(ring_path) == RingHistoryManager.HEADER_SIZE + 3 * RingHistoryManager.SLOT_SIZE
+
+    reopened = RingHistoryManager(file_path=ring_path, max_records=3)
+    assert [[r['Num1'], r['Result']] for r in reopened.load_history()] == expected
+
+def test_ring_add_records_wraps_in_one_flush(ring_path):
+    """
+    Test that a batch of records crossing the end of the ring is stored in order.
+    """
+    manager = RingHistoryManager(file_path=ring_path, max_records=4)
+    manager.add_records([['Add', 1.0, 1.0, 2.0], ['Subtract', 3.0, 1.0, 2.0], ['Multiply', 2.0, 2.0, 4.0]])
+    manager.add_records([['Divide', 8.0, 2.0, 4.0], ['Add', 5.0, 5.0, 10.0]])
+    operations = ['Subtract', 'Multiply', 'Divide', 'Add']
+    assert [r['Operation'] for r in manager.load_history()] == operations
+    assert [record[0] for record in manager.read_records()] == operations
+
+def test_ring_write_behind_flushes_on_close(ring_path):
+    """
+    Test that buffered records, more than the capacity, reach the file on close.
+    """
+    manager = RingHistoryManager(file_path=ring_path, max_records=2, flush_size=100)
+    for value in range(5):
+        manager.add_record('Add', float(value), 0.0, float(value))
+    manager.close()
+    assert [record[1] for record in RingHistoryManager(file_path=ring_path, max_records=2).read_records()] == [3.0, 4.0]
+
+def test_ring_delete_and_clear(ring_path, capsys):
+    """
+    Test that deleting a record marks its slot, which the next record reuses, and that clearing
+    the history rewrites the ring file.
+    """
+    manager = RingHistoryManager(file_path=ring_path, max_records=3)
+    for value in range(4):
+        manager.add_record('Add', float(value), 0.0, float(value))
+    manager.delete_record(2)
+    assert [record[1] for record in manager.read_records()] == [2.0, 3.0]
+    manager.add_record('Multiply', 4.0, 1.0, 4.0)
+    assert [record[0] for record in manager.read_records()] == ['Add', 'Add', 'Multiply']
+    manager.clear_history()
+    assert manager.read_records() == []
+    assert "Record 2 deleted." in capsys.readouterr().out
+
+def test_ring_migrates_capacity(ring_path):
+    """
+    Test that reopening a ring file with a smaller capacity keeps its newest records.
+    """
+    manager = RingHistoryManager(file_path=ring_path, max_records=5)
+    manager.add_records([['Add', float(value), 0.0, float(value)] for value in range(5)])
+    smaller = RingHistoryManager(file_path=ring_path, max_records=2)
+    assert [record['Num1'] for record in smaller.load_history()] == [3.0, 4.0]
+    assert [record[1] for record in smaller.read_records()] == [3.0, 4.0]
+
+def test_ring_rejects_other_files(tmp_path):
+    """
+    Test that a file which is not a ring buffer is not overwritten.
+    """
+    csv_path = tmp_path / "history.csv"
+    csv_path.write_text("Operation,Num1,Num2,Result\n")
+    with pytest.raises(ValueError):
+        RingHistoryManager(file_path=str(csv_path))
+    assert csv_path.read_text() == "Operation,Num1,Num2,Result\n"
+
+def test_ring_tail_is_a_view_of_the_file(ring_path):
+    """
+    Test that tail returns views of the memory-mapped file, split where the ring wraps.
+
+    Verifies that the views share memory with the map and show records flushed later.
+    """
+    import numpy as np  # type: ignore # pylint: disable=import-outside-toplevel
+    manager = RingHistoryManager(file_path=ring_path, max_records=4)
+    manager.add_records([['Add', float(value), 1.0, value + 1.0] for value in range(2)])
+    manager.add_records([['Add', float(value), 1.0, value + 1.0] for value in range(2, 6)])
+    views = manager.tail()
+    assert [len(view) for view in views] == [2, 2]
+    assert all(np.shares_memory(view, manager.mapped()) for view in views)
+    assert np.concatenate(views)['num1'].tolist() == [2.0, 3.0, 4.0, 5.0]
+    assert manager.tail(1)[0]['result'].tolist() == [6.0]
+
+    manager.add_record('Multiply', 9.0, 2.0, 18.0)
+    last = manager.tail(1)[0]
+    assert manager.operation_name(int(last['operation'][0])) == 'Multiply'
+    assert last['num1'].tolist() == [9.0]
+
+def test_ring_show_last_records(ring_path, capsys):
+    """
+    Test that show_history prints the last records with their id, their record number plus one.
+    """
+    manager = RingHistoryManager(file_path=ring_path, max_records=3)
+    for value in range(5):
+        manager.add_record('Add', float(value), 0.0, float(value))
+    capsys.readouterr()
+    manager.show_history(2)
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "Calculation History:"
+    assert [line.split()[:3] for line in lines[2:]] == [['4', 'Add', '3.0'], ['5', 'Add', '4.0']]
+
+def test_ring_iter_records(ring_path):
+    """
+    Test that the ring is streamed in chunks, oldest first, across its wrap-around.
+    """
+    manager = RingHistoryManager(file_path=ring_path, max_records=4)
+    for value in range(6):
+        manager.add_record('Add', float(value), 0.0, float(value))
+    chunks = list(manager.iter_records(chunk_size=3))
+    assert [record[1] for chunk in chunks for record in chunk] == [2.0, 3.0, 4.0, 5.0]
+    assert max(len(chunk) for chunk in chunks) <= 3
+
+def test_ring_delete_keeps_ids(ring_path):
+    """
+    Test that deleting a record only marks its slot, so the ids survive reopening the file.
+    """
+    manager = RingHistoryManager(file_path=ring_path, max_records=3)
+    for value in range(4):
+        manager.add_record('Add', float(value), 0.0, float(value))
+    assert manager.remove_record(3)
+    assert manager.mapped()['operation'].tolist()[2] == RingHistoryManager.DELETED
+    manager.close()
+    reopened = RingHistoryManager(file_path=ring_path, max_records=3)
+    assert reopened.record_ids() == [2, 4]
+    reopened.add_record('Multiply', 4.0, 1.0, 4.0)
+    assert reopened.record_ids() == [4, 5]
+    reopened.close()
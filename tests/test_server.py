@@ -0,0 +1,185 @@
+"""
+Test suite for the HTTP/JSON server mode, which exposes the calculator commands over HTTP.
+"""
+
+import http.client
+import json
+import threading
+from decimal import Decimal
+import pytest
+from app.calculator import Calculator
+from app.history_manager import HistoryManager
+from app.metrics import configure_metrics
+from app.plugins.calculator import CalculatorCommand
+from app.server import CalculatorHTTPServer, CalculatorService
+
+@pytest.fixture
+def history_manager(tmp_path):
+    """
+    Fixture to initialize a write-through HistoryManager with a temporary file path.
+    """
+    return HistoryManager(file_path=str(tmp_path / "server_history.csv"))
+
+@pytest.fixture
+def service(history_manager):
+    """
+    Fixture to create a CalculatorService over the real calculator commands.
+    """
+    calculator_command = CalculatorCommand()
+    calculator = Calculator.from_command(calculator_command, history_manager=history_manager)
+    return CalculatorService(calculator, calculator_command)
+
+def exact_service(history_manager, numeric):
+    """
+    Creates a CalculatorService over a calculator computing in an exact numeric backend.
+    """
+    calculator_command = CalculatorCommand()
+    calculator = Calculator.from_command(calculator_command, history_manager=history_manager, numeric=numeric)
+    return CalculatorService(calculator, calculator_command)
+
+@pytest.fixture
+def server(service):
+    """
+    Fixture to run a CalculatorHTTPServer on a free local port in a background thread.
+    """
+    http_server = CalculatorHTTPServer(('127.0.0.1', 0), service)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    yield http_server
+    http_server.shutdown()
+    http_server.server_close()
+
+def post(connection, payload):
+    """
+    Sends a JSON request on a connection and returns the status and decoded response.
+    """
+    connection.request('POST', '/', json.dumps(payload), {'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+def test_service_describes_registry(service):
+    """
+    Test that the service exposes the operations and history commands of the registry.
+    """
+    assert service.describe() == {'commands': [
+        'add', 'clearhistory', 'deletespecificrecord', 'divide', 'expression', 'historystats', 'multiply', 'showhistory', 'subtract']}
+
+def test_service_handles_commands(service, history_manager):
+    """
+    Test that calculations are recorded in the shared history and the history commands act on it.
+    """
+    assert service.handle({'command': 'Add', 'num1': 2, 'num2': 3}) == ({'result': 5.0}, True)
+    assert service.handle({'command': 'expression', 'expression': 'x*2', 'bindings': {'x': 4}}) == ({'result': 8.0}, True)
+    response, ok = service.handle({'command': 'showhistory', 'count': 1})
+    assert ok and response['history'] == [{'Operation': 'Multiply', 'Num1': 4.0, 'Num2': 2.0, 'Result': 8.0}]
+    assert response['ids'] == [2]
+    assert service.handle({'command': 'deletespecificrecord', 'id': 1}) == ({'deleted': True}, True)
+    assert [record['Operation'] for record in history_manager.load_history()] == ['Multiply']
+    response, ok = service.handle({'command': 'historystats', 'operation': 'Multiply'})
+    assert ok and response == {'stats': {'Multiply': {'count': 1, 'sum': 8.0, 'mean': 8.0, 'min': 8.0, 'max': 8.0}}}
+    assert service.handle({'command': 'clearhistory'}) == ({'cleared': True}, True)
+    assert history_manager.load_history() == []
+
+@pytest.mark.parametrize("request_, error", [
+    ({'command': 'divide', 'num1': 1, 'num2': 0}, "Cannot divide by zero."),
+    ({'command': 'add', 'num1': 'x', 'num2': 1}, "Please enter valid numbers."),
+    ({'command': 'add', 'num1': 1}, "Please enter valid numbers."),
+    ({'command': 'menu'}, "No such command: menu"),
+    ({'command': 'expression', 'expression': '2+'}, "Unexpected end of expression."),
+    ([1, 2], "A request must be a JSON object."),
+])
+def test_service_reports_errors(service, request_, error):
+    """
+    Test that invalid requests are answered with an error message.
+    """
+    assert service.handle(request_) == ({'error': error}, False)
+
+def test_service_reports_arithmetic_errors(history_manager):
+    """
+    Test that the invalid operations and overflows of the decimal backend are answered with
+    an error message.
+    """
+    service = exact_service(history_manager, 'decimal')
+    error = ({'error': "The result is undefined or out of range."}, False)
+    assert service.handle({'command': 'subtract', 'num1': 'inf', 'num2': 'inf'}) == error
+    assert service.handle({'command': 'multiply', 'num1': '1e999999999', 'num2': '1e999999999'}) == error
+
+@pytest.mark.parametrize("numeric, number, result", [
+    ('int', 12345678901234567891, 12345678901234567892),
+    ('int', "12345678901234567891", 12345678901234567892),
+    ('decimal', "0.1000000000000000000001", Decimal('1.1000000000000000000001')),
+])
+def test_service_keeps_exact_operands(history_manager, numeric, number, result):
+    """
+    Test that the operands of calculations reach the exact backends without being rounded
+    to floats on the way.
+    """
+    service = exact_service(history_manager, numeric)
+    assert service.handle({'command': 'add', 'num1': number, 'num2': 1}) == ({'result': result}, True)
+
+@pytest.mark.parametrize("numeric", ['float', 'decimal', 'fraction', 'int'])
+def test_service_evaluates_expressions_in_every_backend(history_manager, numeric):
+    """
+    Test that expressions with bindings are evaluated in floating point whatever the backend.
+    """
+    service = exact_service(history_manager, numeric)
+    assert service.handle({'command': 'expression', 'expression': 'x*2', 'bindings': {'x': 4}}) == ({'result': 8.0}, True)
+
+def test_server_keeps_connection_alive(server, history_manager):
+    """
+    Test that several requests, single and batched, are answered on one persistent connection.
+    """
+    connection = http.client.HTTPConnection(*server.server_address[:2])
+    try:
+        assert post(connection, {'command': 'add', 'num1': 2, 'num2': 3}) == (200, {'result': 5.0})
+        status, responses = post(connection, [
+            {'command': 'multiply', 'num1': 4, 'num2': 2.5},
+            {'command': 'divide', 'num1': 1, 'num2': 0},
+            {'command': 'subtract', 'num1': 5, 'num2': 1},
+        ])
+        assert status == 200
+        assert responses == [{'result': 10.0}, {'error': "Cannot divide by zero."}, {'result': 4.0}]
+        assert post(connection, {'command': 'nope'}) == (400, {'error': "No such command: nope"})
+        connection.request('GET', '/commands')
+        response = connection.getresponse()
+        assert response.status == 200 and 'add' in json.loads(response.read())['commands']
+    finally:
+        connection.close()
+    assert [record['Operation'] for record in history_manager.load_history()] == ['Add', 'Multiply', 'Subtract']
+
+def test_server_rejects_invalid_json(server):
+    """
+    Test that a body that is not JSON is answered with a 400 error.
+    """
+    connection = http.client.HTTPConnection(*server.server_address[:2])
+    try:
+        connection.request('POST', '/', 'not json', {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        assert response.status == 400
+        assert json.loads(response.read()) == {'error': "The request body must be JSON."}
+    finally:
+        connection.close()
+
+def test_server_sends_metrics(server):
+    """
+    Test that GET /metrics sends the Prometheus text format when metrics are enabled, and a
+    404 error otherwise.
+    """
+    connection = http.client.HTTPConnection(*server.server_address[:2])
+    try:
+        configure_metrics(True)
+        connection.request('POST', '/', json.dumps({'command': 'add', 'num1': 1, 'num2': 2}))
+        connection.getresponse().read()
+        connection.request('GET', '/metrics')
+        response = connection.getresponse()
+        assert response.status == 200
+        assert response.getheader('Content-Type').startswith('text/plain')
+        assert 'calculator_operation_seconds_count{operation="Add"} 1' in response.read().decode()
+        configure_metrics(False)
+        connection.request('GET', '/metrics')
+        response = connection.getresponse()
+        assert response.status == 404
+        response.read()
+    finally:
+        configure_metrics(False)
+        connection.close()
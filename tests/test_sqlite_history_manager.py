@@ -0,0 +1,106 @@
+"""
+Test suite for the SqliteHistoryManager, which keeps the history in an indexed SQLite database.
+"""
+
+import sqlite3
+import pytest
+from app.sqlite_history_manager import SqliteHistoryManager
+
+@pytest.fixture
+def db_path(tmp_path):
+    """
+    Fixture providing a temporary path for the history database.
+    """
+    return str(tmp_path / "history.db")
+
+def count_rows(db_path):
+    """
+    Returns the number of rows in the history table, read through a separate connection.
+    """
+    with sqlite3.connect(db_path) as connection:
+        return connection.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+def test_sqlite_retains_last_records(db_path):
+    """
+    Test that only the last `max_records` rows are kept, in memory and in the database.
+    """
+    manager = SqliteHistoryManager(file_path=db_path, max_records=3)
+    for value in range(6):
+        manager.add_record('Add', float(value), 1.0, value + 1.0)
+    assert [record['Num1'] for record in manager.load_history()] == [3.0, 4.0, 5.0]
+    assert count_rows(db_path) == 3
+    manager.close()
+
+    reopened = SqliteHistoryManager(file_path=db_path, max_records=2)
+    assert [record[1] for record in reopened.read_records()] == [4.0, 5.0]
+    assert count_rows(db_path) == 2
+    reopened.close()
+
+def test_sqlite_uses_wal(db_path):
+    """
+    Test that the database is switched to write-ahead logging.
+    """
+    manager = SqliteHistoryManager(file_path=db_path)
+    with sqlite3.connect(db_path) as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+    manager.close()
+
+def test_sqlite_batched_writes(db_path):
+    """
+    Test that buffered records are written together on close and survive a reopen.
+    """
+    manager = SqliteHistoryManager(file_path=db_path, max_records=100, flush_size=50)
+    manager.add_records([['Multiply', float(value), 2.0, value * 2.0] for value in range(10)])
+    manager.add_record('Add', 1.0, 1.0, 2.0)
+    manager.close()
+    reopened = SqliteHistoryManager(file_path=db_path, max_records=100)
+    assert len(reopened.load_history()) == 11
+    reopened.close()
+
+def test_sqlite_delete_and_clear(db_path, capsys):
+    """
+    Test that deleting a record removes only its row and that clearing removes every row.
+    """
+    manager = SqliteHistoryManager(file_path=db_path, max_records=10)
+    for operation in ('Add', 'Subtract', 'Multiply'):
+        manager.add_record(operation, 1.0, 1.0, 1.0)
+    manager.delete_record(2)
+    manager.delete_record(5)
+    assert [record[0] for record in manager.read_records()] == ['Add', 'Multiply']
+    assert [record['Operation'] for record in manager.load_history()] == ['Add', 'Multiply']
+    output = capsys.readouterr().out
+    assert "Record 2 deleted." in output
+    assert "Invalid record ID." in output
+
+    manager.clear_history()
+    assert manager.load_history() == []
+    assert count_rows(db_path) == 0
+    manager.close()
+
+def test_sqlite_find_records(db_path):
+    """
+    Test querying the most recent records of one operation, and that the query uses the index.
+    """
+    manager = SqliteHistoryManager(file_path=db_path, max_records=100, flush_size=10)
+    manager.add_records([['Multiply' if value % 2 else 'Add', float(value), 2.0, 0.0] for value in range(20)])
+    last_multiplies = manager.find_records(operation='Multiply', limit=3)
+    assert [record['Num1'] for record in last_multiplies] == [15.0, 17.0, 19.0]
+    assert len(manager.find_records(since=0)) == 20
+
+    with sqlite3.connect(db_path) as connection:
+        plan = connection.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM history WHERE operation = ? ORDER BY id DESC LIMIT 3",
+            ('Multiply',)).fetchall()
+    assert 'history_operation' in str(plan)
+    manager.close()
+
+def test_sqlite_iter_records(db_path):
+    """
+    Test that the database is streamed in chunks through the primary key.
+    """
+    manager = SqliteHistoryManager(file_path=db_path, max_records=5, flush_size=10)
+    for value in range(5):
+        manager.add_record('Add', float(value), 1.0, value + 1.0)
+    chunks = list(manager.iter_records(chunk_size=2))
+    assert [[record[1] for record in chunk] for chunk in chunks] == [[0.0, 1.0], [2.0, 3.0], [4.0]]
+    manager.close()
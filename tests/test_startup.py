@@ -0,0 +1,54 @@
+"""
+Start-up benchmark for the application, based on the `python -X importtime` report.
+
+The report of `import app` is compared with the report of `import pandas`, the dependency
+that used to be imported on every start. Run with `pytest -s -m slow` to see the reports.
+"""
+
+import subprocess
+import sys
+import pytest
+
+def import_times(statement):
+    """
+    Runs a statement in a fresh interpreter with `-X importtime` and parses the report.
+
+    Args:
+        statement (str): The Python statement to run, such as "import app".
+
+    Returns:
+        dict: A dictionary mapping imported module names to their cumulative import time
+            in microseconds.
+    """
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                               capture_output=True, text=True, check=True)
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        times[module.strip()] = int(cumulative)
+    return times
+
+def print_report(title, times, top=10):
+    """
+    Prints the modules with the highest cumulative import time.
+    """
+    print(f"\n{title}")
+    for module, cumulative in sorted(times.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"{cumulative / 1000:10.1f} ms  {module}")
+
+@pytest.mark.slow
+def test_startup_does_not_import_pandas():
+    """
+    Test that importing the application does not import pandas or NumPy, and that the
+    whole application imports faster than pandas alone.
+    """
+    app_times = import_times("import app")
+    pandas_times = import_times("import pandas")
+    print_report("import app", app_times)
+    print_report("import pandas", pandas_times, top=3)
+
+    assert 'pandas' not in app_times
+    assert 'numpy' not in app_times
+    assert app_times['app'] < pandas_times['pandas']